@@ -0,0 +1,264 @@
+"""Replay de uma raid (tempestade de entradas) contra o cog AntiRaid, sem conectar ao Discord.
+
+Vários servidores falsos recebem eventos on_member_join sintéticos na taxa escolhida, ao mesmo
+tempo. Servidores, canais, cargos e a "API" são stubs: cada chamada HTTP é contada por rota, tem
+uma latência fixa e passa por um limite global de requisições por segundo (como o da API real).
+Os banimentos passam pela fila de moderação de verdade.
+
+O script mede, por servidor:
+  - detecção: da primeira entrada da raid até o lockdown começar;
+  - lockdown completo: da primeira entrada até o último canal ser bloqueado;
+  - memória de join_times e original_permissions durante a raid (e depois do /lockdown off);
+  - chamadas HTTP emitidas, por rota.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/anti_raid_joinstorm.py --guilds 20 --rate 1000 --joins 200
+    python benchmarks/anti_raid_joinstorm.py --guilds 50 --channels 100 --mode channels --global-rate 50
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from collections import Counter, deque
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import discord  # noqa: E402
+import modules.anti_raid as anti_raid  # noqa: E402
+from modules.anti_raid import AntiRaid  # noqa: E402
+from modules.moderation_queue import moderation_queue  # noqa: E402
+
+
+class StubHTTP:
+    """Conta as chamadas por rota e aplica latência e um limite global de requisições por segundo."""
+    def __init__(self, latency: float, global_rate: float):
+        self.latency = latency
+        self.global_rate = global_rate
+        self.calls = Counter()
+        self.sent = deque()
+
+    async def request(self, route: str):
+        self.calls[route] += 1
+        if self.global_rate:
+            # Janela deslizante de 1s, como o bucket global da API
+            while True:
+                now = time.monotonic()
+                while self.sent and now - self.sent[0] >= 1.0:
+                    self.sent.popleft()
+                if len(self.sent) < self.global_rate:
+                    break
+                await asyncio.sleep(1.0 - (now - self.sent[0]))
+            self.sent.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+
+
+class StubRole:
+    def __init__(self, http: StubHTTP, position: int, permissions: discord.Permissions):
+        self.http = http
+        self.position = position
+        self.permissions = permissions
+
+    def __ge__(self, other: "StubRole") -> bool:
+        return self.position >= other.position
+
+    async def edit(self, *, permissions: discord.Permissions, reason: str = None):
+        await self.http.request("PATCH /roles")
+        self.permissions = permissions
+
+
+class StubChannel:
+    def __init__(self, http: StubHTTP, guild: "StubGuild", channel_id: int, overwrite: discord.PermissionOverwrite):
+        self.http = http
+        self.guild = guild
+        self.id = channel_id
+        self.name = f"canal-{channel_id}"
+        self.overwrite = overwrite
+
+    def overwrites_for(self, target) -> discord.PermissionOverwrite:
+        return discord.PermissionOverwrite(**{name: value for name, value in self.overwrite})
+
+    async def set_permissions(self, target, *, overwrite=None, reason: str = None):
+        await self.http.request("PUT /channels/permissions" if overwrite is not None else "DELETE /channels/permissions")
+        self.overwrite = overwrite or discord.PermissionOverwrite()
+
+
+class StubMember:
+    __slots__ = ("id", "guild", "bot", "created_at", "joined_at", "avatar", "top_role")
+
+    def __init__(self, member_id: int, guild: "StubGuild", account_age: timedelta):
+        now = discord.utils.utcnow()
+        self.id = member_id
+        self.guild = guild
+        self.bot = False
+        self.created_at = now - account_age
+        self.joined_at = now
+        self.avatar = None
+        self.top_role = guild.default_role
+
+    def __str__(self) -> str:
+        return f"membro-{self.id}"
+
+
+class BulkBanResult:
+    def __init__(self, banned):
+        self.banned = banned
+        self.failed = []
+
+
+class StubGuild:
+    def __init__(self, http: StubHTTP, guild_id: int, channels: int, explicit_allow: float, rng: random.Random):
+        self.http = http
+        self.id = guild_id
+        self.name = f"servidor-{guild_id}"
+        self.owner_id = 0
+        self.default_role = StubRole(http, 0, discord.Permissions(view_channel=True, send_messages=True, send_messages_in_threads=True))
+        self.me = StubMember(guild_id * 1_000_000, self, timedelta(days=365))
+        self.me.top_role = StubRole(http, 10, discord.Permissions.all())
+        self.text_channels = []
+        for index in range(channels):
+            # Alguns canais liberam o envio explicitamente para o @everyone (o modo "role" precisa sobrescrevê-los)
+            overwrite = discord.PermissionOverwrite(send_messages=True) if rng.random() < explicit_allow else discord.PermissionOverwrite()
+            self.text_channels.append(StubChannel(http, self, guild_id * 10_000 + index, overwrite))
+        self.channels_by_id = {channel.id: channel for channel in self.text_channels}
+        self.members = []
+
+    def get_channel(self, channel_id: int):
+        return self.channels_by_id.get(channel_id)
+
+    async def ban(self, user, *, reason: str = None):
+        await self.http.request("PUT /bans")
+
+    async def kick(self, user, *, reason: str = None):
+        await self.http.request("DELETE /members")
+
+    async def bulk_ban(self, users, *, reason: str = None):
+        await self.http.request("POST /bulk-ban")
+        return BulkBanResult(list(users))
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Tamanho aproximado de um objeto e de tudo que ele referencia (dicts, deques e sobrescritas)."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, discord.PermissionOverwrite):
+        size += deep_sizeof(obj._values, seen)
+    return size
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def storm(cog: AntiRaid, guild: StubGuild, joins: int, rate: float, young_fraction: float,
+                rng: random.Random, first_join: dict, peak_memory: list):
+    """Dispara `joins` entradas no servidor a `rate` entradas por minuto, como o gateway faria."""
+    interval = 60.0 / rate
+    tasks = []
+    start = time.monotonic()
+    first_join[guild.id] = start
+    for index in range(joins):
+        young = rng.random() < young_fraction
+        member = StubMember(guild.id * 1_000_000 + index + 1, guild, timedelta(days=1 if young else 400))
+        guild.members.append(member)
+        # O discord.py despacha cada evento em uma task própria
+        tasks.append(asyncio.create_task(cog.on_member_join(member)))
+        if index % 20 == 0:
+            peak_memory.append(deep_sizeof(cog.join_times) + deep_sizeof(cog.original_permissions))
+        delay = start + (index + 1) * interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    await asyncio.gather(*tasks)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    http = StubHTTP(args.latency, args.global_rate)
+    anti_raid.RAID_AUTOBAN_DEFER_SECONDS = args.defer
+    cog = AntiRaid(None)
+    # A detecção automática usa o modo padrão; aqui ele vem da linha de comando
+    cog.activate_lockdown = partial(cog.activate_lockdown, mode=args.mode)
+    guilds = [StubGuild(http, guild_id, args.channels, args.explicit_allow, rng) for guild_id in range(1, args.guilds + 1)]
+
+    first_join = {}
+    peak_memory = []
+    started = time.monotonic()
+    await asyncio.gather(*(storm(cog, guild, args.joins, args.rate, args.young_fraction, rng, first_join, peak_memory) for guild in guilds))
+    storm_seconds = time.monotonic() - started
+
+    # Espera os banimentos segurados e a fila de moderação esvaziarem
+    while cog.flush_tasks or len(moderation_queue):
+        await asyncio.sleep(0.05)
+    bans_seconds = time.monotonic() - started
+
+    detection, full_lockdown, modes = [], [], Counter()
+    for guild in guilds:
+        progress = cog.lockdown_progress.get(guild.id)
+        if not progress or not progress.finished_at:
+            print(f"⚠️ {guild.name}: lockdown não foi ativado")
+            continue
+        detection.append(progress.started_at - first_join[guild.id])
+        full_lockdown.append(progress.finished_at - first_join[guild.id])
+        modes[progress.mode] += 1
+    memory_during = deep_sizeof(cog.join_times) + deep_sizeof(cog.original_permissions)
+
+    await asyncio.gather(*(cog.deactivate_lockdown(guild) for guild in guilds))
+    memory_after = deep_sizeof(cog.join_times) + deep_sizeof(cog.original_permissions)
+    unlocked = all(guild.default_role.permissions.send_messages and
+                   all(channel.overwrite.send_messages is not False for channel in guild.text_channels) for guild in guilds)
+    await moderation_queue.close()
+
+    total_joins = args.guilds * args.joins
+    print(f"{args.guilds} servidor(es) x {args.joins} entradas a {args.rate:.0f}/min | {args.channels} canais | modo {args.mode} | "
+          f"latência {args.latency * 1000:.0f}ms | limite global {args.global_rate or 'nenhum'}/s")
+    print(f"raid enviada em {storm_seconds:.2f}s ({total_joins} entradas), banimentos concluídos em {bans_seconds:.2f}s")
+    if detection:
+        print(f"detecção:          p50 {statistics.median(detection) * 1000:8.1f}ms | p95 {percentile(detection, 0.95) * 1000:8.1f}ms | máx {max(detection) * 1000:8.1f}ms")
+        print(f"lockdown completo: p50 {statistics.median(full_lockdown) * 1000:8.1f}ms | p95 {percentile(full_lockdown, 0.95) * 1000:8.1f}ms | máx {max(full_lockdown) * 1000:8.1f}ms")
+        print(f"modos usados: {dict(modes)}")
+    print(f"memória (join_times + original_permissions): pico {max(peak_memory + [memory_during]) / 1024:.1f} KB | "
+          f"fim da raid {memory_during / 1024:.1f} KB | após /lockdown off {memory_after / 1024:.1f} KB")
+    print(f"chamadas HTTP: {sum(http.calls.values())} no total")
+    for route, count in http.calls.most_common():
+        print(f"  {route:<28} {count:>8}")
+    print(f"permissões restauradas: {'sim' if unlocked else 'NÃO'}")
+    if not unlocked or len(detection) < args.guilds:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de uma tempestade de entradas contra o AntiRaid.")
+    parser.add_argument("--guilds", type=int, default=20, help="Servidores atacados ao mesmo tempo.")
+    parser.add_argument("--joins", type=int, default=200, help="Entradas por servidor.")
+    parser.add_argument("--rate", type=float, default=1000, help="Entradas por minuto em cada servidor.")
+    parser.add_argument("--channels", type=int, default=50, help="Canais de texto por servidor.")
+    parser.add_argument("--explicit-allow", type=float, default=0.1, help="Fração dos canais que libera o envio explicitamente para o @everyone.")
+    parser.add_argument("--young-fraction", type=float, default=0.8, help="Fração das contas mais novas que MIN_ACCOUNT_AGE_DAYS.")
+    parser.add_argument("--mode", choices=("role", "channels"), default=anti_raid.RAID_LOCKDOWN_MODE)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência de cada chamada HTTP, em segundos.")
+    parser.add_argument("--global-rate", type=float, default=50, help="Limite global de requisições por segundo (0 = sem limite).")
+    parser.add_argument("--defer", type=float, default=anti_raid.RAID_AUTOBAN_DEFER_SECONDS, help="Sobrescreve RAID_AUTOBAN_DEFER_SECONDS.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs do AntiRaid e da fila de moderação.")
+    args = parser.parse_args()
+    if not args.verbose:
+        # Um log por banimento/lockdown esconderia o resultado
+        logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark de memória do SpamLimiter com milhões de remetentes distintos.
+
+Cada remetente manda algumas mensagens e some, como numa onda de contas novas. O script mede a
+memória alocada (tracemalloc) e o tamanho do tracker a cada checkpoint: com o limite de chaves e a
+remoção por TTL, os dois devem ficar estáveis em vez de crescer com o total de remetentes.
+Termina com código de saída 1 se a memória crescer mais que --tolerance entre o primeiro e o último checkpoint.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/anti_spam_memory.py --senders 2000000
+    python benchmarks/anti_spam_memory.py --senders 500000 --max-keys 20000 --rate 5000
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from modules.anti_spam import SpamLimiter  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória do SpamLimiter com remetentes distintos.")
+    parser.add_argument("--senders", type=int, default=1_000_000, help="Total de remetentes distintos.")
+    parser.add_argument("--guilds", type=int, default=50, help="Servidores simulados.")
+    parser.add_argument("--messages-per-sender", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=2000, help="Remetentes novos por segundo de relógio simulado.")
+    parser.add_argument("--max-keys", type=int, default=None, help="Sobrescreve SPAM_TRACKER_MAX_KEYS.")
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Crescimento de memória aceito (fração).")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    limiter = SpamLimiter() if args.max_keys is None else SpamLimiter(max_keys=args.max_keys)
+    # O relógio é simulado para o TTL agir sem o benchmark precisar esperar de verdade
+    clock = 0.0
+    step = 1.0 / args.rate
+    next_sweep = limiter.idle_ttl
+    checkpoint_every = max(1, args.senders // args.checkpoints)
+    samples = []
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for sender in range(args.senders):
+        clock += step
+        key = (rng.randrange(args.guilds), sender)
+        for i in range(args.messages_per_sender):
+            limiter.hit(key, f"mensagem {i}", now=clock)
+        if clock >= next_sweep:
+            # Mesmo papel da task periódica evict_idle do cog
+            limiter.evict_idle(now=clock)
+            next_sweep = clock + limiter.idle_ttl
+        if (sender + 1) % checkpoint_every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append(current)
+            print(f"{sender + 1:>10} remetentes | chaves {len(limiter):>8} | removidas {limiter.evicted:>10} | memória {current / 1_048_576:8.2f} MB")
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_messages = args.senders * args.messages_per_sender
+    print(f"{total_messages / elapsed:,.0f} mensagens/s | pico {peak / 1_048_576:.2f} MB | {peak / max(1, len(limiter)):.0f} bytes por chave no pico")
+    # Compara com o checkpoint em que o tracker já encheu (o primeiro ainda pode estar crescendo)
+    baseline = samples[len(samples) // 2] if len(samples) > 1 else samples[0]
+    growth = (samples[-1] - baseline) / baseline if baseline else 0.0
+    print(f"crescimento da memória na segunda metade: {growth:+.1%}")
+    if growth > args.tolerance:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
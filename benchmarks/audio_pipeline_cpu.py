@@ -0,0 +1,124 @@
+"""Benchmark de CPU por stream do pipeline de áudio: PCM + encoder do discord.py vs. Opus direto do FFmpeg.
+
+Toca arquivos de áudio locais em N streams simultâneos, no ritmo real do Discord (um frame de 20ms
+por vez, cada stream na sua thread, como o AudioPlayer), e mede a CPU do processo do bot mais a dos
+FFmpeg filhos. Precisa do ffmpeg no PATH; o modo "pcm" também precisa da libopus carregável.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/audio_pipeline_cpu.py musica.webm outra.mp3 --streams 1,4,8 --seconds 20
+    python benchmarks/audio_pipeline_cpu.py musica.webm --modes opus --bitrate 96
+"""
+import argparse
+import asyncio
+import itertools
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+import discord
+from discord.opus import Encoder
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.settings import MUSIC_DEFAULT_BITRATE  # noqa: E402
+
+FRAME_SECONDS = Encoder.FRAME_LENGTH / 1000
+
+
+def cpu_seconds() -> float:
+    """CPU (usuário + sistema) do processo e dos filhos já finalizados."""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def probe_codecs(files) -> dict:
+    async def probe_all():
+        return {path: (await discord.FFmpegOpusAudio.probe(path, method="fallback"))[0] for path in files}
+    return asyncio.run(probe_all())
+
+
+def open_stream(mode: str, path: str, codec: str, bitrate: int):
+    if mode == "pcm":
+        return discord.FFmpegPCMAudio(path, options="-vn"), Encoder()
+    # Mesmo critério do Music.open_source: Opus é só remuxado, o resto o FFmpeg transcodifica
+    passthrough = codec == "opus"
+    return discord.FFmpegOpusAudio(path, codec="copy" if passthrough else None, bitrate=bitrate, options="-vn"), None
+
+
+def play(mode: str, files, codecs: dict, bitrate: int, deadline: float, frames: list, index: int):
+    """Um stream: lê (e, no modo pcm, codifica) um frame a cada 20ms até o prazo, repetindo os arquivos."""
+    next_frame = time.perf_counter()
+    for path in itertools.cycle(files):
+        source, encoder = open_stream(mode, path, codecs.get(path), bitrate)
+        try:
+            while time.perf_counter() < deadline:
+                data = source.read()
+                if not data:
+                    break
+                if encoder:
+                    encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+                frames[index] += 1
+                next_frame += FRAME_SECONDS
+                time.sleep(max(0.0, next_frame - time.perf_counter()))
+        finally:
+            source.cleanup()
+        if time.perf_counter() >= deadline:
+            return
+
+
+def measure(mode: str, streams: int, files, codecs: dict, bitrate: int, seconds: float) -> dict:
+    frames = [0] * streams
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    deadline = started + seconds
+    threads = [threading.Thread(target=play, args=(mode, files, codecs, bitrate, deadline, frames, i)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before
+    return {
+        "cpu_pct_total": 100 * cpu / elapsed,
+        "cpu_pct_per_stream": 100 * cpu / elapsed / streams,
+        # Abaixo de ~100% o stream não acompanhou o tempo real (engasgaria no canal de voz)
+        "realtime_pct": 100 * sum(frames) * FRAME_SECONDS / (elapsed * streams),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU por stream: PCM + encoder Python vs. Opus do FFmpeg.")
+    parser.add_argument("files", nargs="+", help="Arquivos de áudio locais (ex: .webm Opus, .mp3).")
+    parser.add_argument("--streams", default="1,4,8", help="Quantidades de streams simultâneos, separadas por vírgula.")
+    parser.add_argument("--seconds", type=float, default=15, help="Duração de cada medição.")
+    parser.add_argument("--modes", default="pcm,opus", help="Pipelines medidos: pcm, opus ou ambos.")
+    parser.add_argument("--bitrate", type=int, default=MUSIC_DEFAULT_BITRATE, help="kbps ao transcodificar (bitrate do canal).")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    if "pcm" in modes and not discord.opus.is_loaded():
+        try:
+            discord.opus._load_default()
+        except Exception:
+            pass
+        if not discord.opus.is_loaded():
+            parser.error("a libopus não foi encontrada; rode só com --modes opus")
+
+    codecs = probe_codecs(args.files)
+    for path, codec in codecs.items():
+        print(f"{path}: codec {codec or 'desconhecido'} ({'passthrough' if codec == 'opus' else 'transcodificado'} no modo opus)")
+
+    for streams in (int(n) for n in args.streams.split(",")):
+        for mode in modes:
+            result = measure(mode, streams, args.files, codecs, args.bitrate, args.seconds)
+            print(f"{mode:>5} x{streams:<3} CPU total {result['cpu_pct_total']:6.1f}% | "
+                  f"por stream {result['cpu_pct_per_stream']:5.2f}% | tempo real {result['realtime_pct']:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
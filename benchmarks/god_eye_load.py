@@ -0,0 +1,146 @@
+"""Benchmark de carga do pipeline de atividade (GodEye.on_message + ActivityDatabase).
+
+Reproduz um fluxo sintético de mensagens, com remetentes sorteados por uma distribuição de Zipf,
+através do cog com objetos do discord simulados, e mede vazão, latência por mensagem,
+atraso do event loop e crescimento do banco.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/god_eye_load.py --guilds 20 --members 5000 --messages 200000
+    python benchmarks/god_eye_load.py --rate 2000 --json resultado.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from modules.god_eye import ActivityDatabase, GodEye  # noqa: E402
+
+
+class StubBot:
+    """Bot falso: as tarefas que esperam o bot ficar pronto nunca rodam durante o benchmark."""
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+
+def build_messages(guilds: int, members: int, count: int, zipf_s: float, seed: int):
+    """Gera as mensagens sintéticas. Poucos membros muito ativos e uma cauda longa, como num servidor real."""
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1.0 / (rank ** zipf_s) for rank in range(1, members + 1)))
+    guild_objs = [SimpleNamespace(id=10_000 + g) for g in range(guilds)]
+    authors = {}
+    messages = []
+    senders = rng.choices(range(members), cum_weights=cum_weights, k=count)
+    for sender in senders:
+        guild = guild_objs[rng.randrange(guilds)]
+        # Cada servidor tem seu próprio conjunto de membros
+        key = (guild.id, sender)
+        author = authors.get(key)
+        if author is None:
+            author = authors[key] = SimpleNamespace(id=guild.id * 1_000_000 + sender, bot=False)
+        messages.append(SimpleNamespace(author=author, guild=guild))
+    return messages
+
+
+def db_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def monitor_loop_lag(samples: list, interval: float = 0.01):
+    """Mede quanto o event loop atrasa para acordar uma tarefa que dorme por `interval` segundos."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run(args) -> dict:
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="godeye-bench-"), "activity.db")
+    messages = build_messages(args.guilds, args.members, args.messages, args.zipf, args.seed)
+
+    cog = GodEye(StubBot(), db=ActivityDatabase(db_path))
+    size_before = db_size(db_path)
+    lag_samples = []
+    lag_task = asyncio.create_task(monitor_loop_lag(lag_samples))
+
+    latencies = []
+    interval = 1.0 / args.rate if args.rate else 0.0
+    started = time.perf_counter()
+    for i, message in enumerate(messages):
+        t0 = time.perf_counter()
+        await cog.on_message(message)
+        latencies.append(time.perf_counter() - t0)
+        if interval:
+            # Mantém a taxa alvo, cedendo o loop como faria o gateway entre eventos
+            delay = started + (i + 1) * interval - time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+        else:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    flush_start = time.perf_counter()
+    await cog.flush_buffer()
+    final_flush = time.perf_counter() - flush_start
+    lag_task.cancel()
+    stats = cog.buffer_stats
+    await cog.cog_unload()
+
+    return {
+        "messages": len(messages),
+        "guilds": args.guilds,
+        "members_per_guild": args.members,
+        "zipf_s": args.zipf,
+        "target_rate": args.rate,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_msgs_per_s": round(len(messages) / elapsed, 1),
+        "latency_p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "latency_p99_us": round(percentile(latencies, 99) * 1e6, 1),
+        "latency_max_us": round(max(latencies) * 1e6, 1),
+        "loop_lag_p99_ms": round(percentile(lag_samples, 99) * 1e3, 2),
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0) * 1e3, 2),
+        "final_flush_ms": round(final_flush * 1e3, 2),
+        "last_flush_size": stats["last_flush_size"],
+        "db_bytes_before": size_before,
+        "db_bytes_after": db_size(db_path),
+        "db_bytes_per_message": round((db_size(db_path) - size_before) / len(messages), 2),
+        "db_path": db_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga do GodEye.")
+    parser.add_argument("--guilds", type=int, default=10, help="Quantidade de servidores simulados.")
+    parser.add_argument("--members", type=int, default=2000, help="Membros por servidor.")
+    parser.add_argument("--messages", type=int, default=100_000, help="Total de mensagens reproduzidas.")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Expoente da distribuição de Zipf dos remetentes.")
+    parser.add_argument("--rate", type=float, default=0, help="Mensagens por segundo (0 = o mais rápido possível).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="Caminho do banco (padrão: arquivo temporário novo).")
+    parser.add_argument("--json", help="Salva o resultado neste arquivo para comparar execuções.")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    for key, value in result.items():
+        print(f"{key:>24}: {value}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
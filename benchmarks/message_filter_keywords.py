@@ -0,0 +1,77 @@
+"""Benchmark do filtro de palavras proibidas com milhares de palavras.
+
+Compara, por mensagem, três formas de procurar as palavras: um loop `in` por palavra (o jeito
+ad-hoc), uma regex com todas as palavras em alternação simples e a regex em trie usada pelo
+CompiledFilter. Também mede o custo de compilar as regras (só acontece quando elas mudam).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/message_filter_keywords.py --words 1000,5000,10000
+    python benchmarks/message_filter_keywords.py --words 10000 --messages 20000 --hit-rate 0.05
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from modules.message_filter import CompiledFilter, FilterRules  # noqa: E402
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+
+def build_messages(rng: random.Random, words: list, count: int, hit_rate: float) -> list:
+    """Mensagens de 5 a 30 palavras; uma fração `hit_rate` contém uma palavra proibida."""
+    messages = []
+    for _ in range(count):
+        tokens = [random_word(rng) for _ in range(rng.randint(5, 30))]
+        if rng.random() < hit_rate:
+            tokens[rng.randrange(len(tokens))] = rng.choice(words)
+        messages.append(" ".join(tokens))
+    return messages
+
+
+def time_per_message(func, messages: list) -> tuple:
+    start = time.perf_counter()
+    hits = sum(1 for message in messages if func(message))
+    return (time.perf_counter() - start) / len(messages), hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por mensagem do filtro de palavras proibidas.")
+    parser.add_argument("--words", default="100,1000,5000,10000", help="Quantidades de palavras proibidas, separadas por vírgula.")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--hit-rate", type=float, default=0.02, help="Fração das mensagens com uma palavra proibida.")
+    parser.add_argument("--naive-limit", type=int, default=5000, help="Acima disso o loop `in` é pulado (lento demais).")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in (int(n) for n in args.words.split(",")):
+        words = list({random_word(rng) for _ in range(size)})
+        messages = build_messages(rng, words, args.messages, args.hit_rate)
+        word_set = set(words)
+
+        start = time.perf_counter()
+        compiled = CompiledFilter(FilterRules(words=word_set))
+        compile_ms = (time.perf_counter() - start) * 1000
+        alternation = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, sorted(words, key=len, reverse=True))) + r")(?!\w)")
+
+        results = {"trie": time_per_message(compiled.check, messages),
+                   "alternação": time_per_message(alternation.search, messages)}
+        if size <= args.naive_limit:
+            # Busca por substring, sem respeitar limites de palavra: o limite inferior do jeito ad-hoc
+            results["loop in"] = time_per_message(lambda text: any(word in text for word in words), messages)
+
+        print(f"{size:>6} palavras | compilação {compile_ms:8.1f}ms")
+        for name, (seconds, hits) in results.items():
+            print(f"{'':>6}   {name:>10}: {seconds * 1e6:10.1f}us/mensagem ({hits} bloqueadas)")
+
+
+if __name__ == "__main__":
+    main()
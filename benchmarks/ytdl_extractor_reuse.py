@@ -0,0 +1,76 @@
+"""Micro-benchmark do custo por busca de criar um YoutubeDL novo versus reutilizar a instância da thread.
+
+Sem rede: cada "busca" processa um resultado já extraído (seleção de formato e montagem do info),
+que é a parte local de toda chamada ao extract_info. Com --query, também mede extrações reais.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/ytdl_extractor_reuse.py --iterations 50
+    python benchmarks/ytdl_extractor_reuse.py --iterations 5 --query "ytsearch:lofi"
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import yt_dlp
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from modules.music_resolver import YDL_OPTIONS, get_extractor  # noqa: E402
+
+# Resultado de extração sintético, no formato que os extractors entregam ao YoutubeDL
+FAKE_RESULT = {
+    "id": "benchmark",
+    "title": "Benchmark",
+    "webpage_url": "https://example.com/watch?v=benchmark",
+    "extractor": "generic",
+    "extractor_key": "Generic",
+    "formats": [
+        {"format_id": "251", "url": "https://example.com/audio.webm", "ext": "webm", "acodec": "opus", "vcodec": "none", "abr": 160},
+        {"format_id": "140", "url": "https://example.com/audio.m4a", "ext": "m4a", "acodec": "mp4a.40.2", "vcodec": "none", "abr": 128},
+    ],
+}
+
+
+def lookup_fresh(query):
+    with yt_dlp.YoutubeDL(YDL_OPTIONS) as ydl:
+        return ydl.extract_info(query, download=False) if query else ydl.process_ie_result(dict(FAKE_RESULT), download=False)
+
+
+def lookup_warm(query):
+    ydl = get_extractor()
+    return ydl.extract_info(query, download=False) if query else ydl.process_ie_result(dict(FAKE_RESULT), download=False)
+
+
+def measure(func, iterations: int, query) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(query)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por busca: YoutubeDL novo vs. instância reutilizada.")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--query", help="Busca/URL real para medir com rede (opcional).")
+    args = parser.parse_args()
+
+    # Aquece imports e a instância da thread antes de medir
+    lookup_fresh(None)
+    lookup_warm(None)
+
+    results = {}
+    for name, func in (("novo YoutubeDL por busca", lookup_fresh), ("instância reutilizada", lookup_warm)):
+        timings = measure(func, args.iterations, args.query)
+        results[name] = statistics.median(timings)
+        print(f"{name:>26}: mediana {results[name] * 1000:8.2f}ms | mín {min(timings) * 1000:8.2f}ms | máx {max(timings) * 1000:8.2f}ms")
+
+    fresh, warm = results["novo YoutubeDL por busca"], results["instância reutilizada"]
+    print(f"{'economia por busca':>26}: {(fresh - warm) * 1000:8.2f}ms ({fresh / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
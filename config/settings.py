@@ -7,15 +7,101 @@ load_dotenv()
 RAID_JOIN_THRESHOLD = 5  # Número de entradas para ativar o lockdown
 RAID_TIME_WINDOW = 10    # Janela de tempo em segundos para detectar as entradas
 MIN_ACCOUNT_AGE_DAYS = 7 # Idade mínima da conta em dias
+# Modo do lockdown. "channels": nega o envio ao @everyone em cada canal de texto, o que vale para todos os
+# membros sem permissões acima do @everyone no canal. "role": tira o "Enviar Mensagens" do cargo @everyone em
+# uma única chamada (bem mais rápido), mas NÃO bloqueia quem recebe essa permissão de outro cargo no servidor.
+RAID_LOCKDOWN_MODE = "channels"
+RAID_LOCKDOWN_CONCURRENCY = 5       # Canais alterados ao mesmo tempo durante o lockdown
+RAID_LOCKDOWN_PROGRESS_INTERVAL = 2 # Segundos entre as atualizações de progresso do /lockdown e do /raid purge
+RAID_AUTOBAN_DEFER_SECONDS = 0      # Segura os banimentos automáticos por N segundos para saírem juntos no bulk_ban (0 = na hora)
+RAID_PURGE_MAX_MINUTES = 1440       # Janela máxima (em minutos) aceita pelo /raid purge
 
 # --- Configurações Anti-Spam ---
 SPAM_MAX_REPEATS = 5     # Número máximo de mensagens repetidas
 SPAM_MUTE_MINUTES = 10   # Duração do mute em minutos
+SPAM_REPEAT_WINDOW = 30  # Janela em segundos em que as mensagens repetidas são contadas
+SPAM_FLOOD_MAX_MESSAGES = 8  # Mensagens (mesmo diferentes) permitidas dentro da janela de flood
+SPAM_FLOOD_WINDOW = 5        # Janela deslizante em segundos do detector de flood
+SPAM_TRACKER_MAX_KEYS = 20_000   # Autores acompanhados ao mesmo tempo, os mais antigos saem primeiro (~300 bytes cada, ~6 MB no limite)
+SPAM_TRACKER_IDLE_TTL = 60       # Segundos sem mensagens até um autor sair do tracker
+SPAM_WAVE_MIN_AUTHORS = 4       # Contas diferentes com a mesma mensagem com link/convite (ou quase) para caracterizar uma onda de spam
+SPAM_WAVE_WINDOW = 60           # Janela em segundos em que as mensagens quase idênticas são comparadas
+SPAM_WAVE_MIN_SIMILARITY = 0.5  # Similaridade (Jaccard estimada por MinHash) para duas mensagens com link serem "quase idênticas"
+SPAM_WAVE_MIN_LENGTH = 16       # Mensagens mais curtas que isso (ex: "oi", "kkkk") são ignoradas
+SPAM_WAVE_TEXT_MIN_AUTHORS = 8       # Ondas de texto puro (sem link) precisam de mais contas...
+SPAM_WAVE_TEXT_MIN_SIMILARITY = 0.8  # ...de cópias mais parecidas...
+SPAM_WAVE_TEXT_MIN_LENGTH = 60       # ...e de mensagens longas...
+SPAM_WAVE_TEXT_MIN_ENTROPY = 3.5     # ...e variadas (bits por caractere; "kkkk" e "hahaha" ficam perto de 0 e 1)
+# Links desses domínios (e subdomínios) não tornam uma mensagem suspeita: são tratados como texto puro
+SPAM_WAVE_SAFE_DOMAINS = {
+    "youtube.com", "youtu.be", "spotify.com", "soundcloud.com", "deezer.com", "tenor.com", "giphy.com",
+    "twitter.com", "x.com", "instagram.com", "tiktok.com", "twitch.tv", "reddit.com",
+    "cdn.discordapp.com", "media.discordapp.net",
+}
+SPAM_WAVE_MAX_ENTRIES = 2000    # Mensagens recentes indexadas por servidor
+
+# --- Configurações dos Filtros de Mensagens ---
+FILTER_MAX_WORDS = 10_000     # Palavras proibidas por servidor
+FILTER_CAPS_MIN_LENGTH = 10   # Letras mínimas na mensagem para o filtro de maiúsculas valer (padrão)
+
+# --- Configurações da Fila de Moderação ---
+MODERATION_WORKERS = 3           # Ações de moderação executadas ao mesmo tempo (em servidores/tipos diferentes)
+MODERATION_MIN_INTERVAL = 0.25   # Intervalo mínimo em segundos entre chamadas do mesmo servidor e tipo de ação
+MODERATION_MAX_INTERVAL = 5.0    # Intervalo máximo quando a API está segurando as chamadas (rate limit)
+MODERATION_MAX_PENDING = 5000    # Ações pendentes no bot inteiro antes de novas serem descartadas
+MODERATION_BULK_BAN_SIZE = 200   # Banimentos por chamada de bulk_ban (limite da API)
+MODERATION_CLOSE_TIMEOUT = 10    # Segundos que o desligamento espera as ações pendentes serem executadas
+
+# --- Configurações do God Eye (Atividade) ---
+ACTIVITY_FLUSH_INTERVAL = 5     # Intervalo em segundos entre as gravações do buffer de atividade no banco
+ACTIVITY_FLUSH_MAX_KEYS = 500   # Número de membros pendentes no buffer que força uma gravação imediata
+ACTIVITY_BUCKET_RETENTION_DAYS = 90    # Dias mantidos como buckets diários antes de virarem rollups mensais
+ACTIVITY_ROLLUP_RETENTION_MONTHS = 24  # Meses de rollups mensais mantidos no banco
+ACTIVITY_LEADERBOARD_TTL = 60          # Segundos que um ranking calculado fica em cache
+ACTIVITY_LEADERBOARD_MAX_ROWS = 500    # Posições de cada ranking guardadas em cache (e limite dos rankings por período)
+ACTIVITY_LEADERBOARD_CACHE_GUILDS = 200  # Servidores com rankings em cache ao mesmo tempo
+
+# --- Configurações de Música ---
+MUSIC_RESOLVER_WORKERS = 4     # Extrações do yt_dlp simultâneas no bot inteiro
+MUSIC_RESOLVES_PER_GUILD = 1   # Extrações simultâneas por servidor
+MUSIC_RESOLVE_TIMEOUT = 30     # Tempo limite em segundos para resolver uma busca/URL
+MUSIC_PREFETCH_LEAD = 20       # Segundos antes do fim da música atual em que o stream da próxima é aberto
+MUSIC_PREFETCH_PAUSED_RECHECK = 5  # Com o player pausado, segundos entre as novas tentativas de abrir o stream da próxima
+MUSIC_STREAM_URL_MARGIN = 60   # Margem em segundos para considerar uma URL de stream como expirada
+MUSIC_STREAM_DEFAULT_TTL = 1800        # Validade assumida de URLs de stream que não informam a expiração
+MUSIC_CACHE_MEMORY_ENTRIES = 512       # Resoluções mantidas no cache em memória (LRU)
+MUSIC_CACHE_METADATA_TTL = 7 * 86400   # Segundos em que os metadados de uma busca/URL continuam válidos
+MUSIC_PLAYLIST_PAGE_SIZE = 25          # Entradas de playlist carregadas (e mantidas em memória) por vez
+MUSIC_QUEUE_MAX_SIZE = 500             # Itens máximos na fila de cada servidor (uma playlist conta como um item)
+MUSIC_DEFAULT_BITRATE = 128            # kbps usados na transcodificação quando o bitrate do canal é desconhecido
+MUSIC_IDLE_TIMEOUT = 300               # Segundos com a fila vazia antes de o bot sair do canal de voz
+# Cache em disco do áudio das músicas mais tocadas (opcional). Ex: MUSIC_AUDIO_CACHE_MB=2048 no .env; 0 desativa.
+MUSIC_AUDIO_CACHE_DIR = "data/audio_cache"
+MUSIC_AUDIO_CACHE_BYTES = int(getenv("MUSIC_AUDIO_CACHE_MB", "0")) * 1_048_576
+MUSIC_AUDIO_CACHE_MIN_PLAYS = 2                    # Execuções de uma música antes de ela ser baixada para o cache
+MUSIC_AUDIO_CACHE_MAX_TRACK_BYTES = 50 * 1_048_576  # Tamanho máximo de um arquivo no cache
+MUSIC_AUDIO_CACHE_MAX_DURATION = 20 * 60           # Músicas mais longas que isso (segundos) nunca são guardadas
 
 # --- Configurações de Log ---
 # IMPORTANTE: Pegue o ID do canal de logs (clicando com o botão direito no canal e "Copiar ID")
 # e coloque no seu arquivo .env. Ex: LOG_CHANNEL_ID=123456789012345678
 LOG_CHANNEL_ID = int(getenv("LOG_CHANNEL_ID", "0"))
+LOG_CHANNEL_NAME = "logs"         # Canal usado nos servidores em que o LOG_CHANNEL_ID não existe
+LOG_FLUSH_INTERVAL = 2.0          # Segundos que os logs de um servidor esperam para sair juntos
+LOG_EMBEDS_PER_MESSAGE = 10       # Embeds por mensagem de log (limite da API)
+LOG_QUEUE_MAX_SIZE = 500          # Logs pendentes por servidor; acima disso os novos são descartados
+LOG_WEBHOOK_NAME = "Stwart Logs"  # Nome do webhook criado no canal de logs
+# Conteúdo das mensagens recentes guardado para o log de mensagens apagadas (no lugar do cache do discord.py)
+LOG_MESSAGE_STORE_GUILD_BYTES = 256 * 1024  # Orçamento de memória por servidor; as mensagens mais antigas saem primeiro
+LOG_MESSAGE_STORE_MAX_AGE = 6 * 60 * 60     # Segundos que uma mensagem fica guardada
+LOG_MESSAGE_STORE_COMPRESS_MIN = 200        # Textos a partir desse tamanho (bytes) são comprimidos com zlib
+DISCORD_MAX_MESSAGES = 100                  # Mensagens inteiras no cache do discord.py (padrão da lib: 1000)
+
+# --- Configurações de Métricas ---
+# Endpoint local no formato do Prometheus (http://127.0.0.1:9108/metrics). Use METRICS_HTTP_PORT=0 para desativar.
+METRICS_HTTP_HOST = getenv("METRICS_HTTP_HOST", "127.0.0.1")
+METRICS_HTTP_PORT = int(getenv("METRICS_HTTP_PORT", "9108"))
+METRICS_LOOP_LAG_INTERVAL = 0.5  # Intervalo em segundos entre as medições de atraso do event loop
 
 # --- Whitelist ---
 # IDs de usuários que são imunes aos sistemas de proteção (ex: outros bots, adms)
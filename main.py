@@ -5,9 +5,10 @@ import discord
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from discord.ext import commands
 from discord import app_commands
 from modules.utils import setup_logging, create_embed
+from modules.metrics import InstrumentedBot, MetricsCommandTree, observe_command
+from config.settings import DISCORD_MAX_MESSAGES
 
 # Configura o caminho e carrega variáveis de ambiente
 sys.path.append(str(Path(__file__).parent))
@@ -20,13 +21,19 @@ if not DISCORD_TOKEN:
 
 # Configuração do Bot com as intents necessárias
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+# InstrumentedBot e MetricsCommandTree medem o tempo de cada listener e slash command (ver /stats)
+# O cache de mensagens do discord.py fica pequeno: os logs usam o MessageStore (modules/message_store.py)
+bot = InstrumentedBot(command_prefix="!", intents=intents, help_command=None, tree_cls=MetricsCommandTree,
+                      max_messages=DISCORD_MAX_MESSAGES)
 
 # Lista de módulos (Cogs) a serem carregados
 COGS_TO_LOAD = [
+    "modules.metrics",
+    "modules.moderation_queue",
     "modules.music",
     "modules.moderation",
     "modules.anti_spam",
+    "modules.message_filter",
     "modules.anti_raid",
     "modules.god_eye",
     "modules.logs_system",
@@ -48,6 +55,7 @@ async def on_ready():
 
 async def on_tree_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
     """Tratador de erros global para todos os slash commands."""
+    observe_command(interaction, failed=True)
     if isinstance(error, app_commands.errors.CommandNotFound):
         return  # Ignora comandos não encontrados
     
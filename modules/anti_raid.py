@@ -1,87 +1,335 @@
 import discord
+import asyncio
 import logging
+import time
 from discord import app_commands
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
-from collections import defaultdict
+from discord.ext import commands
+from datetime import timedelta
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
 from modules.utils import create_embed
+from modules.metrics import metrics
+from modules.moderation_queue import moderation_queue, ModAction, PRIORITY_MANUAL, PRIORITY_RAID
 from config.settings import (
     RAID_JOIN_THRESHOLD,
     RAID_TIME_WINDOW,
     MIN_ACCOUNT_AGE_DAYS,
+    RAID_LOCKDOWN_MODE,
+    RAID_LOCKDOWN_CONCURRENCY,
+    RAID_LOCKDOWN_PROGRESS_INTERVAL,
+    RAID_AUTOBAN_DEFER_SECONDS,
+    RAID_PURGE_MAX_MINUTES,
+    MODERATION_BULK_BAN_SIZE,
     WHITELIST
 )
 
+LOCKDOWN_MODE_LABELS = {"role": "Cargo @everyone", "channels": "Canal por canal"}
+LOCKDOWN_SCOPES = {"role": "pelo cargo @everyone", "channels": "em todos os canais de texto"}
+
+class LockdownProgress:
+    """Andamento de um lockdown, da restauração ou de um /raid purge: itens processados e tempo desde o início."""
+    __slots__ = ("mode", "total", "done", "failed", "started_at", "finished_at")
+
+    def __init__(self, mode: str, started_at: Optional[float] = None):
+        self.mode = mode
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.started_at = started_at or time.monotonic()
+        self.finished_at: Optional[float] = None
+
+    def __str__(self) -> str:
+        return f"{self.done}/{self.total}"
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+class PurgeConfirmView(discord.ui.View):
+    """Confirmação do /raid purge, que mostra quantos membros serão banidos antes de agir."""
+    def __init__(self, cog: "AntiRaid", author: discord.abc.User, members: List[discord.Member], reason: str):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.author = author
+        self.members = members
+        self.reason = reason
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Só quem usou o comando pode confirmar a limpeza.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Banir todos", style=discord.ButtonStyle.danger, emoji="🔨")
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        title = f"🔨 Limpando a Raid ({len(self.members)} membro(s))"
+        await interaction.response.edit_message(embed=create_embed(title, "Iniciando...", discord.Color.orange()), view=None)
+        progress = LockdownProgress("purge")
+        task = asyncio.create_task(self.cog.purge(interaction.guild, self.members, self.reason, progress))
+        while not task.done():
+            await asyncio.wait({task}, timeout=RAID_LOCKDOWN_PROGRESS_INTERVAL)
+            if not task.done():
+                try:
+                    await interaction.edit_original_response(embed=create_embed(title, f"⏳ {progress} processado(s) ({progress.elapsed:.1f}s)", discord.Color.orange()))
+                except discord.HTTPException:
+                    pass
+        await task
+        await interaction.edit_original_response(embed=create_embed(
+            "🔨 Raid Limpa",
+            f"**Banidos:** {progress.done - progress.failed}/{progress.total}{f' ({progress.failed} com erro)' if progress.failed else ''}\n**Tempo:** {progress.elapsed:.2f}s",
+            discord.Color.green() if not progress.failed else discord.Color.orange()
+        ))
+
+    @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(embed=create_embed("❎ Limpeza Cancelada", "Nenhum membro foi banido.", discord.Color.light_grey()), view=None)
+
+AUTOBAN_REASON = f"Conta muito nova (criada há menos de {MIN_ACCOUNT_AGE_DAYS} dias)"
+
 class AntiRaid(commands.Cog):
     """Sistema de proteção contra raids de contas novas e entradas em massa."""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.join_times = defaultdict(list)
+        # Horários (monotônicos) das últimas RAID_JOIN_THRESHOLD entradas de cada servidor, do mais antigo ao mais novo
+        self.join_times: Dict[int, Deque[float]] = {}
         self.lockdown_active = defaultdict(bool)
         # Dicionário para guardar as permissões originais do canal durante o lockdown
         self.original_permissions = defaultdict(dict)
-        self.raid_monitor.start()
+        self.original_role_permissions: Dict[int, discord.Permissions] = {}
+        self.lockdown_progress: Dict[int, LockdownProgress] = {}
+        self.restore_progress: Dict[int, LockdownProgress] = {}
+        # Banimentos automáticos segurados por RAID_AUTOBAN_DEFER_SECONDS (servidor -> membro) para sair em um bulk_ban só
+        self.deferred_bans: Dict[int, Dict[int, discord.Member]] = {}
+        self.flush_tasks: Dict[int, asyncio.Task] = {}
 
-    def cog_unload(self):
-        self.raid_monitor.cancel()
+    async def cog_load(self):
+        # No desligamento a fila de moderação fecha antes deste cog: ela pede os banimentos segurados antes
+        moderation_queue.close_hooks.append(self.flush_all_bans)
 
-    @tasks.loop(seconds=RAID_TIME_WINDOW)
-    async def raid_monitor(self):
-        now = datetime.utcnow()
-        for guild in self.bot.guilds:
-            if not self.bot.get_guild(guild.id): continue # Ignora se o bot não está mais no servidor
-            
-            # Limpa os timestamps de entrada antigos
-            self.join_times[guild.id] = [
-                t for t in self.join_times[guild.id]
-                if (now - t) < timedelta(seconds=RAID_TIME_WINDOW)
-            ]
-            
-            # Verifica se um raid está acontecendo e ativa o lockdown se necessário
-            if len(self.join_times[guild.id]) >= RAID_JOIN_THRESHOLD and not self.lockdown_active[guild.id]:
-                await self.activate_lockdown(guild)
+    async def cog_unload(self):
+        if self.flush_all_bans in moderation_queue.close_hooks:
+            moderation_queue.close_hooks.remove(self.flush_all_bans)
+        self.flush_all_bans()
+
+    def flush_all_bans(self):
+        """Manda para a fila todos os banimentos segurados (eles não se perdem no desligamento)."""
+        for guild_id in list(self.deferred_bans):
+            members = self.take_deferred_bans(guild_id)
+            if members:
+                self.submit_bans(next(iter(members.values())).guild, members.values(), AUTOBAN_REASON, PRIORITY_RAID)
+
+    def record_join(self, guild_id: int, now: float) -> bool:
+        """Registra uma entrada e diz se ela completou RAID_JOIN_THRESHOLD entradas dentro de RAID_TIME_WINDOW.
+
+        Só as últimas RAID_JOIN_THRESHOLD entradas importam, então o deque tem tamanho fixo e cada
+        entrada custa O(1); servidores sem entradas não são visitados por nenhum loop.
+        """
+        joins = self.join_times.get(guild_id)
+        if joins is None:
+            joins = self.join_times[guild_id] = deque(maxlen=RAID_JOIN_THRESHOLD)
+        joins.append(now)
+        return len(joins) == RAID_JOIN_THRESHOLD and now - joins[0] < RAID_TIME_WINDOW
+
+    def recent_joins(self, guild_id: int) -> int:
+        now = time.monotonic()
+        return sum(1 for t in self.join_times.get(guild_id, ()) if now - t < RAID_TIME_WINDOW)
+
+    def defer_ban(self, member: discord.Member):
+        """Segura o banimento automático para juntá-lo aos das próximas entradas em um único bulk_ban."""
+        pending = self.deferred_bans.setdefault(member.guild.id, {})
+        pending[member.id] = member
+        if len(pending) >= MODERATION_BULK_BAN_SIZE:
+            self.flush_bans(member.guild)
+        elif member.guild.id not in self.flush_tasks:
+            self.flush_tasks[member.guild.id] = asyncio.create_task(self.flush_later(member.guild))
+
+    async def flush_later(self, guild: discord.Guild):
+        await asyncio.sleep(RAID_AUTOBAN_DEFER_SECONDS)
+        self.flush_bans(guild)
+
+    def take_deferred_bans(self, guild_id: int) -> Dict[int, discord.Member]:
+        task = self.flush_tasks.pop(guild_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        return self.deferred_bans.pop(guild_id, {})
+
+    def flush_bans(self, guild: discord.Guild):
+        members = self.take_deferred_bans(guild.id)
+        if members:
+            self.submit_bans(guild, members.values(), AUTOBAN_REASON, PRIORITY_RAID)
+            logging.warning(f"🚫 Anti-Raid: {len(members)} banimento(s) automático(s) por conta nova enviados em lote em '{guild.name}'.")
+
+    def submit_bans(self, guild: discord.Guild, members, reason: str, priority: int) -> List[ModAction]:
+        # Mesmo servidor e mesmo motivo: a fila junta tudo em chamadas de bulk_ban de até MODERATION_BULK_BAN_SIZE
+        return [moderation_queue.ban(guild, member, reason=reason, priority=priority) for member in members]
+
+    def purge_candidates(self, guild: discord.Guild, minutes: int, max_account_age_days: Optional[int],
+                         only_default_avatar: bool) -> List[discord.Member]:
+        """Membros que entraram nos últimos `minutes` minutos e que o bot pode banir com segurança."""
+        now = discord.utils.utcnow()
+        cutoff = now - timedelta(minutes=minutes)
+        max_age = timedelta(days=max_account_age_days) if max_account_age_days is not None else None
+        me = guild.me
+        candidates = []
+        for member in guild.members:
+            if not member.joined_at or member.joined_at < cutoff:
+                continue
+            if member.bot or member.id in WHITELIST or member.id == guild.owner_id:
+                continue
+            # Nunca toca na equipe nem em quem está acima (ou no mesmo nível) do cargo do bot
+            if member.top_role >= me.top_role or member.guild_permissions.manage_messages:
+                continue
+            if max_age is not None and now - member.created_at > max_age:
+                continue
+            if only_default_avatar and member.avatar is not None:
+                continue
+            candidates.append(member)
+        return candidates
+
+    async def purge(self, guild: discord.Guild, members: List[discord.Member], reason: str, progress: LockdownProgress):
+        """Bane os membros pela fila de moderação (em lotes de bulk_ban) e acompanha o resultado em `progress`."""
+        # Os banimentos automáticos ainda segurados entram nos mesmos lotes
+        targets = {member.id: member for member in members}
+        targets.update(self.take_deferred_bans(guild.id))
+        actions = {action.done: action for action in self.submit_bans(guild, targets.values(), reason, PRIORITY_MANUAL)}
+        progress.total = len(actions)
+        pending = set(actions)
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            progress.done += len(finished)
+            progress.failed += sum(1 for future in finished if not future.result())
+        progress.finish()
+        logging.warning(f"🔨 Anti-Raid: limpeza em '{guild.name}' baniu {progress.done - progress.failed}/{progress.total} membro(s) em {progress.elapsed:.2f}s.")
+        return progress
 
-    @raid_monitor.before_loop
-    async def before_raid_monitor(self):
-        await self.bot.wait_until_ready()
+    async def run_bounded(self, channels: List[discord.abc.GuildChannel], action, progress: LockdownProgress, verb: str):
+        """Aplica `action` em todos os canais, no máximo RAID_LOCKDOWN_CONCURRENCY ao mesmo tempo.
 
-    async def activate_lockdown(self, guild: discord.Guild, manual_author: discord.User = None):
-        """Ativa o modo de lockdown no servidor."""
+        A concorrência limitada mantém o bot longe do rate limit global; os limites por canal
+        (cada canal tem o seu bucket) são respeitados pelo próprio cliente HTTP do discord.py.
+        """
+        semaphore = asyncio.Semaphore(RAID_LOCKDOWN_CONCURRENCY)
+
+        async def run(channel):
+            async with semaphore:
+                try:
+                    await action(channel)
+                except discord.Forbidden:
+                    progress.failed += 1
+                    logging.error(f"Anti-Raid: Sem permissão para {verb} o canal #{channel.name} em '{channel.guild.name}'.")
+                except Exception as e:
+                    progress.failed += 1
+                    logging.error(f"Anti-Raid: Erro ao {verb} o canal #{channel.name}:", exc_info=e)
+                finally:
+                    progress.done += 1
+
+        await asyncio.gather(*(run(channel) for channel in channels))
+
+    async def activate_lockdown(self, guild: discord.Guild, manual_author: discord.User = None, mode: str = RAID_LOCKDOWN_MODE,
+                                detected_at: Optional[float] = None) -> LockdownProgress:
+        """Ativa o modo de lockdown no servidor.
+
+        Modo "channels" (padrão): sobrescreve as permissões do @everyone em todos os canais de
+        texto, em paralelo. Modo "role": tira o "Enviar Mensagens" do cargo @everyone (uma única
+        chamada) e só mexe nos canais que liberam o envio explicitamente para o @everyone; membros
+        com outro cargo que dá "Enviar Mensagens" no servidor continuam podendo falar.
+        """
         self.lockdown_active[guild.id] = True
+        progress = self.lockdown_progress[guild.id] = LockdownProgress(mode, detected_at)
         log_reason = f"RAID DETECTADO AUTOMATICAMENTE" if not manual_author else f"Lockdown ativado manualmente por {manual_author}"
         logging.critical(f"🚨 {log_reason} NO SERVIDOR '{guild.name}'!")
 
-        for channel in guild.text_channels:
-            try:
-                # Salva as permissões atuais antes de alterá-las
-                self.original_permissions[guild.id][channel.id] = channel.overwrites_for(guild.default_role)
-                overwrite = discord.PermissionOverwrite(send_messages=False)
-                await channel.set_permissions(guild.default_role, overwrite=overwrite, reason=log_reason)
-            except discord.Forbidden:
-                logging.error(f"Anti-Raid: Sem permissão para alterar permissões no canal #{channel.name} em '{guild.name}'.")
-            except Exception as e:
-                logging.error(f"Anti-Raid: Erro ao bloquear o canal #{channel.name}:", exc_info=e)
-
-    async def deactivate_lockdown(self, guild: discord.Guild, manual_author: discord.User = None):
+        everyone = guild.default_role
+        channels = guild.text_channels
+        if mode == "role":
+            original = everyone.permissions
+            if original.send_messages or original.send_messages_in_threads:
+                locked = discord.Permissions(original.value)
+                locked.update(send_messages=False, send_messages_in_threads=False)
+                try:
+                    await everyone.edit(permissions=locked, reason=log_reason)
+                    self.original_role_permissions[guild.id] = original
+                except discord.HTTPException as e:
+                    # Sem "Gerenciar Cargos" (ou o cargo do bot abaixo do necessário): volta para o modo canal por canal
+                    logging.error(f"Anti-Raid: não foi possível editar o @everyone em '{guild.name}' ({e}), usando o lockdown por canal.")
+                    mode = progress.mode = "channels"
+            if mode == "role":
+                # Permissões explícitas no canal vencem as do cargo: só esses canais precisam ser sobrescritos
+                channels = [channel for channel in channels
+                            if channel.overwrites_for(everyone).send_messages or channel.overwrites_for(everyone).send_messages_in_threads]
+        progress.total = len(channels)
+
+        async def lock(channel: discord.TextChannel):
+            # Salva as permissões atuais antes de alterá-las
+            self.original_permissions[guild.id][channel.id] = channel.overwrites_for(everyone)
+            # Mantém o resto da sobrescrita (ex: canais ocultos continuam ocultos)
+            overwrite = channel.overwrites_for(everyone)
+            overwrite.update(send_messages=False, send_messages_in_threads=False)
+            await channel.set_permissions(everyone, overwrite=overwrite, reason=log_reason)
+
+        await self.run_bounded(channels, lock, progress, "bloquear")
+        progress.finish()
+        metrics.observe("stwart_lockdown_seconds", "mode", progress.mode, progress.elapsed, "Tempo entre a detecção e o lockdown completo.")
+        logging.critical(f"🔒 Lockdown ({progress.mode}) concluído em '{guild.name}' em {progress.elapsed:.2f}s: {progress.done - progress.failed}/{progress.total} canal(is) bloqueado(s).")
+        return progress
+
+    async def deactivate_lockdown(self, guild: discord.Guild, manual_author: discord.User = None) -> Optional[LockdownProgress]:
         """Desativa o modo de lockdown no servidor."""
-        if not self.lockdown_active[guild.id]: return
+        if not self.lockdown_active[guild.id]: return None
 
         self.lockdown_active[guild.id] = False
         log_reason = f"Lockdown desativado manualmente por {manual_author}" if manual_author else "Lockdown desativado"
         logging.info(f"🔓 {log_reason} no servidor '{guild.name}'.")
 
-        for channel_id, original_overwrite in self.original_permissions[guild.id].items():
-            channel = guild.get_channel(channel_id)
-            if channel:
+        original_role = self.original_role_permissions.pop(guild.id, None)
+        progress = self.restore_progress[guild.id] = LockdownProgress("restore")
+        if original_role is not None:
+            try:
+                await guild.default_role.edit(permissions=original_role, reason=log_reason)
+            except discord.HTTPException as e:
+                logging.error(f"Anti-Raid: não foi possível restaurar o @everyone em '{guild.name}': {e}")
+
+        saved = self.original_permissions.pop(guild.id, {})
+        channels = [channel for channel in (guild.get_channel(channel_id) for channel_id in saved) if channel]
+        progress.total = len(channels)
+
+        async def restore(channel: discord.TextChannel):
+            original_overwrite = saved[channel.id]
+            # Uma sobrescrita vazia antes do lockdown volta a não existir
+            await channel.set_permissions(guild.default_role, overwrite=None if original_overwrite.is_empty() else original_overwrite, reason=log_reason)
+
+        await self.run_bounded(channels, restore, progress, "restaurar")
+        progress.finish()
+        return progress
+
+    async def report_progress(self, interaction: discord.Interaction, task: asyncio.Task, progress_for, title: str,
+                              render_result) -> LockdownProgress:
+        """Acompanha um lockdown em andamento editando a resposta (efêmera) do comando, até o resultado final."""
+        message = await interaction.followup.send(embed=create_embed(title, "Iniciando...", discord.Color.orange()), ephemeral=True, wait=True)
+        while not task.done():
+            await asyncio.wait({task}, timeout=RAID_LOCKDOWN_PROGRESS_INTERVAL)
+            progress = progress_for()
+            if not task.done() and progress:
                 try:
-                    await channel.set_permissions(guild.default_role, overwrite=original_overwrite, reason=log_reason)
-                except discord.Forbidden:
-                     logging.error(f"Anti-Raid: Sem permissão para restaurar permissões no canal #{channel.name} em '{guild.name}'.")
-                except Exception as e:
-                    logging.error(f"Anti-Raid: Erro ao restaurar o canal #{channel.name}:", exc_info=e)
-        
-        self.original_permissions[guild.id].clear()
+                    await message.edit(embed=create_embed(title, f"⏳ {progress} canais ({progress.elapsed:.1f}s)", discord.Color.orange()))
+                except discord.HTTPException:
+                    pass
+        progress = await task
+        await message.edit(embed=render_result(progress))
+        return progress
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.join_times.pop(guild.id, None)
+        self.lockdown_progress.pop(guild.id, None)
+        self.restore_progress.pop(guild.id, None)
+        self.original_role_permissions.pop(guild.id, None)
+        self.take_deferred_bans(guild.id)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -90,25 +338,41 @@ class AntiRaid(commands.Cog):
 
         account_age = discord.utils.utcnow() - member.created_at
         if account_age < timedelta(days=MIN_ACCOUNT_AGE_DAYS):
-            try:
-                await member.ban(reason=f"Conta muito nova (criada há menos de {MIN_ACCOUNT_AGE_DAYS} dias)")
-                logging.warning(f"🚫 Anti-Raid: Membro {member} banido automaticamente por conta nova em '{member.guild.name}'.")
-            except discord.Forbidden:
-                logging.error(f"Anti-Raid: Sem permissão para banir {member} por conta nova em '{member.guild.name}'.")
+            # Só enfileira: a fila de moderação junta os banimentos de uma raid em bulk_ban
+            if RAID_AUTOBAN_DEFER_SECONDS > 0:
+                self.defer_ban(member)
+            else:
+                moderation_queue.ban(member.guild, member, reason=AUTOBAN_REASON, priority=PRIORITY_RAID)
+            logging.warning(f"🚫 Anti-Raid: Membro {member} enfileirado para banimento automático por conta nova em '{member.guild.name}'.")
 
-        self.join_times[member.guild.id].append(discord.utils.utcnow())
+        # O lockdown começa na própria entrada que cruza o limite, sem esperar um loop de verificação
+        now = time.monotonic()
+        if self.record_join(member.guild.id, now) and not self.lockdown_active[member.guild.id]:
+            await self.activate_lockdown(member.guild, detected_at=now)
     
     # --- Grupo de Comandos para Lockdown ---
     lockdown = app_commands.Group(name="lockdown", description="Gerencia o modo de lockdown do servidor.", default_permissions=discord.Permissions(manage_guild=True))
 
     @lockdown.command(name="on", description="Ativa o lockdown manualmente, bloqueando o envio de mensagens.")
-    async def lockdown_on(self, interaction: discord.Interaction):
+    @app_commands.describe(modo="Como bloquear: canal por canal (completo) ou pelo cargo @everyone (rápido, não bloqueia outros cargos).")
+    @app_commands.choices(modo=[
+        app_commands.Choice(name="Canal por canal (completo)", value="channels"),
+        app_commands.Choice(name="Cargo @everyone (rápido)", value="role"),
+    ])
+    async def lockdown_on(self, interaction: discord.Interaction, modo: Optional[app_commands.Choice[str]] = None):
         if self.lockdown_active[interaction.guild.id]:
             return await interaction.response.send_message(embed=create_embed("⚠️ Atenção", "O lockdown já está ativo.", discord.Color.orange()), ephemeral=True)
         
         await interaction.response.defer(ephemeral=True)
-        await self.activate_lockdown(interaction.guild, manual_author=interaction.user)
-        await interaction.followup.send(embed=create_embed("🔒 Lockdown Ativado", "O envio de mensagens foi bloqueado para membros comuns em todos os canais de texto.", discord.Color.red()))
+        mode = modo.value if modo else RAID_LOCKDOWN_MODE
+        task = asyncio.create_task(self.activate_lockdown(interaction.guild, manual_author=interaction.user, mode=mode))
+        await self.report_progress(interaction, task, lambda: self.lockdown_progress.get(interaction.guild.id), "🔒 Ativando Lockdown",
+                                   lambda progress: create_embed(
+            "🔒 Lockdown Ativado",
+            f"O envio de mensagens foi bloqueado para membros comuns {LOCKDOWN_SCOPES[progress.mode]}.\n"
+            f"**Canais alterados:** {progress}{f' ({progress.failed} com erro)' if progress.failed else ''}\n**Tempo:** {progress.elapsed:.2f}s",
+            discord.Color.red()
+        ))
 
     @lockdown.command(name="off", description="Desativa o lockdown manualmente, restaurando as permissões.")
     async def lockdown_off(self, interaction: discord.Interaction):
@@ -116,19 +380,57 @@ class AntiRaid(commands.Cog):
             return await interaction.response.send_message(embed=create_embed("⚠️ Atenção", "O lockdown não está ativo.", discord.Color.orange()), ephemeral=True)
             
         await interaction.response.defer(ephemeral=True)
-        await self.deactivate_lockdown(interaction.guild, manual_author=interaction.user)
-        await interaction.followup.send(embed=create_embed("🔓 Lockdown Desativado", "As permissões dos canais foram restauradas.", discord.Color.green()))
+        task = asyncio.create_task(self.deactivate_lockdown(interaction.guild, manual_author=interaction.user))
+        await self.report_progress(interaction, task, lambda: self.restore_progress.get(interaction.guild.id), "🔓 Desativando Lockdown",
+                                   lambda progress: create_embed(
+            "🔓 Lockdown Desativado",
+            f"As permissões foram restauradas.\n**Canais restaurados:** {progress}\n**Tempo:** {progress.elapsed:.2f}s",
+            discord.Color.green()
+        ))
+
+    # --- Grupo de Comandos para Limpeza de Raids ---
+    raid = app_commands.Group(name="raid", description="Ferramentas para lidar com uma raid.", default_permissions=discord.Permissions(ban_members=True))
+
+    @raid.command(name="purge", description="Bane de uma vez os membros que entraram durante a raid.")
+    @app_commands.describe(
+        minutos="Bane quem entrou nos últimos N minutos.",
+        idade_conta_dias="Só bane contas criadas há no máximo N dias.",
+        sem_avatar="Só bane contas sem foto de perfil."
+    )
+    async def raid_purge(self, interaction: discord.Interaction, minutos: app_commands.Range[int, 1, RAID_PURGE_MAX_MINUTES],
+                         idade_conta_dias: Optional[app_commands.Range[int, 0, 3650]] = None, sem_avatar: bool = False):
+        members = self.purge_candidates(interaction.guild, minutos, idade_conta_dias, sem_avatar)
+        if not members:
+            return await interaction.response.send_message(embed=create_embed("🔎 Nada a Fazer", "Nenhum membro encontrado com esses filtros.", discord.Color.blue()), ephemeral=True)
+
+        filters = [f"entrou nos últimos **{minutos}** minuto(s)"]
+        if idade_conta_dias is not None:
+            filters.append(f"conta com até **{idade_conta_dias}** dia(s)")
+        if sem_avatar:
+            filters.append("sem foto de perfil")
+        sample = ", ".join(member.mention for member in members[:10]) + (f" e mais {len(members) - 10}" if len(members) > 10 else "")
+        reason = f"Limpeza de raid por {interaction.user} ({minutos} min)"
+        embed = create_embed(
+            "⚠️ Confirmar Limpeza da Raid",
+            f"**{len(members)}** membro(s) serão banidos ({', '.join(filters)}).\n{sample}",
+            discord.Color.orange()
+        )
+        await interaction.response.send_message(embed=embed, view=PurgeConfirmView(self, interaction.user, members, reason), ephemeral=True)
 
     @app_commands.command(name="raidstatus", description="Mostra o status do sistema anti-raid.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def raidstatus(self, interaction: discord.Interaction):
         guild = interaction.guild
-        recent_joins = len([t for t in self.join_times[guild.id] if (discord.utils.utcnow() - t) < timedelta(seconds=RAID_TIME_WINDOW)])
+        recent_joins = self.recent_joins(guild.id)
         is_lockdown = self.lockdown_active[guild.id]
 
         embed = create_embed("🛡️ Status do Sistema Anti-Raid", color=discord.Color.blue())
         embed.add_field(name="Lockdown Ativo?", value=f"`{'Sim' if is_lockdown else 'Não'}`", inline=True)
         embed.add_field(name="Entradas Recentes", value=f"`{recent_joins} / {RAID_JOIN_THRESHOLD}`", inline=True)
+        last = self.lockdown_progress.get(guild.id)
+        if last:
+            status = f"{last.elapsed:.2f}s" if last.finished_at else f"em andamento, {last}"
+            embed.add_field(name="Último Lockdown", value=f"`{LOCKDOWN_MODE_LABELS.get(last.mode, last.mode)} • {status}`", inline=True)
         embed.set_footer(text=f"Janela de tempo: {RAID_TIME_WINDOW} segundos")
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
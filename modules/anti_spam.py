@@ -1,18 +1,356 @@
 import discord
+import asyncio
 import logging
-from discord.ext import commands
-from discord.utils import utcnow
+import math
+import re
+import time
+import unicodedata
+from discord.ext import commands, tasks
 from datetime import timedelta
-from collections import defaultdict
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Set, Tuple
 from modules.utils import create_embed
+from modules.metrics import metrics
+from modules.moderation_queue import moderation_queue, PRIORITY_SPAM
 # CORREÇÃO: Importando a variável com o nome correto
-from config.settings import SPAM_MAX_REPEATS, SPAM_MUTE_MINUTES, WHITELIST
+from config.settings import (
+    SPAM_MAX_REPEATS,
+    SPAM_MUTE_MINUTES,
+    SPAM_REPEAT_WINDOW,
+    SPAM_FLOOD_MAX_MESSAGES,
+    SPAM_FLOOD_WINDOW,
+    SPAM_TRACKER_MAX_KEYS,
+    SPAM_TRACKER_IDLE_TTL,
+    SPAM_WAVE_MIN_AUTHORS,
+    SPAM_WAVE_WINDOW,
+    SPAM_WAVE_MIN_SIMILARITY,
+    SPAM_WAVE_MIN_LENGTH,
+    SPAM_WAVE_MAX_ENTRIES,
+    SPAM_WAVE_TEXT_MIN_AUTHORS,
+    SPAM_WAVE_TEXT_MIN_SIMILARITY,
+    SPAM_WAVE_TEXT_MIN_LENGTH,
+    SPAM_WAVE_TEXT_MIN_ENTROPY,
+    SPAM_WAVE_SAFE_DOMAINS,
+    WHITELIST
+)
+
+class SpamState:
+    """Estado compacto de um (servidor, autor): dois contadores de janela e o hash da última mensagem."""
+    __slots__ = ("window_start", "count", "previous_count", "content_hash", "repeats", "repeat_since", "last_seen")
+
+    def __init__(self, now: float):
+        self.window_start = now
+        self.count = 0
+        self.previous_count = 0
+        self.content_hash = 0
+        self.repeats = 0
+        self.repeat_since = now
+        self.last_seen = now
+
+def packed_key(key: Tuple[int, int]) -> int:
+    """Junta (servidor, autor) em um int: os snowflakes do Discord cabem em 64 bits."""
+    guild_id, author_id = key
+    return guild_id << 64 | author_id
+
+class SpamLimiter:
+    """Detector de spam por janela deslizante, com memória limitada.
+
+    Flood: mais de SPAM_FLOOD_MAX_MESSAGES mensagens (quaisquer) em SPAM_FLOOD_WINDOW segundos, estimadas
+    pelo contador de janela deslizante (janela atual + fração da anterior), sem guardar um horário por
+    mensagem. Repetição: SPAM_MAX_REPEATS mensagens iguais seguidas dentro de SPAM_REPEAT_WINDOW segundos.
+
+    As chaves ficam em ordem de última atividade, então remover as ociosas (TTL) e as excedentes
+    (SPAM_TRACKER_MAX_KEYS) é só tirar do começo do OrderedDict. O par (servidor, autor) é guardado
+    como um único int (packed_key), que ocupa bem menos que a tupla com dois ints.
+    """
+    def __init__(self, max_messages: int = SPAM_FLOOD_MAX_MESSAGES, window: float = SPAM_FLOOD_WINDOW,
+                 max_repeats: int = SPAM_MAX_REPEATS, repeat_window: float = SPAM_REPEAT_WINDOW,
+                 max_keys: int = SPAM_TRACKER_MAX_KEYS, idle_ttl: float = SPAM_TRACKER_IDLE_TTL):
+        self.max_messages = max_messages
+        self.window = window
+        self.max_repeats = max_repeats
+        self.repeat_window = repeat_window
+        self.max_keys = max_keys
+        # Um autor ocioso por mais tempo que as duas janelas não tem mais nada a contar
+        self.idle_ttl = max(idle_ttl, window * 2, repeat_window)
+        self.states: "OrderedDict[int, SpamState]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def hit(self, key: Tuple[int, int], content: str, now: Optional[float] = None) -> Optional[str]:
+        """Registra uma mensagem. Retorna "flood" ou "repeat" se o limite foi atingido, senão None."""
+        now = time.monotonic() if now is None else now
+        key = packed_key(key)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = SpamState(now)
+            if len(self.states) > self.max_keys:
+                self.states.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.states.move_to_end(key)
+        state.last_seen = now
+
+        # Janela deslizante aproximada: gira as janelas fixas e pondera a anterior pelo tempo que ainda cobre
+        elapsed = now - state.window_start
+        if elapsed >= self.window:
+            state.previous_count = state.count if elapsed < self.window * 2 else 0
+            state.window_start = now - (elapsed % self.window)
+            state.count = 0
+            elapsed = now - state.window_start
+        state.count += 1
+        estimate = state.previous_count * (1 - elapsed / self.window) + state.count
+        if estimate > self.max_messages:
+            return "flood"
+
+        content_hash = hash(content.casefold())
+        if content_hash == state.content_hash and now - state.repeat_since <= self.repeat_window:
+            state.repeats += 1
+        else:
+            state.content_hash = content_hash
+            state.repeats = 1
+            state.repeat_since = now
+        if state.repeats >= self.max_repeats:
+            return "repeat"
+        return None
+
+    def reset(self, key: Tuple[int, int]):
+        self.states.pop(packed_key(key), None)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Remove os autores sem mensagens há mais de idle_ttl segundos."""
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        removed = 0
+        while self.states:
+            key, state = next(iter(self.states.items()))
+            if state.last_seen > cutoff:
+                break
+            self.states.popitem(last=False)
+            removed += 1
+        self.evicted += removed
+        return removed
+
+# --- Impressões digitais (MinHash) para detectar a mesma mensagem, com pequenas variações, vinda de várias contas ---
+SHINGLE_SIZE = 4
+SIGNATURE_SIZE = 16                  # Valores da assinatura MinHash (potência de 2)
+LSH_ROWS = 2                         # Valores por faixa LSH: 8 faixas de 2 valores
+LSH_BANDS = SIGNATURE_SIZE // LSH_ROWS
+BUCKET_SCAN_LIMIT = 32               # Entradas mais recentes comparadas por bucket (limita o custo durante uma onda)
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_EMPTY = 1 << 64
+_URL = re.compile(r"https?://(?:www\.)?(\S+)")
+_INVITE = re.compile(r"(?:discord(?:app)?\.com/invite|discord\.gg)/[\w-]+", re.IGNORECASE)
+_LINK_HOST = re.compile(r"https?://([^/\s?#:]+)", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_content(text: str) -> str:
+    """Reduz as variações comuns entre cópias de um spam: caixa, acentos, números e o esquema dos links."""
+    text = text.casefold()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    # O link continua inteiro: links diferentes (ex: músicas diferentes do YouTube) não podem parecer iguais
+    text = _URL.sub(lambda match: f" {match.group(1)} ", text)
+    text = _DIGITS.sub("0", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def entropy(text: str) -> float:
+    """Entropia de Shannon (bits por caractere): baixa em "kkkkkk" e "hahaha", alta em texto variado."""
+    counts = Counter(text)
+    total = len(text)
+    return -sum(n / total * math.log2(n / total) for n in counts.values())
+
+def is_safe_domain(host: str) -> bool:
+    """Domínios de mídia que a comunidade compartilha o tempo todo (YouTube, Spotify, GIFs...)."""
+    host = host.lower()
+    return any(host == domain or host.endswith("." + domain) for domain in SPAM_WAVE_SAFE_DOMAINS)
+
+def wave_kind(content: str) -> Optional[str]:
+    """Classifica a mensagem para a detecção de ondas: "link", "text" ou None (nunca pune).
+
+    Ondas com convites ou links (fora de SPAM_WAVE_SAFE_DOMAINS) são o spam de verdade e usam os
+    limites normais. Texto puro, ou com links de mídia comuns, só conta se for longo e variado, e
+    precisa de mais contas e cópias mais parecidas: risadas, parabéns e músicas compartilhadas
+    pelo chat não podem silenciar ninguém.
+    """
+    if _INVITE.search(content) or any(not is_safe_domain(host) for host in _LINK_HOST.findall(content)):
+        return "link"
+    text = normalize_content(content)
+    if len(text) >= SPAM_WAVE_TEXT_MIN_LENGTH and entropy(text) >= SPAM_WAVE_TEXT_MIN_ENTROPY:
+        return "text"
+    return None
+
+WAVE_THRESHOLDS = {
+    "link": (SPAM_WAVE_MIN_AUTHORS, SPAM_WAVE_MIN_SIMILARITY),
+    "text": (SPAM_WAVE_TEXT_MIN_AUTHORS, SPAM_WAVE_TEXT_MIN_SIMILARITY),
+}
+
+def minhash(text: str) -> Optional[Tuple[int, ...]]:
+    """Assinatura MinHash dos shingles de caracteres do texto (None se ele for curto demais).
+
+    Usa one-permutation hashing: cada shingle é hasheado uma única vez e cai em um dos
+    SIGNATURE_SIZE compartimentos, que guardam o menor valor visto. A fração de posições iguais
+    entre duas assinaturas estima a similaridade de Jaccard entre as mensagens.
+    """
+    text = normalize_content(text)
+    if len(text) < SPAM_WAVE_MIN_LENGTH:
+        return None
+    signature = [_EMPTY] * SIGNATURE_SIZE
+    for i in range(len(text) - SHINGLE_SIZE + 1):
+        h = hash(text[i:i + SHINGLE_SIZE]) & 0xFFFFFFFFFFFFFFFF
+        slot, value = h & (SIGNATURE_SIZE - 1), h >> _BIN_BITS
+        if value < signature[slot]:
+            signature[slot] = value
+    # Compartimentos vazios copiam o próximo preenchido (densificação), para textos curtos continuarem comparáveis
+    for slot in range(SIGNATURE_SIZE):
+        if signature[slot] == _EMPTY:
+            for offset in range(1, SIGNATURE_SIZE):
+                borrowed = signature[(slot + offset) % SIGNATURE_SIZE]
+                if borrowed != _EMPTY:
+                    signature[slot] = borrowed + offset
+                    break
+    return tuple(signature)
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+class FingerprintEntry:
+    __slots__ = ("timestamp", "signature", "author_id", "flagged")
+
+    def __init__(self, timestamp: float, signature: Tuple[int, ...], author_id: int):
+        self.timestamp = timestamp
+        self.signature = signature
+        self.author_id = author_id
+        self.flagged = False
+
+class FingerprintIndex:
+    """Índice móvel das impressões das mensagens recentes de um servidor, com buckets LSH.
+
+    A assinatura MinHash é dividida em LSH_BANDS faixas e cada faixa vira a chave de um bucket: só
+    mensagens que compartilham ao menos uma faixa inteira são comparadas (com 8 faixas de 2 valores,
+    pares com similaridade 0.5 colidem ~90% das vezes e pares sem relação quase nunca).
+    Durante uma onda os buckets dela enchem de cópias, então só as BUCKET_SCAN_LIMIT entradas mais
+    recentes de cada bucket são comparadas: o custo por mensagem fica limitado a
+    LSH_BANDS * BUCKET_SCAN_LIMIT comparações, qualquer que seja o tamanho da onda.
+    Entradas saem em ordem de chegada (por idade ou pelo limite de tamanho), sempre do início
+    de cada bucket, então a remoção é O(1).
+    """
+    def __init__(self, window: float = SPAM_WAVE_WINDOW, max_entries: int = SPAM_WAVE_MAX_ENTRIES):
+        self.window = window
+        self.max_entries = max_entries
+        self.entries: Deque[FingerprintEntry] = deque()
+        self.buckets: Dict[int, Deque[FingerprintEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def bands(signature: Tuple[int, ...]) -> List[int]:
+        return [hash((band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])) for band in range(LSH_BANDS)]
+
+    def _pop_oldest(self):
+        entry = self.entries.popleft()
+        for band_key in self.bands(entry.signature):
+            bucket = self.buckets[band_key]
+            bucket.popleft()
+            if not bucket:
+                del self.buckets[band_key]
+
+    def expire(self, now: float):
+        cutoff = now - self.window
+        while self.entries and self.entries[0].timestamp < cutoff:
+            self._pop_oldest()
+
+    def add(self, author_id: int, signature: Tuple[int, ...], now: float, min_similarity: float = SPAM_WAVE_MIN_SIMILARITY) -> List[FingerprintEntry]:
+        """Indexa a mensagem e retorna as entradas recentes quase idênticas a ela (incluindo ela mesma)."""
+        self.expire(now)
+        entry = FingerprintEntry(now, signature, author_id)
+        matches = [entry]
+        seen: Set[int] = {id(entry)}
+        for band_key in self.bands(signature):
+            bucket = self.buckets.get(band_key)
+            if bucket is None:
+                bucket = self.buckets[band_key] = deque()
+            for other in islice(reversed(bucket), BUCKET_SCAN_LIMIT):
+                if id(other) not in seen and similarity(other.signature, signature) >= min_similarity:
+                    seen.add(id(other))
+                    matches.append(other)
+            bucket.append(entry)
+        self.entries.append(entry)
+        if len(self.entries) > self.max_entries:
+            self._pop_oldest()
+        return matches
+
+class SpamWaveDetector:
+    """Detecta ondas de spam coordenado: a mesma mensagem (com variações) enviada por várias contas."""
+    def __init__(self, window: float = SPAM_WAVE_WINDOW):
+        self.window = window
+        self.indexes: Dict[int, FingerprintIndex] = {}
+
+    def check(self, guild_id: int, author_id: int, content: str, now: Optional[float] = None) -> Set[int]:
+        """Registra a mensagem e retorna os autores da onda ainda não punidos (vazio se não há onda)."""
+        kind = wave_kind(content)
+        if kind is None:
+            return set()
+        signature = minhash(content)
+        if signature is None:
+            return set()
+        min_authors, min_similarity = WAVE_THRESHOLDS[kind]
+        now = time.monotonic() if now is None else now
+        index = self.indexes.get(guild_id)
+        if index is None:
+            index = self.indexes[guild_id] = FingerprintIndex(self.window)
+        matches = index.add(author_id, signature, now, min_similarity)
+        if len({entry.author_id for entry in matches}) < min_authors:
+            return set()
+        pending = {entry.author_id for entry in matches if not entry.flagged}
+        for entry in matches:
+            entry.flagged = True
+        return pending
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Expira as entradas antigas e descarta os índices de servidores sem mensagens recentes."""
+        now = time.monotonic() if now is None else now
+        idle = []
+        for guild_id, index in self.indexes.items():
+            index.expire(now)
+            if not index:
+                idle.append(guild_id)
+        for guild_id in idle:
+            del self.indexes[guild_id]
+        return len(idle)
+
+SPAM_REASONS = {
+    "flood": "por enviar mensagens demais em pouco tempo",
+    "repeat": "por enviar mensagens repetidas",
+}
 
 class AntiSpam(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Tracker agora é um dicionário aninhado por servidor para evitar conflitos
-        self.spam_tracker = defaultdict(dict)
+        # Estado por (servidor, autor), limitado em tamanho e limpo periodicamente
+        self.limiter = SpamLimiter()
+        self.waves = SpamWaveDetector()
+        # Referências aos avisos em andamento (o loop só guarda referências fracas)
+        self.tasks: Set[asyncio.Task] = set()
+        self.evict_idle.start()
+        metrics.gauge("stwart_antispam_tracked_keys", "Autores acompanhados pelo Anti-Spam.", lambda: len(self.limiter))
+
+    async def cog_unload(self):
+        self.evict_idle.cancel()
+        for task in self.tasks:
+            task.cancel()
+        metrics.remove_gauge("stwart_antispam_tracked_keys")
+
+    @tasks.loop(seconds=SPAM_TRACKER_IDLE_TTL)
+    async def evict_idle(self):
+        removed = self.limiter.evict_idle()
+        self.waves.evict_idle()
+        if removed:
+            logging.debug(f"Anti-Spam: {removed} autor(es) ocioso(s) removido(s) do tracker.")
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -24,40 +362,59 @@ class AntiSpam(commands.Cog):
         ):
             return
 
-        guild_id = message.guild.id
-        author_id = message.author.id
-        content = message.content.lower()
-        key = (guild_id, author_id)
-
-        # Atualiza ou cria o tracker para o usuário
-        if key not in self.spam_tracker or self.spam_tracker[key]["content"] != content:
-            self.spam_tracker[key] = {"content": content, "count": 1, "last_message": utcnow()}
-        else:
-            self.spam_tracker[key]["count"] += 1
-            self.spam_tracker[key]["last_message"] = utcnow()
+        key = (message.guild.id, message.author.id)
+        violation = self.limiter.hit(key, message.content)
 
         # Verifica se o limite de spam foi atingido
-        if self.spam_tracker[key]["count"] >= SPAM_MAX_REPEATS:
-            try:
-                # CORREÇÃO: Usando a variável e o cálculo corretos
-                mute_duration = timedelta(minutes=SPAM_MUTE_MINUTES)
-                await message.author.timeout(mute_duration, reason="Spam de mensagens detectado")
-                
-                embed = create_embed(
-                    "🔇 Membro Silenciado por Spam",
-                    f"{message.author.mention} foi silenciado por **{SPAM_MUTE_MINUTES} minutos** por enviar mensagens repetidas.",
-                    discord.Color.orange()
+        if violation:
+            metrics.inc("stwart_antispam_detections_total", "kind", violation, help_text="Detecções do Anti-Spam por tipo.")
+            # Limpa o tracker para este usuário após a punição
+            self.limiter.reset(key)
+            action = self.mute(message.author, "Spam de mensagens detectado")
+            self.announce_later(
+                message.channel, [action], "🔇 Membro Silenciado por Spam",
+                f"{message.author.mention} foi silenciado por **{SPAM_MUTE_MINUTES} minutos** {SPAM_REASONS[violation]}."
+            )
+            return
+
+        wave_authors = self.waves.check(message.guild.id, message.author.id, message.content)
+        if wave_authors:
+            metrics.inc("stwart_antispam_detections_total", "kind", "wave", help_text="Detecções do Anti-Spam por tipo.")
+            members = [message.guild.get_member(author_id) for author_id in wave_authors if author_id not in WHITELIST]
+            actions = [self.mute(member, "Onda de spam coordenado detectada") for member in members if member]
+            if actions:
+                self.announce_later(
+                    message.channel, actions, "🚨 Onda de Spam Detectada",
+                    f"{{count}} conta(s) enviaram a mesma mensagem (com variações) e foram silenciadas por **{SPAM_MUTE_MINUTES} minutos**:\n{{mentions}}"
                 )
-                await message.channel.send(embed=embed)
-                logging.warning(f"🛡️ Anti-Spam: {message.author} mutado por spam em '{message.guild.name}'")
-                
-                # Limpa o tracker para este usuário após a punição
-                self.spam_tracker.pop(key, None)
 
-            except discord.Forbidden:
-                logging.error(f"Anti-Spam: Sem permissão para silenciar {message.author.mention} em '{message.guild.name}'.")
-            except Exception as e:
-                logging.error(f"Anti-Spam: Erro inesperado ao tentar silenciar:", exc_info=e)
+    @staticmethod
+    def mute(member: discord.Member, reason: str):
+        # CORREÇÃO: Usando a variável e o cálculo corretos
+        return moderation_queue.timeout(member, timedelta(minutes=SPAM_MUTE_MINUTES), reason=reason, priority=PRIORITY_SPAM)
+
+    def announce_later(self, channel: discord.TextChannel, actions: list, title: str, description: str):
+        """Agenda o announce sem segurar o listener, guardando a task até ela terminar."""
+        task = asyncio.create_task(self.announce(channel, actions, title, description))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def announce(self, channel: discord.TextChannel, actions: list, title: str, description: str):
+        """Avisa no canal quando os silenciamentos enfileirados forem aplicados (fora do listener)."""
+        results = await asyncio.gather(*(action.wait() for action in actions))
+        muted = [action.target for action, ok in zip(actions, results) if ok]
+        for action, ok in zip(actions, results):
+            if not ok and isinstance(action.error, discord.Forbidden):
+                logging.error(f"Anti-Spam: Sem permissão para silenciar {action.target.mention} em '{channel.guild.name}'.")
+        if not muted:
+            return
+        mentions = ", ".join(member.mention for member in muted)
+        embed = create_embed(title, description.format(count=len(muted), mentions=mentions), discord.Color.orange())
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logging.error(f"Anti-Spam: não foi possível avisar sobre o silenciamento em #{channel.name}: {e}")
+        logging.warning(f"🛡️ Anti-Spam: {len(muted)} membro(s) mutado(s) por spam em '{channel.guild.name}': {', '.join(str(m) for m in muted)}")
 
 async def setup(bot):
-    await bot.add_cog(AntiSpam(bot))
\ No newline at end of file
+    await bot.add_cog(AntiSpam(bot))
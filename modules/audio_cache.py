@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import threading
+import yt_dlp
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set, Tuple
+from modules.metrics import metrics
+from modules.music_resolver import YDL_OPTIONS
+from config.settings import (
+    MUSIC_AUDIO_CACHE_DIR,
+    MUSIC_AUDIO_CACHE_BYTES,
+    MUSIC_AUDIO_CACHE_MIN_PLAYS,
+    MUSIC_AUDIO_CACHE_MAX_TRACK_BYTES,
+    MUSIC_AUDIO_CACHE_MAX_DURATION,
+    MUSIC_CACHE_MEMORY_ENTRIES
+)
+
+# Extensões em que o áudio baixado é Opus (o formato preferido pelo YDL_OPTIONS)
+OPUS_EXTENSIONS = {"webm", "opus", "ogg"}
+
+_download_state = threading.local()
+
+def download_audio(url: str, directory: str, max_bytes: int) -> Optional[str]:
+    """Baixa o áudio de um vídeo para `directory` (bloqueante: rode na thread do AudioFileCache)."""
+    ydl = getattr(_download_state, "ydl", None)
+    if ydl is None:
+        ydl = _download_state.ydl = yt_dlp.YoutubeDL({
+            **YDL_OPTIONS, 'outtmpl': os.path.join(directory, '%(id)s.%(ext)s'), 'max_filesize': max_bytes,
+            # Sem isso o yt_dlp põe a data de upload do vídeo no mtime, e o mtime é a ordem do LRU no load()
+            'updatetime': False
+        })
+    try:
+        info = ydl.extract_info(url, download=True)
+        if 'entries' in info: info = info['entries'][0]
+        path = ydl.prepare_filename(info)
+        # O yt_dlp pula (sem erro) arquivos maiores que max_filesize
+        return path if os.path.exists(path) else None
+    except Exception as e:
+        logging.error(f"Erro ao baixar o áudio de '{url}' para o cache: {e}")
+        return None
+
+class AudioFileCache:
+    """Cache em disco do áudio das músicas mais pedidas, limitado por um orçamento de bytes.
+
+    Uma música só é baixada depois de MUSIC_AUDIO_CACHE_MIN_PLAYS execuções (admissão por frequência,
+    para uma música tocada uma única vez não expulsar as populares), e quando o orçamento estoura saem
+    primeiro os arquivos tocados há mais tempo (LRU). Desativado quando o orçamento é 0.
+    """
+    def __init__(self, directory: str = MUSIC_AUDIO_CACHE_DIR, max_bytes: int = MUSIC_AUDIO_CACHE_BYTES,
+                 min_plays: int = MUSIC_AUDIO_CACHE_MIN_PLAYS, max_track_bytes: int = MUSIC_AUDIO_CACHE_MAX_TRACK_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.max_track_bytes = min(max_track_bytes, max_bytes)
+        # ID do vídeo -> (caminho, tamanho), do menos para o mais recentemente tocado
+        self.files: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self.total_bytes = 0
+        # Quantas vezes cada música (ainda fora do cache) foi tocada; limitado como o cache de resoluções
+        self.play_counts: "OrderedDict[str, int]" = OrderedDict()
+        self.downloading: Set[str] = set()
+        # Referências às tasks de download (o loop só guarda referências fracas)
+        self.tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-cache") if self.enabled else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def load(self):
+        """Indexa os arquivos já baixados, do mais antigo para o mais recente (bloqueante: rode fora do loop)."""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith((".part", ".ytdl")):
+                # Download interrompido (ex: o bot caiu no meio)
+                os.remove(entry.path)
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name.split(".", 1)[0], entry.path, stat.st_size))
+        for _, track_id, path, size in sorted(found):
+            self.files[track_id] = (path, size)
+            self.total_bytes += size
+        self.evict()
+
+    def lookup(self, track_id: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+        """(caminho local, codec) de uma música em cache, ou None."""
+        cached = self.files.get(track_id) if self.enabled and track_id else None
+        if not cached:
+            return None
+        path = cached[0]
+        return path, "opus" if path.rsplit(".", 1)[-1] in OPUS_EXTENSIONS else None
+
+    def record_play(self, song_info: dict) -> bool:
+        """Registra que uma música começou a tocar. Retorna True se ela veio do cache.
+
+        Músicas fora do cache que atingem MUSIC_AUDIO_CACHE_MIN_PLAYS são baixadas em segundo plano.
+        """
+        track_id = song_info.get("id")
+        if not self.enabled or not track_id:
+            return False
+        if track_id in self.files:
+            self.files.move_to_end(track_id)
+            self.hits += 1
+            metrics.inc("stwart_music_audio_cache_total", "result", "hit", help_text="Músicas tocadas com e sem o cache de áudio em disco.")
+            path = self.files[track_id][0]
+            try:
+                # O mtime guarda a ordem do LRU entre reinícios
+                os.utime(path)
+            except OSError:
+                pass
+            return True
+
+        self.misses += 1
+        metrics.inc("stwart_music_audio_cache_total", "result", "miss", help_text="Músicas tocadas com e sem o cache de áudio em disco.")
+        plays = self.play_counts.pop(track_id, 0) + 1
+        self.play_counts[track_id] = plays
+        while len(self.play_counts) > MUSIC_CACHE_MEMORY_ENTRIES * 4:
+            self.play_counts.popitem(last=False)
+
+        duration = song_info.get("duration") or 0
+        if plays >= self.min_plays and track_id not in self.downloading and 0 < duration <= MUSIC_AUDIO_CACHE_MAX_DURATION:
+            self.downloading.add(track_id)
+            task = asyncio.create_task(self.download(track_id, song_info["webpage_url"]))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return False
+
+    async def download(self, track_id: str, webpage_url: str):
+        try:
+            path = await asyncio.get_running_loop().run_in_executor(
+                self.executor, download_audio, webpage_url, self.directory, self.max_track_bytes
+            )
+        except RuntimeError:
+            # Executor encerrado (cog descarregado no meio do download)
+            return
+        finally:
+            self.downloading.discard(track_id)
+        if not path:
+            return
+        size = os.path.getsize(path)
+        self.play_counts.pop(track_id, None)
+        old = self.files.pop(track_id, None)
+        if old:
+            self.total_bytes -= old[1]
+        self.files[track_id] = (path, size)
+        self.total_bytes += size
+        self.evict()
+        logging.info(f"Música: '{track_id}' guardada no cache de áudio ({size / 1_048_576:.1f} MB, {self.total_bytes / 1_048_576:.1f} MB no total).")
+
+    def evict(self):
+        """Apaga os arquivos tocados há mais tempo até o cache caber no orçamento."""
+        while self.total_bytes > self.max_bytes and self.files:
+            track_id, (path, size) = self.files.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                # Um player que ainda esteja lendo o arquivo continua com ele aberto
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"Música: não foi possível apagar '{path}' do cache de áudio: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "files": len(self.files),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "downloading": len(self.downloading),
+        }
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
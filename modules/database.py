@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+# Pragmas aplicados em todas as conexões: WAL permite leituras simultâneas à escrita,
+# e synchronous=NORMAL evita um fsync por transação (seguro em modo WAL).
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -4096",  # ~4 MB por conexão, respeitando o limite de RAM da hospedagem
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Quantidade de statements preparados que cada conexão mantém em cache (o sqlite3 reutiliza pelo texto do SQL)
+STATEMENT_CACHE_SIZE = 128
+
+_STOP = object()
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    """Agenda a entrega do resultado no event loop dono da future, ignorando loops já encerrados."""
+    try:
+        loop.call_soon_threadsafe(_resolve, future, result, error)
+    except RuntimeError:
+        logging.warning("Banco de dados: resultado descartado porque o event loop já foi encerrado.")
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    """Entrega o resultado para a future do event loop (chamado via call_soon_threadsafe)."""
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncSQLite:
+    """Camada de acesso assíncrona ao SQLite: uma thread dedicada para escrita e um pool de conexões de leitura.
+
+    Nenhuma operação roda no event loop: as escritas entram em uma fila consumida pela thread escritora
+    (uma transação por requisição) e as leituras rodam em um pool de threads, cada uma com sua conexão.
+    """
+    def __init__(self, db_path: str, read_pool_size: int = 2, schema: Optional[Callable[[sqlite3.Connection], None]] = None):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.closed = False
+
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA journal_mode = WAL")
+        if schema:
+            # O esquema é criado de forma síncrona na inicialização, antes de qualquer leitura
+            with self._writer_conn:
+                schema(self._writer_conn)
+
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name=f"sqlite-writer:{os.path.basename(db_path)}", daemon=True)
+        self._writer.start()
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(read_pool_size):
+            self._readers.put(self._connect(read_only=True))
+        self._read_executor = ThreadPoolExecutor(max_workers=read_pool_size, thread_name_prefix="sqlite-reader")
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _writer_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is _STOP:
+                break
+            loop, future, func, args = item
+            try:
+                with self._writer_conn:
+                    result = func(self._writer_conn, *args)
+            except BaseException as e:
+                _deliver(loop, future, None, e)
+            else:
+                _deliver(loop, future, result)
+        self._writer_conn.close()
+
+    def _run_read(self, func: Callable, args: tuple) -> Any:
+        conn = self._readers.get()
+        try:
+            return func(conn, *args)
+        finally:
+            self._readers.put(conn)
+
+    @property
+    def write_backlog(self) -> int:
+        """Quantidade de escritas aguardando na fila da thread escritora."""
+        return self._write_queue.qsize()
+
+    async def write(self, func: Callable[..., Any], *args) -> Any:
+        """Executa func(conn, *args) na thread escritora, dentro de uma transação."""
+        if self.closed:
+            raise RuntimeError(f"O banco '{self.db_path}' já foi fechado.")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._write_queue.put((loop, future, func, args))
+        return await future
+
+    async def read(self, func: Callable[..., Any], *args) -> Any:
+        """Executa func(conn, *args) em uma conexão de leitura do pool."""
+        if self.closed:
+            raise RuntimeError(f"O banco '{self.db_path}' já foi fechado.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._run_read, func, args)
+
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        """Executa uma escrita simples e retorna o número de linhas afetadas."""
+        return await self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence]) -> int:
+        return await self.write(lambda conn: conn.executemany(sql, seq_of_params).rowcount)
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def close(self):
+        """Espera as escritas pendentes terminarem e fecha todas as conexões."""
+        if self.closed:
+            return
+        self.closed = True
+        self._write_queue.put(_STOP)
+        await asyncio.to_thread(self._writer.join)
+        await asyncio.to_thread(self._read_executor.shutdown, True)
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        logging.info(f"Banco de dados '{self.db_path}' fechado.")
@@ -1,98 +1,422 @@
 import discord
+import asyncio
 import logging
 import sqlite3
-import os
+import time
 from discord import Embed, app_commands
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
-from typing import List, Tuple
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from modules.utils import create_embed
+from modules.database import AsyncSQLite
+from modules.metrics import metrics
+from config.settings import (
+    ACTIVITY_FLUSH_INTERVAL,
+    ACTIVITY_FLUSH_MAX_KEYS,
+    ACTIVITY_BUCKET_RETENTION_DAYS,
+    ACTIVITY_ROLLUP_RETENTION_MONTHS,
+    ACTIVITY_LEADERBOARD_TTL,
+    ACTIVITY_LEADERBOARD_MAX_ROWS,
+    ACTIVITY_LEADERBOARD_CACHE_GUILDS
+)
+
+# Janelas móveis (em dias UTC, incluindo o dia atual) usadas pelos rankings
+PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+PERIOD_LABELS = {"daily": "Diário", "weekly": "Semanal", "monthly": "Mensal", "total": "Total"}
+LEADERBOARD_PAGE_SIZE = 10
+
+def day_index(moment: datetime) -> int:
+    """Número do dia UTC (ordinal) usado como chave dos buckets diários."""
+    return moment.date().toordinal()
+
+def month_key(day: int) -> int:
+    """Converte um dia ordinal na chave do rollup mensal (ex: 202610)."""
+    d = date.fromordinal(day)
+    return d.year * 100 + d.month
+
+class ActivityBuffer:
+    """Buffer em memória que agrega as mensagens por (guild_id, member_id) antes de gravá-las no banco."""
+    def __init__(self):
+        # (guild_id, member_id, dia) -> [quantidade de mensagens, último horário de atividade]
+        self.pending: Dict[Tuple[int, int, int], list] = {}
+        self.oldest_pending: Optional[float] = None
+        self.last_flush_lag = 0.0
+        self.last_flush_size = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def add(self, guild_id: int, member_id: int, now: datetime) -> int:
+        """Soma uma mensagem ao buffer e retorna a quantidade de entradas pendentes."""
+        # O dia faz parte da chave para que mensagens antes e depois da meia-noite caiam no bucket certo
+        key = (guild_id, member_id, day_index(now))
+        entry = self.pending.get(key)
+        if entry is None:
+            self.pending[key] = [1, now.isoformat()]
+            if self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+        else:
+            entry[0] += 1
+            entry[1] = now.isoformat()
+        return len(self.pending)
+
+    def drain(self) -> List[Tuple[int, int, int, int, str]]:
+        """Esvazia o buffer e retorna as linhas (guild_id, member_id, day, count, last_active) para gravação."""
+        rows = [(guild_id, member_id, day, count, last_active) for (guild_id, member_id, day), (count, last_active) in self.pending.items()]
+        self.last_flush_lag = time.monotonic() - self.oldest_pending if self.oldest_pending is not None else 0.0
+        self.last_flush_size = len(rows)
+        self.pending = {}
+        self.oldest_pending = None
+        return rows
+
+    def restore(self, rows: List[Tuple[int, int, int, int, str]], waited: float):
+        """Devolve ao buffer as linhas de um drain cuja gravação falhou, somando com o que chegou depois."""
+        for guild_id, member_id, day, count, last_active in rows:
+            key = (guild_id, member_id, day)
+            entry = self.pending.get(key)
+            if entry is None:
+                self.pending[key] = [count, last_active]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], last_active)
+        # Os incrementos devolvidos continuam contando o atraso desde quando chegaram
+        oldest = time.monotonic() - waited
+        if rows and (self.oldest_pending is None or oldest < self.oldest_pending):
+            self.oldest_pending = oldest
+
+    @property
+    def lag(self) -> float:
+        """Há quantos segundos o incremento mais antigo ainda não gravado está esperando."""
+        return time.monotonic() - self.oldest_pending if self.oldest_pending is not None else 0.0
+
+class LeaderboardCache:
+    """Cache por servidor dos rankings já calculados, com TTL e limite de servidores (LRU)."""
+    def __init__(self, ttl: float = ACTIVITY_LEADERBOARD_TTL, max_guilds: int = ACTIVITY_LEADERBOARD_CACHE_GUILDS):
+        self.ttl = ttl
+        self.max_guilds = max_guilds
+        # guild_id -> {período: (expira_em, ranking)}
+        self.entries: "OrderedDict[int, Dict[str, Tuple[float, List[Tuple[int, int]]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id: int, period: str) -> Optional[List[Tuple[int, int]]]:
+        cached = self.entries.get(guild_id, {}).get(period)
+        if cached is None or cached[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.entries.move_to_end(guild_id)
+        self.hits += 1
+        return cached[1]
+
+    def put(self, guild_id: int, period: str, ranking: List[Tuple[int, int]]):
+        self.entries.setdefault(guild_id, {})[period] = (time.monotonic() + self.ttl, ranking)
+        self.entries.move_to_end(guild_id)
+        while len(self.entries) > self.max_guilds:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Descarta os rankings de um servidor, ou de todos quando guild_id é None."""
+        if guild_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(guild_id, None)
 
 class ActivityDatabase:
-    """Classe para gerenciar o banco de dados de atividade."""
+    """Classe para gerenciar o banco de dados de atividade.
+
+    A contagem é guardada em buckets diários (activity_buckets), então os rankings são somas sobre
+    janelas móveis e nenhum contador precisa ser zerado. Buckets mais antigos que a retenção são
+    compactados em rollups mensais (activity_rollups).
+
+    Todas as consultas passam pela camada AsyncSQLite e devem ser aguardadas (await),
+    para que nenhuma operação de disco bloqueie o event loop.
+    """
     def __init__(self, db_path="data/activity.db"):
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
-        self.create_tables()
+        self.storage = AsyncSQLite(db_path, schema=self.create_tables)
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute("""
+    @staticmethod
+    def create_tables(conn: sqlite3.Connection):
+        # Os campos daily/weekly/monthly_count são legados: os períodos agora saem dos buckets diários
+        conn.execute("""
         CREATE TABLE IF NOT EXISTS member_activity (
             member_id INTEGER, guild_id INTEGER, last_active TEXT,
             daily_count INTEGER DEFAULT 0, weekly_count INTEGER DEFAULT 0,
             monthly_count INTEGER DEFAULT 0, total_count INTEGER DEFAULT 0,
             PRIMARY KEY (member_id, guild_id)
         )""")
-        self.conn.commit()
-
-    def update_activity(self, member_id: int, guild_id: int):
-        now_iso = datetime.utcnow().isoformat()
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT OR IGNORE INTO member_activity (member_id, guild_id, last_active) VALUES (?, ?, ?)", (member_id, guild_id, now_iso))
-        cursor.execute("""
-            UPDATE member_activity SET
-            last_active = ?, daily_count = daily_count + 1, weekly_count = weekly_count + 1,
-            monthly_count = monthly_count + 1, total_count = total_count + 1
-            WHERE member_id = ? AND guild_id = ?
-        """, (now_iso, member_id, guild_id))
-        self.conn.commit()
-    
-    # ... (outros métodos do DB como get_top_members, get_inactive_members, etc. permanecem os mesmos) ...
-    def get_top_members(self, guild_id: int, period: str, limit: int = 5) -> List[Tuple[int, int]]:
-        cursor = self.conn.cursor()
-        column = {"daily": "daily_count", "weekly": "weekly_count", "monthly": "monthly_count"}.get(period, "total_count")
-        cursor.execute(f"SELECT member_id, {column} FROM member_activity WHERE guild_id = ? AND {column} > 0 ORDER BY {column} DESC LIMIT ?", (guild_id, limit))
-        return cursor.fetchall()
-
-    def has_any_data(self, guild_id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT 1 FROM member_activity WHERE guild_id = ? LIMIT 1", (guild_id,))
-        return cursor.fetchone() is not None
+        # Atende o ranking total e a paginação por keyset sem ordenar a tabela inteira do servidor
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_member_activity_guild_total ON member_activity (guild_id, total_count DESC, member_id)")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_buckets (
+            guild_id INTEGER, day INTEGER, member_id INTEGER,
+            message_count INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, day, member_id)
+        ) WITHOUT ROWID""")
+        # A chave primária (guild_id, day, member_id) de uma tabela WITHOUT ROWID já é um índice
+        # cobrindo as janelas móveis de um servidor, então só a compactação por dia precisa de outro índice.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_buckets_day ON activity_buckets (day)")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_rollups (
+            guild_id INTEGER, month INTEGER, member_id INTEGER,
+            message_count INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, month, member_id)
+        ) WITHOUT ROWID""")
+        ActivityDatabase._migrate_legacy_counters(conn)
+
+    @staticmethod
+    def _migrate_legacy_counters(conn: sqlite3.Connection):
+        """Converte (uma única vez) os contadores legados daily/weekly/monthly_count em buckets diários.
+
+        Cada parte cai em um dia que só as janelas certas enxergam: o diário em hoje, o que o semanal
+        tem a mais em ontem e o que o mensal tem a mais há 7 dias. Assim os três rankings continuam
+        iguais aos de antes logo depois do deploy. Os contadores são zerados em seguida, então a
+        migração não se repete.
+        """
+        today = day_index(datetime.utcnow())
+        legacy = "FROM member_activity WHERE daily_count > 0 OR weekly_count > 0 OR monthly_count > 0"
+        if conn.execute(f"SELECT 1 {legacy} LIMIT 1").fetchone() is None:
+            return
+        conn.execute(f"""
+            INSERT INTO activity_buckets (guild_id, day, member_id, message_count)
+            SELECT guild_id, day, member_id, amount FROM (
+                SELECT guild_id, ? AS day, member_id, daily_count AS amount {legacy}
+                UNION ALL
+                SELECT guild_id, ? - 1, member_id, weekly_count - daily_count {legacy}
+                UNION ALL
+                SELECT guild_id, ? - 7, member_id, monthly_count - MAX(weekly_count, daily_count) {legacy}
+            ) WHERE amount > 0
+            ON CONFLICT (guild_id, day, member_id) DO UPDATE SET message_count = message_count + excluded.message_count
+        """, (today, today, today))
+        migrated = conn.execute("UPDATE member_activity SET daily_count = 0, weekly_count = 0, monthly_count = 0 WHERE daily_count > 0 OR weekly_count > 0 OR monthly_count > 0").rowcount
+        logging.info(f"God Eye: contadores legados de {migrated} membro(s) convertidos em buckets diários.")
+
+    async def update_activity(self, member_id: int, guild_id: int):
+        now = datetime.utcnow()
+        await self.apply_activity_batch([(guild_id, member_id, day_index(now), 1, now.isoformat())])
+
+    @staticmethod
+    def _apply_activity_batch(conn: sqlite3.Connection, rows: List[Tuple[int, int, int, int, str]]):
+        conn.executemany("""
+            INSERT INTO activity_buckets (guild_id, day, member_id, message_count) VALUES (?, ?, ?, ?)
+            ON CONFLICT (guild_id, day, member_id) DO UPDATE SET message_count = message_count + excluded.message_count
+        """, [(guild_id, day, member_id, count) for guild_id, member_id, day, count, _ in rows])
+        conn.executemany(
+            "INSERT OR IGNORE INTO member_activity (member_id, guild_id, last_active) VALUES (?, ?, ?)",
+            [(member_id, guild_id, last_active) for guild_id, member_id, _, _, last_active in rows]
+        )
+        conn.executemany(
+            "UPDATE member_activity SET last_active = ?, total_count = total_count + ? WHERE member_id = ? AND guild_id = ?",
+            [(last_active, count, member_id, guild_id) for guild_id, member_id, _, count, last_active in rows]
+        )
+
+    async def apply_activity_batch(self, rows: List[Tuple[int, int, int, int, str]]):
+        """Grava um lote de incrementos do ActivityBuffer em uma única transação."""
+        if rows:
+            await self.storage.write(self._apply_activity_batch, rows)
+
+    async def get_top_members(self, guild_id: int, period: str, limit: int = 5, after: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """Ranking de um período ("daily", "weekly", "monthly") ou do total histórico.
+
+        Com `after` (o último (member_id, count) exibido), continua o ranking a partir dele (paginação por keyset).
+        """
+        if period not in PERIOD_DAYS:
+            if after is None:
+                return await self.storage.fetchall(
+                    "SELECT member_id, total_count FROM member_activity WHERE guild_id = ? AND total_count > 0 ORDER BY total_count DESC, member_id LIMIT ?",
+                    (guild_id, limit)
+                )
+            member_id, count = after
+            return await self.storage.fetchall("""
+                SELECT member_id, total_count FROM member_activity
+                WHERE guild_id = ? AND total_count > 0 AND (total_count < ? OR (total_count = ? AND member_id > ?))
+                ORDER BY total_count DESC, member_id LIMIT ?
+            """, (guild_id, count, count, member_id, limit))
+        today = day_index(datetime.utcnow())
+        return await self.get_top_members_range(guild_id, today - PERIOD_DAYS[period] + 1, today, limit, after)
+
+    async def get_top_members_range(self, guild_id: int, start_day: int, end_day: int, limit: int = 5,
+                                    after: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """Ranking de um intervalo qualquer de dias ordinais (inclusivo), opcionalmente a partir de `after`.
+
+        Dias já compactados só entram na soma quando o mês inteiro está dentro do intervalo.
+        """
+        full_months = self._full_months(start_day, end_day)
+        member_id, count = after or (0, 0)
+        sql = f"""
+            SELECT member_id, SUM(message_count) AS total FROM (
+                SELECT member_id, message_count FROM activity_buckets WHERE guild_id = ? AND day BETWEEN ? AND ?
+                UNION ALL
+                SELECT member_id, message_count FROM activity_rollups WHERE guild_id = ? AND month BETWEEN ? AND ?
+            ) GROUP BY member_id HAVING total > 0{" AND (total < ? OR (total = ? AND member_id > ?))" if after else ""}
+            ORDER BY total DESC, member_id LIMIT ?
+        """
+        first_month, last_month = (full_months[0], full_months[-1]) if full_months else (0, -1)
+        params = (guild_id, start_day, end_day, guild_id, first_month, last_month) + ((count, count, member_id) if after else ()) + (limit,)
+        return await self.storage.fetchall(sql, params)
+
+    @staticmethod
+    def _full_months(start_day: int, end_day: int) -> List[int]:
+        """Chaves dos meses completamente contidos no intervalo [start_day, end_day]."""
+        months = []
+        current = date.fromordinal(start_day).replace(day=1)
+        if current.toordinal() < start_day:
+            current = (current + timedelta(days=32)).replace(day=1)
+        while True:
+            next_month = (current + timedelta(days=32)).replace(day=1)
+            if next_month.toordinal() - 1 > end_day:
+                break
+            months.append(current.year * 100 + current.month)
+            current = next_month
+        return months
+
+    async def has_any_data(self, guild_id: int) -> bool:
+        return await self.storage.fetchone("SELECT 1 FROM member_activity WHERE guild_id = ? LIMIT 1", (guild_id,)) is not None
+
+    @staticmethod
+    def _compact(conn: sqlite3.Connection, cutoff_day: int, rollup_cutoff_month: int) -> Tuple[int, int]:
+        conn.create_function("month_key", 1, month_key, deterministic=True)
+        conn.execute("""
+            INSERT INTO activity_rollups (guild_id, month, member_id, message_count)
+            SELECT guild_id, month_key(day), member_id, SUM(message_count) FROM activity_buckets
+            WHERE day < ? GROUP BY guild_id, month_key(day), member_id
+            ON CONFLICT (guild_id, month, member_id) DO UPDATE SET message_count = message_count + excluded.message_count
+        """, (cutoff_day,))
+        compacted = conn.execute("DELETE FROM activity_buckets WHERE day < ?", (cutoff_day,)).rowcount
+        expired = conn.execute("DELETE FROM activity_rollups WHERE month < ?", (rollup_cutoff_month,)).rowcount
+        return compacted, expired
+
+    async def compact(self, cutoff_day: int, rollup_cutoff_month: int) -> Tuple[int, int]:
+        """Move os buckets anteriores a cutoff_day para os rollups mensais e apaga rollups expirados.
+
+        Retorna (buckets compactados, rollups apagados). É idempotente, então pode rodar a qualquer hora.
+        """
+        return await self.storage.write(self._compact, cutoff_day, rollup_cutoff_month)
+
+    async def close(self):
+        await self.storage.close()
 
 class GodEye(commands.Cog):
     """Sistema para rastrear e exibir a atividade dos membros."""
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, db: Optional[ActivityDatabase] = None):
         self.bot = bot
-        self.db = ActivityDatabase()
-        self.reset_counts.start()
+        self.db = db or ActivityDatabase()
+        self.buffer = ActivityBuffer()
+        self.leaderboards = LeaderboardCache()
+        self.compact_buckets.start()
+        self.flush_activity.start()
+        metrics.gauge("stwart_activity_buffer_pending", "Entradas de atividade aguardando gravação.", lambda: len(self.buffer))
+        metrics.gauge("stwart_activity_buffer_lag_seconds", "Idade do incremento de atividade mais antigo não gravado.", lambda: self.buffer.lag)
 
-    def cog_unload(self):
-        self.reset_counts.cancel()
+    async def cog_unload(self):
+        self.compact_buckets.cancel()
+        self.flush_activity.cancel()
+        metrics.remove_gauge("stwart_activity_buffer_pending")
+        metrics.remove_gauge("stwart_activity_buffer_lag_seconds")
+        # Garante que nenhuma mensagem contada seja perdida ao descarregar o módulo ou desligar o bot
+        await self.flush_buffer()
+        await self.db.close()
 
-    @tasks.loop(hours=1)
-    async def reset_counts(self):
-        now = datetime.utcnow()
-        # Roda uma vez por dia, perto da meia-noite UTC
-        if now.hour == 0:
-            logging.info("Realizando reset dos contadores de atividade diária.")
-            cursor = self.db.conn.cursor()
-            cursor.execute("UPDATE member_activity SET daily_count = 0")
-            # Segunda-feira
-            if now.weekday() == 0:
-                logging.info("Realizando reset dos contadores de atividade semanal.")
-                cursor.execute("UPDATE member_activity SET weekly_count = 0")
-            # Primeiro dia do mês
-            if now.day == 1:
-                logging.info("Realizando reset dos contadores de atividade mensal.")
-                cursor.execute("UPDATE member_activity SET monthly_count = 0")
-            self.db.conn.commit()
-
-    @reset_counts.before_loop
-    async def before_reset_counts(self):
+    async def flush_buffer(self):
+        """Grava no banco todos os incrementos pendentes do buffer."""
+        if not len(self.buffer):
+            return
+        rows = self.buffer.drain()
+        waited = self.buffer.last_flush_lag
+        try:
+            await self.db.apply_activity_batch(rows)
+        except (sqlite3.Error, RuntimeError) as e:
+            # RuntimeError: o AsyncSQLite já foi fechado. As contagens voltam para o buffer e entram na próxima gravação
+            self.buffer.restore(rows, waited)
+            logging.error(f"God Eye: Falha ao gravar {len(rows)} registros de atividade, mantidos no buffer:", exc_info=e)
+
+    @property
+    def buffer_stats(self) -> Dict[str, float]:
+        """Tamanho atual do buffer e atraso (em segundos) das gravações pendentes e da última gravação."""
+        return {
+            "pending": len(self.buffer),
+            "lag": self.buffer.lag,
+            "last_flush_lag": self.buffer.last_flush_lag,
+            "last_flush_size": self.buffer.last_flush_size,
+            "write_backlog": self.db.storage.write_backlog,
+        }
+
+    @tasks.loop(seconds=ACTIVITY_FLUSH_INTERVAL)
+    async def flush_activity(self):
+        await self.flush_buffer()
+
+    @tasks.loop(hours=6)
+    async def compact_buckets(self):
+        """Compacta os buckets diários antigos em rollups mensais para manter o banco pequeno."""
+        today = date.fromordinal(day_index(datetime.utcnow()))
+        cutoff_day = today.toordinal() - ACTIVITY_BUCKET_RETENTION_DAYS
+        months_back = today.year * 12 + today.month - 1 - ACTIVITY_ROLLUP_RETENTION_MONTHS
+        rollup_cutoff_month = (months_back // 12) * 100 + months_back % 12 + 1
+        try:
+            compacted, expired = await self.db.compact(cutoff_day, rollup_cutoff_month)
+        except sqlite3.Error as e:
+            logging.error("God Eye: Falha ao compactar os buckets de atividade:", exc_info=e)
+            return
+        if compacted or expired:
+            self.leaderboards.invalidate()
+            logging.info(f"God Eye: {compacted} bucket(s) diário(s) compactado(s) e {expired} rollup(s) mensal(is) expirado(s).")
+
+    @compact_buckets.before_loop
+    async def before_compact_buckets(self):
         await self.bot.wait_until_ready()
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.leaderboards.invalidate(guild.id)
+
+    async def get_ranking(self, guild_id: int, period: str) -> List[Tuple[int, int]]:
+        """Primeiras ACTIVITY_LEADERBOARD_MAX_ROWS posições do ranking, servidas do cache enquanto o TTL valer."""
+        ranking = self.leaderboards.get(guild_id, period)
+        if ranking is None:
+            ranking = await self.db.get_top_members(guild_id, period, ACTIVITY_LEADERBOARD_MAX_ROWS)
+            self.leaderboards.put(guild_id, period, ranking)
+        return ranking
+
+    async def get_leaderboard_page(self, guild_id: int, period: str, page: int, after: Optional[Tuple[int, int]] = None) -> Tuple[List[Tuple[int, int]], bool]:
+        """Retorna as linhas da página e se existe uma próxima página.
+
+        As páginas dentro do ranking em cache são fatias em memória. Depois disso o ranking continua
+        por keyset a partir da última linha exibida (after): no total pelo índice, nos períodos pela
+        soma dos buckets do intervalo. O cache pode estar
+        até ACTIVITY_LEADERBOARD_TTL segundos atrasado, então a primeira página fora dele relê o
+        ranking do banco e ancora o keyset na última linha atual, não na linha antiga do cache.
+        """
+        ranking = await self.get_ranking(guild_id, period)
+        cached_rows = len(ranking)
+        start = page * LEADERBOARD_PAGE_SIZE
+        end = start + LEADERBOARD_PAGE_SIZE
+        if cached_rows < ACTIVITY_LEADERBOARD_MAX_ROWS or end < cached_rows:
+            return ranking[start:end], end < cached_rows
+        if start < cached_rows:
+            # Última página do cache: ela ainda vem do cache, e a próxima já relê o banco
+            return ranking[start:end], True
+        if start == cached_rows:
+            self.leaderboards.invalidate(guild_id)
+            ranking = await self.get_ranking(guild_id, period)
+            if len(ranking) < ACTIVITY_LEADERBOARD_MAX_ROWS:
+                return [], False
+            after = ranking[-1]
+        rows = await self.db.get_top_members(guild_id, period, LEADERBOARD_PAGE_SIZE + 1, after)
+        return rows[:LEADERBOARD_PAGE_SIZE], len(rows) > LEADERBOARD_PAGE_SIZE
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if not message.author.bot and message.guild:
-            self.db.update_activity(message.author.id, message.guild.id)
+            pending = self.buffer.add(message.guild.id, message.author.id, datetime.utcnow())
+            if pending >= ACTIVITY_FLUSH_MAX_KEYS:
+                await self.flush_buffer()
     
     async def create_activity_embed(self, guild: discord.Guild) -> Embed:
-        if not self.db.has_any_data(guild.id):
+        # Os rankings vêm do cache (atualizado a cada ACTIVITY_LEADERBOARD_TTL segundos)
+        top_daily, top_weekly = await asyncio.gather(self.get_ranking(guild.id, "daily"), self.get_ranking(guild.id, "weekly"))
+        if not top_weekly and not await self.db.has_any_data(guild.id):
             return create_embed("📈 Atividade do Servidor", "Ainda não há dados de atividade registrados.", discord.Color.orange())
-
-        top_daily_data = self.db.get_top_members(guild.id, "daily", 5)
-        top_weekly_data = self.db.get_top_members(guild.id, "weekly", 5)
+        top_daily_data, top_weekly_data = top_daily[:5], top_weekly[:5]
 
         def format_list(data: List[Tuple[int, int]]) -> str:
             lines = []
@@ -108,7 +432,7 @@ class GodEye(commands.Cog):
 
         embed.add_field(name="🔥 Top 5 Diário", value=format_list(top_daily_data), inline=False)
         embed.add_field(name="📅 Top 5 Semanal", value=format_list(top_weekly_data), inline=False)
-        embed.set_footer(text="A atividade é contada a partir do número de mensagens enviadas.")
+        embed.set_footer(text="Diário: hoje (UTC) • Semanal: últimos 7 dias. A atividade é contada pelo número de mensagens enviadas.")
         
         return embed
 
@@ -119,6 +443,65 @@ class GodEye(commands.Cog):
         embed = await self.create_activity_embed(interaction.guild)
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="leaderboard", description="Mostra o ranking completo de atividade, página por página.")
+    @app_commands.describe(periodo="O período do ranking.")
+    @app_commands.choices(periodo=[
+        app_commands.Choice(name="Diário", value="daily"),
+        app_commands.Choice(name="Semanal", value="weekly"),
+        app_commands.Choice(name="Mensal", value="monthly"),
+        app_commands.Choice(name="Total", value="total"),
+    ])
+    @app_commands.checks.has_permissions(administrator=True)
+    async def leaderboard(self, interaction: discord.Interaction, periodo: str = "weekly"):
+        await interaction.response.defer()
+        view = LeaderboardView(self, interaction.guild, periodo, interaction.user)
+        embed = await view.render()
+        await interaction.followup.send(embed=embed, view=view)
+
+class LeaderboardView(discord.ui.View):
+    """View com os botões de navegação do ranking paginado."""
+    def __init__(self, cog: GodEye, guild: discord.Guild, period: str, author: discord.abc.User):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.author = author
+        self.guild = guild
+        self.period = period
+        self.page = 0
+        # cursors[p] é a última linha exibida antes da página p (usado na paginação por keyset)
+        self.cursors: List[Optional[Tuple[int, int]]] = [None]
+        self.last_row: Optional[Tuple[int, int]] = None
+
+    async def render(self) -> Embed:
+        rows, has_next = await self.cog.get_leaderboard_page(self.guild.id, self.period, self.page, self.cursors[self.page])
+        self.last_row = rows[-1] if rows else None
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not has_next
+
+        first_rank = self.page * LEADERBOARD_PAGE_SIZE + 1
+        lines = [f"{idx}. <@{member_id}> - `{count}` msg(s)" for idx, (member_id, count) in enumerate(rows, first_rank)]
+        embed = create_embed(f"🏆 Ranking {PERIOD_LABELS[self.period]} de {self.guild.name}", "\n".join(lines) if lines else "Nenhuma atividade registrada.")
+        embed.set_footer(text=f"Página {self.page + 1} • Atualizado a cada {ACTIVITY_LEADERBOARD_TTL}s")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # A página atual e os cursores são da view inteira: só quem abriu o ranking navega por ele
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Só quem usou o comando pode mudar a página do ranking.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Anterior", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        del self.cursors[self.page + 1:]
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+    @discord.ui.button(label="Próxima", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.last_row)
+        self.page += 1
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
 
 async def setup(bot):
     await bot.add_cog(GodEye(bot))
\ No newline at end of file
@@ -0,0 +1,182 @@
+import discord
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+from modules.metrics import metrics
+from config.settings import (
+    LOG_FLUSH_INTERVAL,
+    LOG_EMBEDS_PER_MESSAGE,
+    LOG_QUEUE_MAX_SIZE,
+    LOG_WEBHOOK_NAME
+)
+
+# Limite da API para a soma dos textos de todos os embeds de uma mensagem
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+class LogDispatcher:
+    """Envia os logs de cada servidor em lotes, por webhook.
+
+    Os listeners só chamam `dispatch` e retornam. Cada servidor tem uma fila limitada
+    (LOG_QUEUE_MAX_SIZE) e uma task que, LOG_FLUSH_INTERVAL segundos depois do primeiro evento,
+    manda até LOG_EMBEDS_PER_MESSAGE embeds por mensagem. Enquanto um lote está sendo enviado os
+    próximos eventos se acumulam, então uma rajada (um /clear, uma raid) vira poucas mensagens.
+    Quando a fila enche, os eventos novos são descartados e contados, e o próximo lote avisa.
+    Um lote que falha volta para o começo da fila e é tentado mais uma vez na próxima rodada.
+    """
+    def __init__(self, bot, resolve_channel: Callable[[discord.Guild], Optional[discord.TextChannel]]):
+        self.bot = bot
+        self.resolve_channel = resolve_channel
+        self.queues: Dict[int, Deque[discord.Embed]] = {}
+        self.dropped: Dict[int, int] = {}
+        # Servidores cujo último lote falhou e voltou para a fila (a segunda falha descarta)
+        self.retrying: Set[int] = set()
+        self.tasks: Dict[int, asyncio.Task] = {}
+        # canal -> webhook do bot (None = sem permissão para webhooks, manda como mensagem normal)
+        self.webhooks: Dict[int, Optional[discord.Webhook]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def dispatch(self, guild: discord.Guild, embed: discord.Embed):
+        """Enfileira um embed para o canal de logs do servidor. Nunca bloqueia."""
+        queue = self.queues.get(guild.id)
+        if queue is None:
+            queue = self.queues[guild.id] = deque()
+        if len(queue) >= LOG_QUEUE_MAX_SIZE:
+            self.dropped[guild.id] = self.dropped.get(guild.id, 0) + 1
+            metrics.inc("stwart_log_events_total", "result", "dropped", help_text="Eventos de log por resultado.")
+            return
+        queue.append(embed)
+        metrics.inc("stwart_log_events_total", "result", "queued", help_text="Eventos de log por resultado.")
+        if guild.id not in self.tasks:
+            self.tasks[guild.id] = asyncio.create_task(self.flush_later(guild))
+
+    def forget_channel(self, channel_id: int):
+        self.webhooks.pop(channel_id, None)
+
+    def forget_guild(self, guild_id: int):
+        task = self.tasks.pop(guild_id, None)
+        if task:
+            task.cancel()
+        self.queues.pop(guild_id, None)
+        self.dropped.pop(guild_id, None)
+        self.retrying.discard(guild_id)
+
+    async def close(self):
+        """Envia o que ainda está na fila (sem esperar o intervalo) e encerra as tasks."""
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks.clear()
+        for guild_id in list(self.queues):
+            guild = self.bot.get_guild(guild_id)
+            if guild:
+                try:
+                    await asyncio.wait_for(self.flush(guild), timeout=5)
+                except (asyncio.TimeoutError, discord.HTTPException):
+                    pass
+        self.queues.clear()
+
+    async def flush_later(self, guild: discord.Guild):
+        try:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            await self.flush(guild)
+        except Exception as e:
+            logging.error(f"Logs: erro ao enviar os logs do servidor '{guild.name}':", exc_info=e)
+        if self.tasks.get(guild.id) is asyncio.current_task():
+            del self.tasks[guild.id]
+        # Eventos que chegaram enquanto o último lote saía ganham uma nova rodada
+        if self.queues.get(guild.id) or self.dropped.get(guild.id):
+            self.tasks[guild.id] = asyncio.create_task(self.flush_later(guild))
+
+    def take_batch(self, guild_id: int) -> Tuple[list, int]:
+        """Tira da fila o próximo lote que cabe em uma mensagem (quantidade e tamanho total).
+
+        Retorna o lote e quantos descartes o aviso no começo dele representa (0 = sem aviso).
+        """
+        queue = self.queues[guild_id]
+        batch, size = [], 0
+        dropped = self.dropped.pop(guild_id, 0)
+        if dropped:
+            warning = discord.Embed(title="⚠️ Logs descartados",
+                                    description=f"{dropped} evento(s) foram descartados porque a fila de logs estava cheia.",
+                                    color=discord.Color.orange())
+            batch.append(warning)
+            size += len(warning)
+        while queue and len(batch) < LOG_EMBEDS_PER_MESSAGE:
+            embed_size = len(queue[0])
+            if batch and size + embed_size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(queue.popleft())
+            size += embed_size
+        return batch, dropped
+
+    def requeue(self, guild_id: int, batch: list, dropped: int):
+        """Devolve um lote que falhou para o começo da fila, sem passar de LOG_QUEUE_MAX_SIZE."""
+        queue = self.queues.setdefault(guild_id, deque())
+        embeds = batch[1:] if dropped else batch
+        kept = embeds[:max(0, LOG_QUEUE_MAX_SIZE - len(queue))]
+        queue.extendleft(reversed(kept))
+        # O aviso é recriado a partir do contador; o que não coube entra nele
+        lost = dropped + len(embeds) - len(kept)
+        if lost:
+            self.dropped[guild_id] = self.dropped.get(guild_id, 0) + lost
+
+    async def flush(self, guild: discord.Guild):
+        channel = self.resolve_channel(guild)
+        if channel is None:
+            # Sem canal de logs não há para onde mandar
+            self.queues.pop(guild.id, None)
+            self.dropped.pop(guild.id, None)
+            self.retrying.discard(guild.id)
+            return
+        while self.queues.get(guild.id) or self.dropped.get(guild.id):
+            self.queues.setdefault(guild.id, deque())
+            batch, dropped = self.take_batch(guild.id)
+            try:
+                await self.send(channel, batch)
+                self.retrying.discard(guild.id)
+                metrics.inc("stwart_log_events_total", "result", "sent", len(batch), help_text="Eventos de log por resultado.")
+            except discord.HTTPException as e:
+                if guild.id in self.retrying:
+                    self.retrying.discard(guild.id)
+                    logging.error(f"Logs: falha ao enviar {len(batch)} log(s) para #{channel.name} em '{guild.name}', descartados: {e}")
+                    metrics.inc("stwart_log_events_total", "result", "failed", len(batch), help_text="Eventos de log por resultado.")
+                    continue
+                # Primeira falha: o lote volta para a fila e sai na próxima rodada (flush_later agenda outra)
+                logging.warning(f"Logs: falha ao enviar {len(batch)} log(s) para #{channel.name} em '{guild.name}', tentando de novo: {e}")
+                metrics.inc("stwart_log_events_total", "result", "retried", len(batch), help_text="Eventos de log por resultado.")
+                self.retrying.add(guild.id)
+                self.requeue(guild.id, batch, dropped)
+                break
+        if not self.queues.get(guild.id):
+            self.queues.pop(guild.id, None)
+
+    async def send(self, channel: discord.TextChannel, embeds: list):
+        webhook = await self.get_webhook(channel)
+        if webhook is None:
+            await channel.send(embeds=embeds)
+            return
+        try:
+            await webhook.send(embeds=embeds, username=LOG_WEBHOOK_NAME, avatar_url=self.bot.user.display_avatar.url)
+        except discord.NotFound:
+            # O webhook foi apagado: manda este lote direto e cria outro na próxima vez
+            self.webhooks.pop(channel.id, None)
+            await channel.send(embeds=embeds)
+
+    async def get_webhook(self, channel: discord.TextChannel) -> Optional[discord.Webhook]:
+        if channel.id in self.webhooks:
+            return self.webhooks[channel.id]
+        webhook = None
+        try:
+            for existing in await channel.webhooks():
+                if existing.user and existing.user.id == self.bot.user.id and existing.token:
+                    webhook = existing
+                    break
+            if webhook is None:
+                webhook = await channel.create_webhook(name=LOG_WEBHOOK_NAME, reason="Envio dos logs em lote")
+        except discord.Forbidden:
+            logging.warning(f"Logs: sem permissão para gerenciar webhooks em #{channel.name}, enviando como mensagem normal.")
+        self.webhooks[channel.id] = webhook
+        return webhook
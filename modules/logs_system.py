@@ -1,27 +1,147 @@
 import discord
-from discord.ext import commands
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from discord.ext import commands, tasks
+from modules.log_dispatcher import LogDispatcher
+from modules.message_store import MessageStore
+from modules.metrics import metrics
+from config.settings import LOG_CHANNEL_ID, LOG_CHANNEL_NAME
+
+# Mensagens guardadas mostradas no resumo de uma exclusão em massa
+BULK_DELETE_PREVIEW = 15
 
 class LogsSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # servidor -> ID do canal de logs (None = o servidor não tem canal de logs)
+        self.log_channel_ids: Dict[int, Optional[int]] = {}
+        # Os logs saem em lotes por webhook em vez de uma mensagem por evento
+        self.dispatcher = LogDispatcher(bot, self.get_log_channel)
+        # Texto das mensagens recentes: o log de exclusão não depende do cache de Message do discord.py
+        self.messages = MessageStore()
+
+    async def cog_load(self):
+        metrics.gauge("stwart_log_pending", "Eventos de log aguardando envio.", lambda: len(self.dispatcher))
+        metrics.gauge("stwart_message_store_bytes", "Memória estimada das mensagens guardadas para os logs.", lambda: self.messages.bytes)
+        self.evict_messages.start()
+
+    async def cog_unload(self):
+        self.evict_messages.cancel()
+        metrics.remove_gauge("stwart_log_pending")
+        metrics.remove_gauge("stwart_message_store_bytes")
+        await self.dispatcher.close()
+
+    @tasks.loop(minutes=5)
+    async def evict_messages(self):
+        self.messages.evict_expired()
+
+    def get_log_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Canal de logs do servidor: o LOG_CHANNEL_ID, se for deste servidor, ou o canal #logs.
+
+        A busca pelo nome percorre todos os canais, então o resultado (inclusive "não tem") fica
+        guardado até algum canal do servidor ser criado, apagado ou alterado.
+        """
+        if guild.id in self.log_channel_ids:
+            channel_id = self.log_channel_ids[guild.id]
+            return guild.get_channel(channel_id) if channel_id else None
+
+        channel = guild.get_channel(LOG_CHANNEL_ID) if LOG_CHANNEL_ID else None
+        if not isinstance(channel, discord.TextChannel):
+            channel = discord.utils.get(guild.text_channels, name=LOG_CHANNEL_NAME)
+        self.log_channel_ids[guild.id] = channel.id if channel else None
+        return channel
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self.log_channel_ids.pop(channel.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.log_channel_ids.pop(channel.guild.id, None)
+        self.dispatcher.forget_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel):
+        # O webhook dos logs pode ter sido apagado; o próximo lote procura (ou cria) outro
+        self.dispatcher.forget_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        # Só o nome (ou o tipo) muda qual canal é o de logs
+        if before.name != after.name or before.type != after.type:
+            self.log_channel_ids.pop(after.guild.id, None)
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        if message.author.bot:
+    async def on_guild_remove(self, guild):
+        self.log_channel_ids.pop(guild.id, None)
+        self.dispatcher.forget_guild(guild.id)
+        self.messages.forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # Só guarda o que pode virar log: servidores sem canal de logs não gastam memória
+        if message.author.bot or not message.guild or not self.get_log_channel(message.guild):
+            return
+        self.messages.add(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if payload.guild_id and "content" in payload.data:
+            self.messages.update(payload.guild_id, payload.message_id, payload.data["content"])
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild:
+            return
+        record = self.messages.pop(guild.id, payload.message_id)
+        if record:
+            author_id, content, created_at = record.author_id, record.content, datetime.fromtimestamp(record.created_at, timezone.utc)
+        elif payload.cached_message and not payload.cached_message.author.bot:
+            message = payload.cached_message
+            author_id, content, created_at = message.author.id, message.content, message.created_at
+        else:
+            return
+        if not self.get_log_channel(guild):
             return
 
         embed = discord.Embed(
             title="🗑️ Mensagem apagada",
-            description=f"**Autor:** {message.author.mention}\n**Canal:** {message.channel.mention}",
+            description=f"**Autor:** <@{author_id}>\n**Canal:** <#{payload.channel_id}>",
             color=discord.Color.red()
         )
-        embed.add_field(name="Conteúdo", value=message.content or "Mensagem sem texto")
-        embed.set_footer(text=f"ID do autor: {message.author.id}")
-        embed.timestamp = message.created_at
+        embed.add_field(name="Conteúdo", value=content[:1024] or "Mensagem sem texto")
+        embed.set_footer(text=f"ID do autor: {author_id}")
+        embed.timestamp = created_at
+        self.dispatcher.dispatch(guild, embed)
 
-        log_channel = discord.utils.get(message.guild.text_channels, name="logs")
-        if log_channel:
-            await log_channel.send(embed=embed)
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        # Um /clear ou uma limpeza de raid vira um único log, não um por mensagem
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild or not self.get_log_channel(guild):
+            return
+
+        embed = discord.Embed(
+            title="🧹 Mensagens apagadas em massa",
+            description=f"**Quantidade:** {len(payload.message_ids)}\n**Canal:** <#{payload.channel_id}>",
+            color=discord.Color.dark_red()
+        )
+        known = {}
+        for message_id in payload.message_ids:
+            record = self.messages.pop(guild.id, message_id)
+            if record:
+                known[message_id] = (record.created_at, record.author_name, record.content)
+        for message in payload.cached_messages:
+            if message.id not in known and not message.author.bot:
+                known[message.id] = (message.created_at.timestamp(), str(message.author), message.content)
+        if known:
+            latest = sorted(known.values())[-BULK_DELETE_PREVIEW:]
+            lines = [f"**{author}:** {discord.utils.escape_markdown(content[:80]) or '*sem texto*'}" for _, author, content in latest]
+            preview = "\n".join(lines)
+            embed.add_field(name=f"Últimas mensagens conhecidas ({len(lines)} de {len(known)})", value=preview[:1024], inline=False)
+        embed.timestamp = discord.utils.utcnow()
+        self.dispatcher.dispatch(guild, embed)
 
     @commands.Cog.listener()
     async def on_invite_create(self, invite):
@@ -34,9 +154,8 @@ class LogsSystem(commands.Cog):
         embed.set_footer(text=f"ID: {invite.inviter.id}")
         embed.timestamp = invite.created_at
 
-        log_channel = discord.utils.get(invite.guild.text_channels, name="logs")
-        if log_channel:
-            await log_channel.send(embed=embed)
+        if self.get_log_channel(invite.guild):
+            self.dispatcher.dispatch(invite.guild, embed)
 
 # ESTA FUNÇÃO É ESSENCIAL
 async def setup(bot):
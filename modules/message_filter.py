@@ -0,0 +1,281 @@
+import discord
+import asyncio
+import logging
+import re
+import sqlite3
+from discord import app_commands
+from discord.ext import commands
+from typing import Dict, Iterable, Optional, Set
+from modules.utils import create_embed
+from modules.database import AsyncSQLite
+from modules.metrics import metrics
+from config.settings import FILTER_MAX_WORDS, FILTER_CAPS_MIN_LENGTH, WHITELIST
+
+INVITE_PATTERN = r"(?:https?://)?(?:www\.)?(?:discord(?:app)?\.com/invite|discord\.gg)/[\w-]+"
+LINK_PATTERN = r"https?://\S+"
+# Letras maiúsculas e letras em geral (sem dígitos e "_"), contadas em C pelo re.sub em vez de um loop por caractere
+_NOT_UPPER = re.compile(r"[^A-ZÀ-ÖØ-Þ]")
+_NOT_LETTER = re.compile(r"[\W\d_]")
+
+FILTER_REASONS = {
+    "invite": "convites de outros servidores não são permitidos",
+    "link": "links não são permitidos",
+    "word": "a mensagem contém uma palavra proibida",
+    "mentions": "menções em massa não são permitidas",
+    "caps": "excesso de letras maiúsculas",
+}
+
+def trie_regex(words: Iterable[str]) -> str:
+    """Monta uma regex com os prefixos comuns fatorados (ex: "spam|spammer" -> "spam(?:mer)?").
+
+    Uma alternação simples com milhares de palavras testa cada uma em cada posição do texto;
+    com o trie, o motor de regex só segue os ramos que continuam casando.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = None
+
+    def build(node: dict) -> str:
+        optional = "" in node
+        branches, singles = [], []
+        for char in sorted(key for key in node if key):
+            rest = build(node[char])
+            if rest:
+                branches.append(re.escape(char) + rest)
+            else:
+                singles.append(re.escape(char))
+        if singles:
+            branches.append(singles[0] if len(singles) == 1 else "[" + "".join(singles) + "]")
+        if not branches:
+            return ""
+        result = branches[0] if len(branches) == 1 and not (optional and len(branches[0]) > 1) else "(?:" + "|".join(branches) + ")"
+        return result + "?" if optional else result
+
+    return build(trie)
+
+class FilterRules:
+    """Regras de filtro de um servidor, como estão no banco."""
+    __slots__ = ("block_links", "block_invites", "max_mentions", "caps_percent", "caps_min_length", "words")
+
+    def __init__(self, block_links: bool = False, block_invites: bool = False, max_mentions: int = 0,
+                 caps_percent: int = 0, caps_min_length: int = FILTER_CAPS_MIN_LENGTH, words: Optional[Set[str]] = None):
+        self.block_links = block_links
+        self.block_invites = block_invites
+        self.max_mentions = max_mentions
+        self.caps_percent = caps_percent
+        self.caps_min_length = caps_min_length
+        self.words = words if words is not None else set()
+
+    @property
+    def empty(self) -> bool:
+        return not (self.block_links or self.block_invites or self.max_mentions or self.caps_percent or self.words)
+
+class CompiledFilter:
+    """As regras de um servidor compiladas em uma única regex (convites, links e palavras) mais checagens numéricas."""
+    __slots__ = ("pattern", "max_mentions", "caps_percent", "caps_min_length")
+
+    def __init__(self, rules: FilterRules):
+        parts = []
+        # Convites vêm antes dos links: na mesma posição do texto, a alternativa mais específica ganha
+        if rules.block_invites:
+            parts.append(f"(?P<invite>{INVITE_PATTERN})")
+        if rules.block_links:
+            parts.append(f"(?P<link>{LINK_PATTERN})")
+        if rules.words:
+            parts.append(f"(?<!\\w)(?P<word>{trie_regex(rules.words)})(?!\\w)")
+        self.pattern = re.compile("|".join(parts)) if parts else None
+        self.max_mentions = rules.max_mentions
+        self.caps_percent = rules.caps_percent
+        self.caps_min_length = rules.caps_min_length
+
+    def check(self, content: str, mention_count: int = 0) -> Optional[str]:
+        """Motivo da primeira regra violada (uma chave de FILTER_REASONS), ou None."""
+        if self.max_mentions and mention_count > self.max_mentions:
+            return "mentions"
+        if self.caps_percent and len(content) >= self.caps_min_length:
+            letters = len(_NOT_LETTER.sub("", content))
+            if letters >= self.caps_min_length and len(_NOT_UPPER.sub("", content)) * 100 >= letters * self.caps_percent:
+                return "caps"
+        if self.pattern:
+            match = self.pattern.search(content.casefold())
+            if match:
+                return match.lastgroup
+        return None
+
+class FilterEngine:
+    """Regras de todos os servidores: cada uma é compilada uma vez e só recompilada quando muda."""
+    def __init__(self, db_path: str = "data/filters.db"):
+        self.db = AsyncSQLite(db_path, read_pool_size=1, schema=self.create_tables)
+        self.rules: Dict[int, FilterRules] = {}
+        self.compiled: Dict[int, CompiledFilter] = {}
+        # Versão das regras de cada servidor: uma compilação antiga que termine depois de uma nova é descartada
+        self.versions: Dict[int, int] = {}
+
+    @staticmethod
+    def create_tables(conn: sqlite3.Connection):
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS filter_rules (
+            guild_id INTEGER PRIMARY KEY, block_links INTEGER DEFAULT 0, block_invites INTEGER DEFAULT 0,
+            max_mentions INTEGER DEFAULT 0, caps_percent INTEGER DEFAULT 0, caps_min_length INTEGER
+        )""")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS filter_words (
+            guild_id INTEGER, word TEXT,
+            PRIMARY KEY (guild_id, word)
+        ) WITHOUT ROWID""")
+
+    async def load(self):
+        for guild_id, block_links, block_invites, max_mentions, caps_percent, caps_min_length in await self.db.fetchall("SELECT * FROM filter_rules"):
+            self.rules[guild_id] = FilterRules(bool(block_links), bool(block_invites), max_mentions, caps_percent, caps_min_length or FILTER_CAPS_MIN_LENGTH)
+        for guild_id, word in await self.db.fetchall("SELECT guild_id, word FROM filter_words"):
+            self.rules.setdefault(guild_id, FilterRules()).words.add(word)
+        for guild_id in self.rules:
+            await self.compile(guild_id)
+
+    def get(self, guild_id: int) -> Optional[CompiledFilter]:
+        return self.compiled.get(guild_id)
+
+    async def compile(self, guild_id: int):
+        """Recompila as regras de um servidor. Com milhares de palavras isso leva centenas de ms, então roda em uma thread."""
+        version = self.versions[guild_id] = self.versions.get(guild_id, 0) + 1
+        rules = self.rules.get(guild_id)
+        if rules is None or rules.empty:
+            # Servidores sem regras não custam nada por mensagem
+            self.compiled.pop(guild_id, None)
+            return
+        snapshot = FilterRules(rules.block_links, rules.block_invites, rules.max_mentions, rules.caps_percent, rules.caps_min_length, set(rules.words))
+        compiled = await asyncio.to_thread(CompiledFilter, snapshot)
+        if self.versions.get(guild_id) == version:
+            self.compiled[guild_id] = compiled
+
+    async def update(self, guild_id: int, **changes):
+        """Altera as regras numéricas/liga-desliga de um servidor e recompila só ele."""
+        rules = self.rules.setdefault(guild_id, FilterRules())
+        for name, value in changes.items():
+            setattr(rules, name, value)
+        await self.db.execute(
+            "INSERT OR REPLACE INTO filter_rules VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, int(rules.block_links), int(rules.block_invites), rules.max_mentions, rules.caps_percent, rules.caps_min_length)
+        )
+        await self.compile(guild_id)
+
+    async def add_words(self, guild_id: int, words: Iterable[str]) -> int:
+        rules = self.rules.setdefault(guild_id, FilterRules())
+        new = {word for word in (w.strip().casefold() for w in words) if word and word not in rules.words}
+        new = set(list(new)[:max(0, FILTER_MAX_WORDS - len(rules.words))])
+        if new:
+            await self.db.executemany("INSERT OR IGNORE INTO filter_words VALUES (?, ?)", [(guild_id, word) for word in new])
+            rules.words |= new
+            await self.compile(guild_id)
+        return len(new)
+
+    async def remove_word(self, guild_id: int, word: str) -> bool:
+        rules = self.rules.get(guild_id)
+        word = word.strip().casefold()
+        if not rules or word not in rules.words:
+            return False
+        await self.db.execute("DELETE FROM filter_words WHERE guild_id = ? AND word = ?", (guild_id, word))
+        rules.words.discard(word)
+        await self.compile(guild_id)
+        return True
+
+    async def close(self):
+        await self.db.close()
+
+class MessageFilter(commands.Cog):
+    """Filtros de mensagens por servidor (links, convites, menções em massa, maiúsculas e palavras proibidas)."""
+    def __init__(self, bot: commands.Bot, engine: Optional[FilterEngine] = None):
+        self.bot = bot
+        self.engine = engine or FilterEngine()
+
+    async def cog_load(self):
+        await self.engine.load()
+        logging.info(f"Filtros: regras de {len(self.engine.compiled)} servidor(es) compiladas.")
+
+    async def cog_unload(self):
+        await self.engine.close()
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild:
+            return
+        compiled = self.engine.get(message.guild.id)
+        if compiled is None or message.author.id in WHITELIST:
+            return
+        if isinstance(message.author, discord.Member) and message.author.guild_permissions.manage_messages:
+            return
+
+        mention_count = len(message.mentions) + len(message.role_mentions) + (1 if message.mention_everyone else 0)
+        violation = compiled.check(message.content, mention_count)
+        if not violation:
+            return
+
+        metrics.inc("stwart_filter_violations_total", "rule", violation, help_text="Mensagens removidas pelos filtros, por regra.")
+        try:
+            await message.delete()
+            await message.channel.send(embed=create_embed("🚫 Mensagem Removida", f"{message.author.mention}, {FILTER_REASONS[violation]}.", discord.Color.orange()), delete_after=8)
+            logging.info(f"Filtros: mensagem de {message.author} removida em '{message.guild.name}' ({violation}).")
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            logging.error(f"Filtros: Sem permissão para apagar mensagens em #{message.channel} ('{message.guild.name}').")
+
+    # --- Grupo de Comandos dos Filtros ---
+    filters = app_commands.Group(name="filter", description="Configura os filtros de mensagens do servidor.", default_permissions=discord.Permissions(manage_guild=True))
+
+    @filters.command(name="links", description="Bloqueia ou libera links nas mensagens.")
+    @app_commands.describe(ativo="Se os links devem ser bloqueados.")
+    async def filter_links(self, interaction: discord.Interaction, ativo: bool):
+        await self.engine.update(interaction.guild.id, block_links=ativo)
+        await interaction.response.send_message(embed=create_embed("🔗 Filtro de Links", f"Links agora estão **{'bloqueados' if ativo else 'liberados'}**.", discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="invites", description="Bloqueia ou libera convites de outros servidores.")
+    @app_commands.describe(ativo="Se os convites devem ser bloqueados.")
+    async def filter_invites(self, interaction: discord.Interaction, ativo: bool):
+        await self.engine.update(interaction.guild.id, block_invites=ativo)
+        await interaction.response.send_message(embed=create_embed("📨 Filtro de Convites", f"Convites agora estão **{'bloqueados' if ativo else 'liberados'}**.", discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="mentions", description="Define o máximo de menções por mensagem (0 desativa).")
+    @app_commands.describe(maximo="Quantidade máxima de menções em uma mensagem.")
+    async def filter_mentions(self, interaction: discord.Interaction, maximo: app_commands.Range[int, 0, 100]):
+        await self.engine.update(interaction.guild.id, max_mentions=maximo)
+        text = f"Mensagens com mais de **{maximo}** menções serão removidas." if maximo else "O filtro de menções foi desativado."
+        await interaction.response.send_message(embed=create_embed("📣 Filtro de Menções", text, discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="caps", description="Define a porcentagem máxima de letras maiúsculas (0 desativa).")
+    @app_commands.describe(porcentagem="Porcentagem de maiúsculas a partir da qual a mensagem é removida.", minimo="Tamanho mínimo da mensagem para o filtro valer.")
+    async def filter_caps(self, interaction: discord.Interaction, porcentagem: app_commands.Range[int, 0, 100], minimo: app_commands.Range[int, 1, 2000] = FILTER_CAPS_MIN_LENGTH):
+        await self.engine.update(interaction.guild.id, caps_percent=porcentagem, caps_min_length=minimo)
+        text = f"Mensagens com {minimo}+ letras e **{porcentagem}%** ou mais em maiúsculas serão removidas." if porcentagem else "O filtro de maiúsculas foi desativado."
+        await interaction.response.send_message(embed=create_embed("🔠 Filtro de Maiúsculas", text, discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="addword", description="Adiciona palavras proibidas (separe várias por vírgula).")
+    @app_commands.describe(palavras="As palavras ou expressões, separadas por vírgula.")
+    async def filter_addword(self, interaction: discord.Interaction, palavras: str):
+        added = await self.engine.add_words(interaction.guild.id, palavras.split(","))
+        total = len(self.engine.rules[interaction.guild.id].words)
+        await interaction.response.send_message(embed=create_embed("📝 Palavras Proibidas", f"**{added}** palavra(s) adicionada(s). Total: **{total}** (máximo {FILTER_MAX_WORDS}).", discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="removeword", description="Remove uma palavra proibida.")
+    @app_commands.describe(palavra="A palavra ou expressão a ser removida.")
+    async def filter_removeword(self, interaction: discord.Interaction, palavra: str):
+        if not await self.engine.remove_word(interaction.guild.id, palavra):
+            return await interaction.response.send_message(embed=create_embed("❌ Erro", f"`{palavra}` não está na lista de palavras proibidas.", discord.Color.red()), ephemeral=True)
+        await interaction.response.send_message(embed=create_embed("📝 Palavras Proibidas", f"`{palavra}` foi removida.", discord.Color.green()), ephemeral=True)
+
+    @filters.command(name="show", description="Mostra os filtros ativos no servidor.")
+    async def filter_show(self, interaction: discord.Interaction):
+        rules = self.engine.rules.get(interaction.guild.id) or FilterRules()
+        embed = create_embed("🛡️ Filtros de Mensagens", color=discord.Color.blue())
+        embed.add_field(name="Links", value=f"`{'Bloqueados' if rules.block_links else 'Liberados'}`", inline=True)
+        embed.add_field(name="Convites", value=f"`{'Bloqueados' if rules.block_invites else 'Liberados'}`", inline=True)
+        embed.add_field(name="Menções", value=f"`máx. {rules.max_mentions}`" if rules.max_mentions else "`Desativado`", inline=True)
+        embed.add_field(name="Maiúsculas", value=f"`{rules.caps_percent}% (mín. {rules.caps_min_length})`" if rules.caps_percent else "`Desativado`", inline=True)
+        embed.add_field(name="Palavras Proibidas", value=f"`{len(rules.words)}`", inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(MessageFilter(bot))
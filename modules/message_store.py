@@ -0,0 +1,118 @@
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+import discord
+from config.settings import (
+    LOG_MESSAGE_STORE_GUILD_BYTES,
+    LOG_MESSAGE_STORE_MAX_AGE,
+    LOG_MESSAGE_STORE_COMPRESS_MIN
+)
+
+class StoredMessage:
+    """O mínimo de uma mensagem para o log de exclusão: IDs, autor, horário e o texto (comprimido se for longo)."""
+    __slots__ = ("id", "channel_id", "author_id", "author_name", "created_at", "data", "compressed")
+
+    def __init__(self, message: discord.Message):
+        self.id = message.id
+        self.channel_id = message.channel.id
+        self.author_id = message.author.id
+        self.author_name = str(message.author)
+        self.created_at = message.created_at.timestamp()
+        self.set_content(message.content)
+
+    def set_content(self, content: str):
+        data = content.encode()
+        self.compressed = False
+        if len(data) >= LOG_MESSAGE_STORE_COMPRESS_MIN:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                data, self.compressed = packed, True
+        self.data = data
+
+    @property
+    def content(self) -> str:
+        return (zlib.decompress(self.data) if self.compressed else self.data).decode()
+
+    @property
+    def size(self) -> int:
+        return RECORD_OVERHEAD + len(self.data) + len(self.author_name)
+
+# Custo fixo de um registro além do texto: o objeto, os ints/float, os cabeçalhos de bytes/str e a
+# entrada no OrderedDict (medido com tracemalloc)
+RECORD_OVERHEAD = 400
+
+class GuildMessages:
+    __slots__ = ("messages", "bytes")
+
+    def __init__(self):
+        self.messages: "OrderedDict[int, StoredMessage]" = OrderedDict()
+        self.bytes = 0
+
+class MessageStore:
+    """Conteúdo das mensagens recentes de cada servidor, para os logs de mensagens apagadas.
+
+    Substitui o cache de Message do discord.py (que guarda objetos inteiros) por registros
+    compactos. Cada servidor tem um orçamento de LOG_MESSAGE_STORE_GUILD_BYTES: as mensagens
+    mais antigas saem primeiro quando ele estoura ou quando passam de LOG_MESSAGE_STORE_MAX_AGE.
+    """
+    def __init__(self, guild_bytes: int = LOG_MESSAGE_STORE_GUILD_BYTES, max_age: float = LOG_MESSAGE_STORE_MAX_AGE):
+        self.guild_bytes = guild_bytes
+        self.max_age = max_age
+        self.guilds: Dict[int, GuildMessages] = {}
+
+    def __len__(self) -> int:
+        return sum(len(guild.messages) for guild in self.guilds.values())
+
+    @property
+    def bytes(self) -> int:
+        return sum(guild.bytes for guild in self.guilds.values())
+
+    def add(self, message: discord.Message):
+        guild = self.guilds.get(message.guild.id)
+        if guild is None:
+            guild = self.guilds[message.guild.id] = GuildMessages()
+        record = StoredMessage(message)
+        guild.messages[record.id] = record
+        guild.bytes += record.size
+        # As mensagens chegam em ordem, então as mais antigas estão no começo
+        while guild.bytes > self.guild_bytes and len(guild.messages) > 1:
+            _, oldest = guild.messages.popitem(last=False)
+            guild.bytes -= oldest.size
+
+    def update(self, guild_id: int, message_id: int, content: str):
+        guild = self.guilds.get(guild_id)
+        record = guild.messages.get(message_id) if guild else None
+        if record:
+            guild.bytes -= record.size
+            record.set_content(content)
+            guild.bytes += record.size
+
+    def pop(self, guild_id: int, message_id: int) -> Optional[StoredMessage]:
+        guild = self.guilds.get(guild_id)
+        record = guild.messages.pop(message_id, None) if guild else None
+        if record:
+            guild.bytes -= record.size
+            if not guild.messages:
+                del self.guilds[guild_id]
+        return record
+
+    def forget_guild(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Remove as mensagens mais velhas que max_age. Retorna quantas saíram."""
+        cutoff = (time.time() if now is None else now) - self.max_age
+        removed = 0
+        for guild_id in list(self.guilds):
+            guild = self.guilds[guild_id]
+            while guild.messages:
+                oldest = next(iter(guild.messages.values()))
+                if oldest.created_at >= cutoff:
+                    break
+                guild.messages.popitem(last=False)
+                guild.bytes -= oldest.size
+                removed += 1
+            if not guild.messages:
+                del self.guilds[guild_id]
+        return removed
@@ -0,0 +1,239 @@
+import discord
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from aiohttp import web
+from discord import app_commands
+from discord.ext import commands
+from modules.utils import create_embed
+from config.settings import METRICS_HTTP_HOST, METRICS_HTTP_PORT, METRICS_LOOP_LAG_INTERVAL
+
+# Limites superiores (em segundos) dos buckets dos histogramas, no mesmo formato do Prometheus
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+class Histogram:
+    """Histograma de buckets fixos: registrar uma amostra custa uma busca binária e duas somas."""
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        """Estimativa do percentil: o limite superior do bucket onde ele cai."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+class MetricsRegistry:
+    """Registro central das métricas do bot, compartilhado por todos os módulos."""
+    def __init__(self):
+        # nome da métrica -> (ajuda, nome do label, {valor do label: histograma})
+        self.histograms: Dict[str, Tuple[str, str, Dict[str, Histogram]]] = {}
+        self.counters: Dict[str, Tuple[str, str, Dict[str, int]]] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def histogram(self, name: str, label_name: str, label: str, help_text: str = "") -> Histogram:
+        entry = self.histograms.get(name)
+        if entry is None:
+            entry = self.histograms[name] = (help_text, label_name, {})
+        hist = entry[2].get(label)
+        if hist is None:
+            hist = entry[2][label] = Histogram()
+        return hist
+
+    def observe(self, name: str, label_name: str, label: str, value: float, help_text: str = ""):
+        self.histogram(name, label_name, label, help_text).observe(value)
+
+    def inc(self, name: str, label_name: str = "", label: str = "", amount: int = 1, help_text: str = ""):
+        entry = self.counters.get(name)
+        if entry is None:
+            entry = self.counters[name] = (help_text, label_name, {})
+        entry[2][label] = entry[2].get(label, 0) + amount
+
+    def counter_value(self, name: str, label: Optional[str] = None) -> int:
+        """Valor de um contador para um label, ou a soma de todos quando label é None."""
+        entry = self.counters.get(name)
+        if not entry:
+            return 0
+        return sum(entry[2].values()) if label is None else entry[2].get(label, 0)
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], float]):
+        """Registra um gauge lido sob demanda (ex: tamanho de um buffer)."""
+        self.gauges[name] = (help_text, func)
+
+    def remove_gauge(self, name: str):
+        self.gauges.pop(name, None)
+
+    def slowest(self, name: str, limit: int = 5) -> List[Tuple[str, Histogram]]:
+        """Os labels de um histograma ordenados pelo p99, do mais lento para o mais rápido."""
+        entry = self.histograms.get(name)
+        if not entry:
+            return []
+        return sorted(entry[2].items(), key=lambda item: item[1].percentile(99), reverse=True)[:limit]
+
+    def render_prometheus(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus."""
+        lines = []
+        for name, (help_text, label_name, series) in self.histograms.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for label, hist in series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(hist.bounds, hist.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_name}="{label}"}} {hist.sum}')
+                lines.append(f'{name}_count{{{label_name}="{label}"}} {hist.count}')
+        for name, (help_text, label_name, series) in self.counters.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for label, value in series.items():
+                lines.append(f'{name}{{{label_name}="{label}"}} {value}' if label_name else f"{name} {value}")
+        for name, (help_text, func) in self.gauges.items():
+            try:
+                value = func()
+            except Exception as e:
+                logging.debug(f"Métricas: falha ao ler o gauge {name}: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+# Instância única usada por todos os módulos (from modules.metrics import metrics)
+metrics = MetricsRegistry()
+
+LISTENER_METRIC = "stwart_listener_seconds"
+COMMAND_METRIC = "stwart_app_command_seconds"
+LOOP_LAG_METRIC = "stwart_event_loop_lag_seconds"
+RATE_LIMIT_METRIC = "stwart_discord_rate_limits_total"
+
+class InstrumentedBot(commands.Bot):
+    """Bot que mede o tempo de execução de cada listener (ex: AntiSpam.on_message)."""
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            metrics.observe(LISTENER_METRIC, "listener", getattr(coro, "__qualname__", event_name), time.perf_counter() - start,
+                            "Tempo de execução dos listeners de eventos.")
+
+class MetricsCommandTree(app_commands.CommandTree):
+    """Árvore de comandos que marca o início de cada interação para medir os slash commands."""
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["metrics_start"] = time.perf_counter()
+        return True
+
+def observe_command(interaction: discord.Interaction, failed: bool = False):
+    """Registra a duração de um slash command (chamado na conclusão ou no tratador de erros)."""
+    start = interaction.extras.pop("metrics_start", None)
+    if start is None:
+        return
+    name = interaction.command.qualified_name if interaction.command else "desconhecido"
+    metrics.observe(COMMAND_METRIC, "command", name, time.perf_counter() - start, "Tempo de execução dos slash commands.")
+    if failed:
+        metrics.inc("stwart_app_command_errors_total", "command", name, help_text="Slash commands que terminaram em erro.")
+
+class RateLimitCounter(logging.Handler):
+    """Conta os avisos de rate limit (HTTP 429) emitidos pelo cliente HTTP do discord.py."""
+    def emit(self, record: logging.LogRecord):
+        message = record.msg if isinstance(record.msg, str) else ""
+        if message.startswith("We are being rate limited"):
+            metrics.inc(RATE_LIMIT_METRIC, "scope", "bucket", help_text="Respostas 429 recebidas da API do Discord.")
+        elif message.startswith("Global rate limit"):
+            metrics.inc(RATE_LIMIT_METRIC, "scope", "global", help_text="Respostas 429 recebidas da API do Discord.")
+
+class Metrics(commands.Cog):
+    """Métricas de desempenho do bot (listeners, comandos, event loop e rate limits)."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.rate_limit_handler = RateLimitCounter(level=logging.WARNING)
+        self.lag_task: Optional[asyncio.Task] = None
+        self.http_runner: Optional[web.AppRunner] = None
+
+    async def cog_load(self):
+        logging.getLogger("discord.http").addHandler(self.rate_limit_handler)
+        metrics.gauge("stwart_gateway_latency_seconds", "Latência do heartbeat do gateway.", lambda: self.bot.latency)
+        self.lag_task = asyncio.create_task(self.monitor_loop_lag())
+        if METRICS_HTTP_PORT:
+            app = web.Application()
+            app.router.add_get("/metrics", self.prometheus_handler)
+            self.http_runner = web.AppRunner(app, access_log=None)
+            await self.http_runner.setup()
+            try:
+                await web.TCPSite(self.http_runner, METRICS_HTTP_HOST, METRICS_HTTP_PORT).start()
+                logging.info(f"📊 Métricas disponíveis em http://{METRICS_HTTP_HOST}:{METRICS_HTTP_PORT}/metrics")
+            except OSError as e:
+                logging.error(f"Métricas: não foi possível abrir a porta {METRICS_HTTP_PORT}: {e}")
+                await self.http_runner.cleanup()
+                self.http_runner = None
+
+    async def cog_unload(self):
+        logging.getLogger("discord.http").removeHandler(self.rate_limit_handler)
+        metrics.remove_gauge("stwart_gateway_latency_seconds")
+        if self.lag_task:
+            self.lag_task.cancel()
+        if self.http_runner:
+            await self.http_runner.cleanup()
+
+    async def monitor_loop_lag(self):
+        """Mede quanto o event loop atrasa para acordar uma tarefa (sinal de código bloqueante)."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(METRICS_LOOP_LAG_INTERVAL)
+            lag = max(0.0, time.perf_counter() - start - METRICS_LOOP_LAG_INTERVAL)
+            metrics.observe(LOOP_LAG_METRIC, "loop", "main", lag, "Atraso do event loop ao acordar tarefas.")
+
+    async def prometheus_handler(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        observe_command(interaction)
+
+    @app_commands.command(name="stats", description="Mostra as métricas de desempenho do bot (latência, event loop e comandos).")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        def ms(seconds: float) -> str:
+            return f"{seconds * 1000:.1f}ms"
+
+        def format_slowest(name: str) -> str:
+            rows = [f"`{label}` p50 ≤{ms(h.percentile(50))} • p99 ≤{ms(h.percentile(99))} • {h.count}x" for label, h in metrics.slowest(name)]
+            return "\n".join(rows) if rows else "Sem dados ainda."
+
+        loop_lag = metrics.histogram(LOOP_LAG_METRIC, "loop", "main")
+        rate_limits = metrics.counter_value(RATE_LIMIT_METRIC)
+
+        embed = create_embed("📊 Métricas de Desempenho", color=discord.Color.green())
+        embed.add_field(name="Latência da API", value=f"`{ms(self.bot.latency)}`", inline=True)
+        embed.add_field(name="Atraso do Event Loop", value=f"`p99 ≤{ms(loop_lag.percentile(99))} • máx {ms(loop_lag.max)}`", inline=True)
+        embed.add_field(name="Rate Limits (429)", value=f"`{rate_limits}`", inline=True)
+        embed.add_field(name="⏱️ Listeners mais lentos", value=format_slowest(LISTENER_METRIC), inline=False)
+        embed.add_field(name="⌨️ Comandos mais lentos", value=format_slowest(COMMAND_METRIC), inline=False)
+        if METRICS_HTTP_PORT:
+            embed.set_footer(text=f"Prometheus: http://{METRICS_HTTP_HOST}:{METRICS_HTTP_PORT}/metrics")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
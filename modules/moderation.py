@@ -2,6 +2,10 @@ import discord
 from discord import app_commands, ui
 from discord.ext import commands
 from modules.utils import create_embed
+from modules.moderation_queue import moderation_queue
+
+# Como cada tipo de ação aparece na mensagem de confirmação
+ACTION_TEXTS = {"ban": "banido(a)", "kick": "expulso(a)", "timeout": "silenciado(a)"}
 
 # Modal para coletar o motivo da punição
 class PunishmentModal(ui.Modal, title="Formulário de Punição"):
@@ -13,27 +17,28 @@ class PunishmentModal(ui.Modal, title="Formulário de Punição"):
         self.action = action.lower()
 
     async def on_submit(self, interaction: discord.Interaction):
-        try:
-            action_text = ""
-            if self.action == "ban":
-                await self.target.ban(reason=self.reason.value)
-                action_text = "banido(a)"
-            elif self.action == "kick":
-                await self.target.kick(reason=self.reason.value)
-                action_text = "expulso(a)"
-            
-            embed = create_embed(
-                f"✅ Ação Concluída: {self.target.display_name} foi {action_text}",
-                f"**Moderador:** {interaction.user.mention}\n**Motivo:** {self.reason.value}",
-                discord.Color.green()
-            )
-            await interaction.response.send_message(embed=embed)
-            
-        except discord.Forbidden:
-            await interaction.response.send_message(embed=create_embed("❌ Erro de Permissão", f"Eu não tenho permissão para punir {self.target.mention}.", discord.Color.red()), ephemeral=True)
-        except Exception as e:
+        # A fila de moderação pode estar ocupada (ex: durante uma raid), então a resposta vem depois
+        await interaction.response.defer(thinking=True)
+        if self.action == "ban":
+            action = moderation_queue.ban(interaction.guild, self.target, reason=self.reason.value)
+        elif self.action == "kick":
+            action = moderation_queue.kick(interaction.guild, self.target, reason=self.reason.value)
+        else:
+            return await interaction.followup.send(embed=create_embed("❌ Ação Inválida", f"Ação de punição desconhecida: `{self.action}`.", discord.Color.red()), ephemeral=True)
+
+        if not await action.wait():
+            if isinstance(action.error, discord.Forbidden):
+                return await interaction.followup.send(embed=create_embed("❌ Erro de Permissão", f"Eu não tenho permissão para punir {self.target.mention}.", discord.Color.red()), ephemeral=True)
             # Erros inesperados são capturados pelo tratador global em main.py
-            raise e
+            raise action.error
+
+        # Um banimento já pendente para o membro vale no lugar da expulsão: o texto mostra o que foi aplicado
+        embed = create_embed(
+            f"✅ Ação Concluída: {self.target.display_name} foi {ACTION_TEXTS.get(action.kind, action.kind)}",
+            f"**Moderador:** {interaction.user.mention}\n**Motivo:** {self.reason.value}",
+            discord.Color.green()
+        )
+        await interaction.followup.send(embed=embed)
 
 class Moderation(commands.Cog):
     """Comandos para ajudar na moderação do servidor."""
@@ -0,0 +1,335 @@
+import discord
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+from discord.ext import commands
+from modules.metrics import metrics
+from config.settings import (
+    MODERATION_WORKERS,
+    MODERATION_MIN_INTERVAL,
+    MODERATION_MAX_INTERVAL,
+    MODERATION_MAX_PENDING,
+    MODERATION_BULK_BAN_SIZE,
+    MODERATION_CLOSE_TIMEOUT
+)
+
+# Faixas de prioridade: a menor é atendida primeiro
+PRIORITY_MANUAL = 0  # Ações de moderadores (alguém está esperando a resposta)
+PRIORITY_RAID = 1    # Banimentos automáticos do Anti-Raid
+PRIORITY_SPAM = 2    # Silenciamentos automáticos do Anti-Spam
+PRIORITIES = (PRIORITY_MANUAL, PRIORITY_RAID, PRIORITY_SPAM)
+
+# Uma ação mais grave pendente para o mesmo membro torna as mais leves desnecessárias
+SEVERITY = {"timeout": 0, "kick": 1, "ban": 2}
+
+Target = Union[discord.Member, discord.abc.Snowflake]
+
+class ModAction:
+    """Uma ação de moderação na fila (banir, expulsar ou silenciar um membro)."""
+    __slots__ = ("kind", "guild", "target", "reason", "duration", "priority", "done", "error", "superseded", "followers")
+
+    def __init__(self, kind: str, guild: discord.Guild, target: Target, reason: Optional[str], priority: int,
+                 duration: Optional[timedelta] = None):
+        self.kind = kind
+        self.guild = guild
+        self.target = target
+        self.reason = reason
+        self.duration = duration
+        self.priority = priority
+        self.done = asyncio.get_running_loop().create_future()
+        self.error: Optional[Exception] = None
+        self.superseded = False
+        # Ações mais leves (já na fila) que esta substituiu e que terminam junto com ela
+        self.followers: List["ModAction"] = []
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.guild.id, self.target.id
+
+    @property
+    def bucket(self) -> Tuple[int, str]:
+        # As rotas de moderação da API têm o servidor como parâmetro principal do rate limit
+        return self.guild.id, self.kind
+
+    async def wait(self) -> bool:
+        """Espera a ação ser executada. Retorna True se deu certo (o erro fica em `error`)."""
+        return await asyncio.shield(self.done)
+
+    def finish(self, error: Optional[Exception] = None):
+        for action in [self, *self.followers]:
+            action.error = error
+            if not action.done.done():
+                action.done.set_result(error is None)
+
+class ModerationQueue:
+    """Executor central das ações de moderação, compartilhado por todos os módulos.
+
+    Os listeners só enfileiram a ação e retornam. Workers em segundo plano atendem as faixas de
+    prioridade em ordem, respeitando um intervalo mínimo por bucket (servidor + tipo de ação) que
+    aumenta quando a API começa a segurar as chamadas e volta a cair quando ela responde rápido.
+    Ações repetidas para o mesmo membro são unificadas, e banimentos do mesmo servidor com o mesmo
+    motivo saem juntos via bulk_ban (até MODERATION_BULK_BAN_SIZE por chamada).
+    """
+    def __init__(self, workers: int = MODERATION_WORKERS, max_pending: int = MODERATION_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        # prioridade -> bucket -> fila de ações (os buckets entram na ordem em que receberam ações)
+        self.lanes: Dict[int, "OrderedDict[Tuple[int, str], Deque[ModAction]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self.pending: Dict[Tuple[int, int], ModAction] = {}
+        self.next_allowed: Dict[Tuple[int, str], float] = {}
+        self.intervals: Dict[Tuple[int, str], float] = {}
+        self.busy: Set[Tuple[int, str]] = set()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.tasks: List[asyncio.Task] = []
+        # Marcado pelo close(): daí em diante as ações novas falham em vez de religar os workers
+        self.closed = False
+        # Chamados no começo do close(), para quem segura ações (ex: banimentos adiados) entregá-las a tempo
+        self.close_hooks: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def start(self):
+        if self.tasks:
+            return
+        self.closed = False
+        self.wakeup = asyncio.Event()
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Entrega as ações seguradas pelos close_hooks, espera as pendentes (até MODERATION_CLOSE_TIMEOUT) e para."""
+        for hook in list(self.close_hooks):
+            try:
+                hook()
+            except Exception as e:
+                logging.error("Moderação: erro em um hook de encerramento da fila:", exc_info=e)
+        waiting = [action.done for action in self.pending.values()]
+        if waiting and self.tasks:
+            # O bot descarrega as extensões antes de fechar a sessão HTTP, então ainda dá para executá-las
+            await asyncio.wait(waiting, timeout=MODERATION_CLOSE_TIMEOUT)
+        self.closed = True
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        for action in list(self.pending.values()):
+            action.finish(RuntimeError("Fila de moderação encerrada."))
+        self.pending.clear()
+        for lane in self.lanes.values():
+            lane.clear()
+
+    # --- Enfileiramento ---
+
+    def submit(self, kind: str, guild: discord.Guild, target: Target, reason: Optional[str] = None, *,
+               priority: int = PRIORITY_MANUAL, duration: Optional[timedelta] = None) -> ModAction:
+        """Enfileira uma ação e retorna imediatamente. Use `await action.wait()` para saber o resultado."""
+        action = ModAction(kind, guild, target, reason, priority, duration)
+        if self.closed:
+            logging.error(f"Moderação: fila encerrada, {kind} de {target.id} em '{guild.name}' descartado.")
+            metrics.inc("stwart_moderation_actions_total", "result", "dropped", help_text="Ações de moderação por resultado.")
+            action.finish(RuntimeError("Fila de moderação encerrada."))
+            return action
+        self.start()
+        existing = self.pending.get(action.key)
+        if existing:
+            if SEVERITY[existing.kind] >= SEVERITY[kind]:
+                metrics.inc("stwart_moderation_actions_total", "result", "deduplicated", help_text="Ações de moderação por resultado.")
+                return existing
+            # A ação nova é mais grave (ex: ban de raid sobre um timeout de spam): ela substitui a pendente
+            existing.superseded = True
+            action.followers.extend([existing, *existing.followers])
+            action.priority = min(priority, existing.priority)
+            metrics.inc("stwart_moderation_actions_total", "result", "deduplicated", help_text="Ações de moderação por resultado.")
+        elif len(self.pending) >= self.max_pending:
+            logging.error(f"Moderação: fila cheia ({self.max_pending}), {kind} de {target.id} em '{guild.name}' descartado.")
+            metrics.inc("stwart_moderation_actions_total", "result", "dropped", help_text="Ações de moderação por resultado.")
+            action.finish(RuntimeError("Fila de moderação cheia."))
+            return action
+
+        self.pending[action.key] = action
+        lane = self.lanes[action.priority]
+        queue = lane.get(action.bucket)
+        if queue is None:
+            queue = lane[action.bucket] = deque()
+        queue.append(action)
+        self.wakeup.set()
+        return action
+
+    def ban(self, guild: discord.Guild, target: Target, reason: Optional[str] = None, *, priority: int = PRIORITY_MANUAL) -> ModAction:
+        return self.submit("ban", guild, target, reason, priority=priority)
+
+    def kick(self, guild: discord.Guild, target: Target, reason: Optional[str] = None, *, priority: int = PRIORITY_MANUAL) -> ModAction:
+        return self.submit("kick", guild, target, reason, priority=priority)
+
+    def timeout(self, member: discord.Member, duration: timedelta, reason: Optional[str] = None, *, priority: int = PRIORITY_SPAM) -> ModAction:
+        return self.submit("timeout", member.guild, member, reason, priority=priority, duration=duration)
+
+    # --- Execução ---
+
+    def _take_ready(self, now: float) -> Tuple[Optional[List[ModAction]], Optional[float]]:
+        """Próximo lote pronto para executar, ou (None, segundos até o próximo bucket liberar)."""
+        wait = None
+        for priority in PRIORITIES:
+            lane = self.lanes[priority]
+            for bucket in list(lane):
+                queue = lane[bucket]
+                while queue and queue[0].superseded:
+                    queue.popleft()
+                if not queue:
+                    del lane[bucket]
+                    continue
+                if bucket in self.busy:
+                    continue
+                ready_at = self.next_allowed.get(bucket, 0.0)
+                if ready_at > now:
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                    continue
+                batch = [queue.popleft()]
+                if batch[0].kind == "ban":
+                    # Junta os outros banimentos do mesmo servidor e motivo (de qualquer faixa) em um bulk_ban
+                    for other_priority in PRIORITIES:
+                        other = self.lanes[other_priority].get(bucket)
+                        while other and len(batch) < MODERATION_BULK_BAN_SIZE:
+                            candidate = other[0]
+                            if candidate.superseded:
+                                other.popleft()
+                            elif candidate.reason == batch[0].reason:
+                                batch.append(other.popleft())
+                            else:
+                                break
+                if not queue:
+                    del lane[bucket]
+                self.busy.add(bucket)
+                return batch, None
+        return None, wait
+
+    async def worker(self):
+        while True:
+            batch, wait = self._take_ready(time.monotonic())
+            if batch is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            bucket = batch[0].bucket
+            start = time.perf_counter()
+            try:
+                await self.execute(batch)
+            except asyncio.CancelledError:
+                for action in batch:
+                    action.finish(RuntimeError("Fila de moderação encerrada."))
+                raise
+            except Exception as e:
+                # Erros de rede (OSError, conexão resetada) não podem derrubar o worker nem deixar ninguém esperando
+                unfinished = [action for action in batch if not action.done.done()]
+                logging.error(f"Moderação: erro inesperado ao aplicar {batch[0].kind} em {len(unfinished)} membro(s):", exc_info=e)
+                for action in unfinished:
+                    action.finish(e)
+                metrics.inc("stwart_moderation_actions_total", "result", "failed", len(unfinished), help_text="Ações de moderação por resultado.")
+            finally:
+                elapsed = time.perf_counter() - start
+                self.busy.discard(bucket)
+                for action in batch:
+                    if self.pending.get(action.key) is action:
+                        del self.pending[action.key]
+                self.pace(bucket, elapsed)
+                # Outro worker pode estar esperando justamente este bucket
+                self.wakeup.set()
+
+    def pace(self, bucket: Tuple[int, str], elapsed: float):
+        """Ajusta o intervalo do bucket: dobra quando a chamada demorou (a API segurou por rate limit)."""
+        interval = self.intervals.get(bucket, MODERATION_MIN_INTERVAL)
+        if elapsed > 1.0:
+            interval = min(interval * 2, MODERATION_MAX_INTERVAL)
+        else:
+            interval = max(interval * 0.75, MODERATION_MIN_INTERVAL)
+        if interval <= MODERATION_MIN_INTERVAL:
+            self.intervals.pop(bucket, None)
+        else:
+            self.intervals[bucket] = interval
+        self.next_allowed[bucket] = time.monotonic() + interval
+        # Buckets já liberados não precisam continuar na memória
+        if len(self.next_allowed) > 1000:
+            now = time.monotonic()
+            for key in [key for key, ready_at in self.next_allowed.items() if ready_at <= now]:
+                del self.next_allowed[key]
+
+    async def execute(self, batch: List[ModAction]):
+        first = batch[0]
+        start = time.perf_counter()
+        if first.kind == "ban" and len(batch) > 1:
+            await self.execute_bulk_ban(batch)
+        else:
+            for action in batch:
+                await self.execute_one(action)
+        metrics.observe("stwart_moderation_call_seconds", "action", first.kind, time.perf_counter() - start,
+                        "Tempo das chamadas de moderação à API do Discord.")
+
+    async def execute_one(self, action: ModAction):
+        try:
+            if action.kind == "ban":
+                await action.guild.ban(action.target, reason=action.reason)
+            elif action.kind == "kick":
+                await action.guild.kick(action.target, reason=action.reason)
+            elif action.kind == "timeout":
+                await action.target.timeout(action.duration, reason=action.reason)
+            action.finish()
+            metrics.inc("stwart_moderation_actions_total", "result", "done", help_text="Ações de moderação por resultado.")
+        except discord.HTTPException as e:
+            if e.status == 429:
+                self.intervals[action.bucket] = MODERATION_MAX_INTERVAL
+            logging.error(f"Moderação: falha ao aplicar {action.kind} em {action.target.id} no servidor '{action.guild.name}': {e}")
+            action.finish(e)
+            metrics.inc("stwart_moderation_actions_total", "result", "failed", help_text="Ações de moderação por resultado.")
+        except (OSError, asyncio.TimeoutError) as e:
+            # Falha de conexão em uma ação não impede as outras do lote
+            logging.error(f"Moderação: erro de conexão ao aplicar {action.kind} em {action.target.id} no servidor '{action.guild.name}': {e}")
+            action.finish(e)
+            metrics.inc("stwart_moderation_actions_total", "result", "failed", help_text="Ações de moderação por resultado.")
+
+    async def execute_bulk_ban(self, batch: List[ModAction]):
+        guild = batch[0].guild
+        try:
+            result = await guild.bulk_ban([action.target for action in batch], reason=batch[0].reason)
+        except discord.Forbidden:
+            # O bulk_ban também exige "Gerenciar Servidor": sem ela, um por um
+            for action in batch:
+                await self.execute_one(action)
+            return
+        except discord.HTTPException as e:
+            logging.error(f"Moderação: falha no banimento em massa de {len(batch)} membro(s) em '{guild.name}': {e}")
+            for action in batch:
+                action.finish(e)
+            metrics.inc("stwart_moderation_actions_total", "result", "failed", len(batch), help_text="Ações de moderação por resultado.")
+            return
+        banned = {user.id for user in result.banned}
+        for action in batch:
+            action.finish(None if action.target.id in banned else discord.DiscordException("Banimento recusado pela API no bulk_ban."))
+        metrics.inc("stwart_moderation_actions_total", "result", "done", len(banned), help_text="Ações de moderação por resultado.")
+        if len(banned) < len(batch):
+            metrics.inc("stwart_moderation_actions_total", "result", "failed", len(batch) - len(banned), help_text="Ações de moderação por resultado.")
+        logging.info(f"Moderação: {len(banned)}/{len(batch)} membro(s) banido(s) em lote em '{guild.name}'.")
+
+# Instância única usada por todos os módulos (from modules.moderation_queue import moderation_queue)
+moderation_queue = ModerationQueue()
+
+class ModerationQueueCog(commands.Cog, name="ModerationQueue"):
+    """Liga e desliga os workers da fila de moderação junto com o bot."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        moderation_queue.start()
+        metrics.gauge("stwart_moderation_pending", "Ações de moderação aguardando execução.", lambda: len(moderation_queue))
+
+    async def cog_unload(self):
+        metrics.remove_gauge("stwart_moderation_pending")
+        await moderation_queue.close()
+
+async def setup(bot):
+    await bot.add_cog(ModerationQueueCog(bot))
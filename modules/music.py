@@ -1,33 +1,19 @@
 import discord
 import asyncio
-import yt_dlp
 import logging
+import time
 from discord import app_commands
 from discord.ext import commands
-from collections import defaultdict
+import random
+from collections import deque
+from typing import Deque, Dict, Optional, Union
 from modules.utils import create_embed
+from modules.metrics import metrics
+from modules.audio_cache import AudioFileCache
+from modules.music_resolver import AudioResolver, PlaylistCursor, is_playlist_url, stream_url_expired
+from config.settings import MUSIC_PREFETCH_LEAD, MUSIC_PREFETCH_PAUSED_RECHECK, MUSIC_QUEUE_MAX_SIZE, MUSIC_IDLE_TIMEOUT, MUSIC_DEFAULT_BITRATE
 
-def get_audio_source(url: str):
-    """Extrai informações do áudio usando yt_dlp."""
-    ydl_opts = {
-        'format': 'bestaudio/best', 'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
-        'restrictfilenames': True, 'noplaylist': True, 'nocheckcertificate': True,
-        'ignoreerrors': False, 'logtostderr': False, 'quiet': True,
-        'no_warnings': True, 'default_search': 'ytsearch', 'source_address': '0.0.0.0'
-    }
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            if 'entries' in info: info = info['entries'][0]
-            return {
-                'url': info['url'], 
-                'title': info.get('title', 'Título desconhecido'),
-                'thumbnail': info.get('thumbnail', ''),
-                'webpage_url': info.get('webpage_url', url)
-            }
-    except Exception as e:
-        logging.error(f"Erro ao obter source do yt_dlp para '{url}': {e}")
-        return None
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
 
 class MusicControls(discord.ui.View):
     """View com os botões de controle de música."""
@@ -67,74 +53,300 @@ class MusicControls(discord.ui.View):
         await self.cog.cleanup(interaction.guild)
         await interaction.response.send_message(embed=create_embed("⏹️ Player Parado", "A música foi parada e a fila foi limpa.", author=interaction.user, color=discord.Color.red()), ephemeral=True)
 
+class Track:
+    """Registro compacto de uma música na fila: só a busca/URL, o título e IDs (nada de Interaction)."""
+    __slots__ = ("query", "title", "requester_id", "channel_id")
+
+    def __init__(self, query: str, title: Optional[str], requester_id: int, channel_id: int):
+        self.query = query
+        self.title = title
+        self.requester_id = requester_id
+        self.channel_id = channel_id
+
+    def __str__(self) -> str:
+        return self.title or self.query
+
+QueueItem = Union[Track, PlaylistCursor]
+
+class QueueFull(Exception):
+    """A fila do servidor atingiu MUSIC_QUEUE_MAX_SIZE."""
+
+class GuildPlayer:
+    """Estado do player de um servidor: uma única fila (deque) e a música atual.
+
+    Entrar e sair da fila é O(1); remover, mover e embaralhar operam direto no deque.
+    """
+    def __init__(self, guild_id: int, text_channel_id: int, max_size: int = MUSIC_QUEUE_MAX_SIZE):
+        self.guild_id = guild_id
+        self.text_channel_id = text_channel_id
+        self.max_size = max_size
+        self.queue: Deque[QueueItem] = deque()
+        self.queue_ready = asyncio.Event()
+        self.track_finished = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.current_track: Optional[Track] = None
+        self.current_info: Optional[dict] = None
+        # Playlist sendo tocada no momento: suas entradas tocam no lugar dela, antes do resto da fila
+        self.active_playlist: Optional[PlaylistCursor] = None
+        # Próxima música já resolvida (e com o stream pré-aberto) enquanto a atual toca
+        self.prefetched: Optional[dict] = None
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.now_playing_message: Optional[discord.Message] = None
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def enqueue(self, item: QueueItem):
+        if len(self.queue) >= self.max_size:
+            raise QueueFull
+        self.queue.append(item)
+        self.queue_ready.set()
+
+    async def dequeue(self, timeout: float) -> QueueItem:
+        """Tira o próximo item da fila, esperando até `timeout` segundos por um."""
+        while not self.queue:
+            self.queue_ready.clear()
+            await asyncio.wait_for(self.queue_ready.wait(), timeout=timeout)
+        return self.queue.popleft()
+
+    def remove(self, index: int) -> QueueItem:
+        item = self.queue[index]
+        del self.queue[index]
+        return item
+
+    def move(self, source: int, destination: int) -> QueueItem:
+        item = self.remove(source)
+        self.queue.insert(destination, item)
+        return item
+
+    def shuffle(self):
+        items = list(self.queue)
+        random.shuffle(items)
+        self.queue = deque(items)
+
+    def peek_next(self) -> Optional[str]:
+        """Busca/URL da próxima música a tocar, sem tirá-la da fila."""
+        if self.active_playlist and not self.active_playlist.finished:
+            # Página da playlist ainda não carregada: melhor não adivinhar
+            return self.active_playlist.peek()
+        if not self.queue:
+            return None
+        head = self.queue[0]
+        return head.peek() if isinstance(head, PlaylistCursor) else head.query
+
 class Music(commands.Cog):
     """Comandos para tocar músicas no canal de voz."""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.player_tasks = {}
-        self.music_queues = defaultdict(list)
-        self.song_queues = defaultdict(asyncio.Queue)
-        self.play_next_song_events = defaultdict(asyncio.Event)
-        self.now_playing_messages = {}
-        self.current_song_info = defaultdict(dict)
+        self.players: Dict[int, GuildPlayer] = {}
+        self.resolver = AudioResolver()
+        self.audio_cache = AudioFileCache()
+
+    async def cog_load(self):
+        purged = await self.resolver.cache.purge_expired()
+        if purged:
+            logging.info(f"Música: {purged} resolução(ões) vencida(s) removida(s) do cache.")
+        if self.audio_cache.enabled:
+            await asyncio.to_thread(self.audio_cache.load)
+            metrics.gauge("stwart_music_audio_cache_bytes", "Bytes ocupados pelo cache de áudio em disco.", lambda: self.audio_cache.total_bytes)
+            logging.info(f"Música: cache de áudio com {len(self.audio_cache.files)} arquivo(s) ({self.audio_cache.total_bytes / 1_048_576:.1f} MB).")
+
+    async def cog_unload(self):
+        for player in self.players.values():
+            if player.task:
+                player.task.cancel()
+            if player.prefetched:
+                self.discard_prefetch(player.prefetched)
+        self.players.clear()
+        await self.resolver.close()
+        self.audio_cache.close()
+        metrics.remove_gauge("stwart_music_audio_cache_bytes")
+
+    def open_source(self, song_info: dict, bitrate: int = MUSIC_DEFAULT_BITRATE) -> discord.AudioSource:
+        """Abre o stream no FFmpeg já em Opus (a conexão com a origem começa imediatamente).
+
+        Fontes Opus são só remuxadas (sem decodificar nem recodificar); as demais são transcodificadas
+        pelo próprio FFmpeg no bitrate do canal. Em nenhum caso o encoder Opus do discord.py roda no bot.
+        Músicas no cache de áudio tocam direto do arquivo local.
+        """
+        source, codec, before_options = song_info['url'], song_info.get('acodec'), FFMPEG_BEFORE_OPTIONS
+        local = self.audio_cache.lookup(song_info.get('id'))
+        if local:
+            (source, codec), before_options = local, None
+        passthrough = codec == 'opus'
+        metrics.inc("stwart_music_pipeline_total", "mode", "passthrough" if passthrough else "transcode",
+                    help_text="Streams abertos por modo do pipeline de áudio.")
+        return discord.FFmpegOpusAudio(source, codec='copy' if passthrough else None, bitrate=bitrate,
+                                       before_options=before_options, options='-vn')
+
+    @staticmethod
+    def channel_bitrate(guild: discord.Guild) -> int:
+        """Bitrate (kbps) do canal de voz onde o bot está, usado ao transcodificar."""
+        vc = guild.voice_client if guild else None
+        if not vc or not vc.channel:
+            return MUSIC_DEFAULT_BITRATE
+        return max(8, min(vc.channel.bitrate // 1000, 512))
+
+    def start_prefetch(self, player: GuildPlayer):
+        """Resolve a próxima música da fila e agenda a abertura do stream para perto do fim da atual."""
+        next_search = player.peek_next()
+        if not next_search or player.prefetched:
+            return
+        current = player.current_info or {}
+        elapsed = time.monotonic() - (player.started_at or time.monotonic())
+        delay = max(0.0, (current.get('duration') or 0) - MUSIC_PREFETCH_LEAD - elapsed)
+
+        entry = {"search": next_search, "task": asyncio.create_task(self.resolver.resolve(player.guild_id, next_search)), "source": None, "discarded": False,
+                 "guild_id": player.guild_id, "bitrate": self.channel_bitrate(self.bot.get_guild(player.guild_id))}
+        entry["timer"] = self.bot.loop.call_later(delay, self.open_prefetched, entry)
+        player.prefetched = entry
+
+    def open_prefetched(self, entry: dict):
+        if entry["discarded"] or entry["source"]:
+            return
+        guild = self.bot.get_guild(entry["guild_id"])
+        if guild and guild.voice_client and guild.voice_client.is_paused():
+            # Pausado: um stream aberto agora poderia expirar antes de tocar, então espera a música voltar
+            entry["timer"] = self.bot.loop.call_later(MUSIC_PREFETCH_PAUSED_RECHECK, self.open_prefetched, entry)
+            return
+        task = entry["task"]
+        if not task.done():
+            # Ainda resolvendo: abre assim que o yt_dlp terminar
+            task.add_done_callback(lambda _: self.open_prefetched(entry))
+            return
+        song_info = None if task.cancelled() or task.exception() else task.result()
+        if song_info and not stream_url_expired(song_info['url']):
+            entry["source"] = self.open_source(song_info, entry["bitrate"])
+
+    @staticmethod
+    def discard_prefetch(entry: dict):
+        entry["discarded"] = True
+        entry["timer"].cancel()
+        entry["task"].cancel()
+        if entry["source"]:
+            entry["source"].cleanup()
+
+    async def take_prefetched(self, player: GuildPlayer, song_search: str):
+        """Retorna (song_info, source) da música, usando o prefetch quando ele corresponde a ela."""
+        entry, player.prefetched = player.prefetched, None
+        song_info, source = None, None
+        if entry and entry["search"] == song_search:
+            entry["timer"].cancel()
+            try:
+                # shield: cancelar o player não cancela a resolução, então dá para saber qual dos dois parou
+                song_info = await asyncio.shield(entry["task"])
+            except asyncio.CancelledError:
+                # Só a resolução cancelada é um "miss"; o cancelamento do próprio player continua subindo
+                if not entry["task"].cancelled():
+                    self.discard_prefetch(entry)
+                    raise
+                song_info = None
+            source = entry["source"]
+            if song_info and stream_url_expired(song_info['url']):
+                # A URL direta expirou enquanto a música anterior tocava: resolve de novo
+                logging.info(f"Música: URL do stream de '{song_search}' expirou, resolvendo novamente.")
+                if source:
+                    source.cleanup()
+                song_info, source = None, None
+        elif entry:
+            self.discard_prefetch(entry)
+
+        if not song_info:
+            song_info = await self.resolver.resolve(player.guild_id, song_search)
+        if song_info and not source:
+            source = self.open_source(song_info, self.channel_bitrate(self.bot.get_guild(player.guild_id)))
+        return song_info, source
+
+    def on_track_end(self, player: GuildPlayer):
+        player.ended_at = time.perf_counter()
+        player.track_finished.set()
 
     async def cleanup(self, guild: discord.Guild):
         """Limpa todos os recursos de música de um servidor."""
-        if guild.id in self.player_tasks:
-            self.player_tasks[guild.id].cancel()
+        player = self.players.pop(guild.id, None)
+        if player and player.task and player.task is not asyncio.current_task():
+            player.task.cancel()
+        self.resolver.cancel_guild(guild.id)
+        if player and player.prefetched:
+            self.discard_prefetch(player.prefetched)
         if guild.voice_client:
             await guild.voice_client.disconnect()
-        self.music_queues.pop(guild.id, None)
-        self.song_queues.pop(guild.id, None)
-        self.play_next_song_events.pop(guild.id, None)
-        self.player_tasks.pop(guild.id, None)
-        self.now_playing_messages.pop(guild.id, None)
-        self.current_song_info.pop(guild.id, None)
         logging.info(f"Recursos de música limpos para o servidor {guild.name}")
 
-    async def audio_player_task(self, initial_interaction: discord.Interaction):
-        guild_id = initial_interaction.guild.id
+    async def next_track(self, player: GuildPlayer) -> Optional[Track]:
+        """Próxima música: as entradas da playlist ativa vêm antes do resto da fila."""
         while True:
-            self.play_next_song_events[guild_id].clear()
-            vc = self.bot.get_guild(guild_id).voice_client
+            if player.active_playlist and not player.active_playlist.finished:
+                cursor = player.active_playlist
+                entry = await cursor.next_entry()
+                if entry:
+                    return Track(entry[0], entry[1], cursor.requester_id, cursor.channel_id)
+                continue
+            player.active_playlist = None
+            item = await player.dequeue(timeout=MUSIC_IDLE_TIMEOUT)
+            if isinstance(item, PlaylistCursor):
+                player.active_playlist = item
+                continue
+            return item
+
+    async def audio_player_task(self, player: GuildPlayer):
+        guild = self.bot.get_guild(player.guild_id)
+        while True:
+            player.track_finished.clear()
+            vc = guild.voice_client
             if not vc: break
 
             try:
-                requester_interaction, song_search = await asyncio.wait_for(self.song_queues[guild_id].get(), timeout=300.0)
-                
-                self.music_queues[guild_id].pop(0)
+                # Só existe intervalo entre músicas quando a próxima já estava na fila
+                queue_was_ready = bool(player.queue) or bool(player.active_playlist and not player.active_playlist.finished)
+                track = await self.next_track(player)
+                channel = self.bot.get_channel(track.channel_id)
+                requester = guild.get_member(track.requester_id)
 
-                song_info = get_audio_source(song_search)
+                song_info, source = await self.take_prefetched(player, track.query)
                 if not song_info:
-                    await requester_interaction.channel.send(embed=create_embed("❌ Erro", f"Não consegui encontrar informações para `{song_search}`. Pulando.", discord.Color.red()))
+                    if channel:
+                        await channel.send(embed=create_embed("❌ Erro", f"Não consegui encontrar informações para `{track}`. Pulando.", discord.Color.red()))
                     continue
-                
-                self.current_song_info[guild_id] = song_info
 
-                source = discord.FFmpegPCMAudio(song_info['url'], before_options='-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5', options='-vn')
-                vc.play(source, after=lambda e: self.bot.loop.call_soon_threadsafe(self.play_next_song_events[guild_id].set))
+                player.current_track = track
+                player.current_info = song_info
+                self.audio_cache.record_play(song_info)
+
+                if queue_was_ready and player.ended_at is not None:
+                    metrics.observe("stwart_music_track_gap_seconds", "player", "all", time.perf_counter() - player.ended_at,
+                                    "Silêncio entre o fim de uma música e o início da próxima.")
+                player.ended_at = None
+                vc.play(source, after=lambda e: self.bot.loop.call_soon_threadsafe(self.on_track_end, player))
+                player.started_at = time.monotonic()
+                self.start_prefetch(player)
 
-                embed = create_embed("🎶 Tocando Agora", f"**[{song_info['title']}]({song_info['webpage_url']})**", author=requester_interaction.user)
+                embed = create_embed("🎶 Tocando Agora", f"**[{song_info['title']}]({song_info['webpage_url']})**", author=requester)
                 if song_info['thumbnail']: embed.set_thumbnail(url=song_info['thumbnail'])
-                
-                if guild_id in self.now_playing_messages:
-                    msg = self.now_playing_messages[guild_id]
-                    try: await msg.edit(embed=embed, view=MusicControls(self))
-                    except discord.NotFound: self.now_playing_messages[guild_id] = await requester_interaction.channel.send(embed=embed, view=MusicControls(self))
-                else:
-                    self.now_playing_messages[guild_id] = await requester_interaction.channel.send(embed=embed, view=MusicControls(self))
 
-                await self.play_next_song_events[guild_id].wait()
+                if player.now_playing_message:
+                    try: await player.now_playing_message.edit(embed=embed, view=MusicControls(self))
+                    except discord.NotFound: player.now_playing_message = await channel.send(embed=embed, view=MusicControls(self)) if channel else None
+                elif channel:
+                    player.now_playing_message = await channel.send(embed=embed, view=MusicControls(self))
+
+                await player.track_finished.wait()
 
             except asyncio.TimeoutError:
-                await self.cleanup(initial_interaction.guild)
-                await initial_interaction.channel.send(embed=create_embed("🕒 Inatividade", "Saindo do canal por inatividade.", discord.Color.light_grey()))
+                channel = self.bot.get_channel(player.text_channel_id)
+                await self.cleanup(guild)
+                if channel:
+                    await channel.send(embed=create_embed("🕒 Inatividade", "Saindo do canal por inatividade.", discord.Color.light_grey()))
                 break
             except Exception as e:
                 logging.error("Erro inesperado no player de áudio:", exc_info=e)
-                await self.cleanup(initial_interaction.guild)
+                await self.cleanup(guild)
                 break
-    
+
+    def get_player(self, interaction: discord.Interaction) -> Optional[GuildPlayer]:
+        return self.players.get(interaction.guild.id)
+
     @app_commands.command(name="play", description="Toca uma música no seu canal de voz.")
     @app_commands.describe(busca="O nome ou URL da música que você quer tocar.")
     async def play(self, interaction: discord.Interaction, busca: str):
@@ -143,27 +355,84 @@ class Music(commands.Cog):
         
         await interaction.response.defer(thinking=True, ephemeral=True)
         
+        guild_id = interaction.guild.id
         vc = interaction.guild.voice_client
-        if not vc:
-            vc = await interaction.user.voice.channel.connect()
-            self.player_tasks[interaction.guild.id] = self.bot.loop.create_task(self.audio_player_task(interaction))
+        player = self.players.get(guild_id)
+        if not vc or not player:
+            if not vc:
+                vc = await interaction.user.voice.channel.connect()
+            player = self.players[guild_id] = GuildPlayer(guild_id, interaction.channel.id)
+            player.task = self.bot.loop.create_task(self.audio_player_task(player))
+
+        if is_playlist_url(busca):
+            # Só a primeira página é carregada agora; o resto entra aos poucos enquanto a playlist toca
+            item = PlaylistCursor(self.resolver, guild_id, busca, requester_id=interaction.user.id, channel_id=interaction.channel.id)
+            if not await item.fill():
+                return await interaction.followup.send(embed=create_embed("❌ Erro", f"Não consegui carregar a playlist `{busca}`.", discord.Color.red()))
+        else:
+            item = Track(busca, None, interaction.user.id, interaction.channel.id)
 
-        await self.song_queues[interaction.guild.id].put((interaction, busca))
-        self.music_queues[interaction.guild.id].append(busca)
+        try:
+            player.enqueue(item)
+        except QueueFull:
+            return await interaction.followup.send(embed=create_embed("❌ Fila Cheia", f"A fila já tem o máximo de {player.max_size} itens.", discord.Color.red()))
+        if vc.is_playing() or vc.is_paused():
+            self.start_prefetch(player)
 
+        if isinstance(item, PlaylistCursor):
+            total = f"{item.total} músicas" if item.total else "várias músicas"
+            return await interaction.followup.send(embed=create_embed("📃 Playlist Adicionada", f"**{item.title}** ({total}) foi adicionada à fila.", author=interaction.user))
         await interaction.followup.send(embed=create_embed("🎵 Adicionado à Fila", f"`{busca}` foi adicionado.", author=interaction.user))
 
     @app_commands.command(name="queue", description="Mostra a fila de músicas atual.")
     async def queue(self, interaction: discord.Interaction):
-        queue_list = self.music_queues.get(interaction.guild.id, [])
-        if not queue_list:
+        player = self.get_player(interaction)
+        active = player.active_playlist if player and player.active_playlist and not player.active_playlist.finished else None
+        if not player or (not player.queue and not active):
             return await interaction.response.send_message(embed=create_embed("📭 Fila Vazia", "Não há nenhuma música na fila.", discord.Color.orange()))
 
-        description = "\n".join(f"`{i+1}.` {song}" for i, song in enumerate(queue_list[:10]))
-        embed = create_embed("📃 Fila de Reprodução", description, author=interaction.user)
-        if len(queue_list) > 10: embed.set_footer(text=f"e mais {len(queue_list) - 10} música(s)...")
+        lines = []
+        if active:
+            # As próximas entradas da playlist atual tocam antes do resto da fila
+            upcoming = ", ".join(title for _, title in list(active.buffer)[:3])
+            lines.append(f"▶️ {active}" + (f"\n↳ {upcoming}" if upcoming else ""))
+        lines.extend(f"`{i+1}.` {item}" for i, item in enumerate(list(player.queue)[:10]))
+        embed = create_embed("📃 Fila de Reprodução", "\n".join(lines), author=interaction.user)
+        if len(player.queue) > 10: embed.set_footer(text=f"e mais {len(player.queue) - 10} música(s)...")
         await interaction.response.send_message(embed=embed)
 
+    def _invalid_position(self, player: Optional[GuildPlayer], *positions: int) -> bool:
+        return not player or any(not 1 <= position <= len(player.queue) for position in positions)
+
+    @app_commands.command(name="remove", description="Remove uma música da fila.")
+    @app_commands.describe(posicao="A posição da música na fila (veja /queue).")
+    async def remove(self, interaction: discord.Interaction, posicao: int):
+        player = self.get_player(interaction)
+        if self._invalid_position(player, posicao):
+            return await interaction.response.send_message(embed=create_embed("❌ Erro", "Posição inválida na fila.", discord.Color.red()), ephemeral=True)
+
+        item = player.remove(posicao - 1)
+        await interaction.response.send_message(embed=create_embed("🗑️ Removido da Fila", f"`{item}` foi removido.", author=interaction.user))
+
+    @app_commands.command(name="move", description="Move uma música para outra posição da fila.")
+    @app_commands.describe(de="A posição atual da música.", para="A nova posição da música.")
+    async def move(self, interaction: discord.Interaction, de: int, para: int):
+        player = self.get_player(interaction)
+        if self._invalid_position(player, de, para):
+            return await interaction.response.send_message(embed=create_embed("❌ Erro", "Posição inválida na fila.", discord.Color.red()), ephemeral=True)
+
+        item = player.move(de - 1, para - 1)
+        await interaction.response.send_message(embed=create_embed("↕️ Fila Reorganizada", f"`{item}` agora está na posição **{para}**.", author=interaction.user))
+
+    @app_commands.command(name="shuffle", description="Embaralha a fila de músicas.")
+    async def shuffle(self, interaction: discord.Interaction):
+        player = self.get_player(interaction)
+        if not player or len(player.queue) < 2:
+            return await interaction.response.send_message(embed=create_embed("❌ Erro", "Não há músicas suficientes na fila para embaralhar.", discord.Color.red()), ephemeral=True)
+
+        player.shuffle()
+        await interaction.response.send_message(embed=create_embed("🔀 Fila Embaralhada", f"{len(player.queue)} itens foram embaralhados.", author=interaction.user))
+
     @app_commands.command(name="skip", description="Pula a música que está tocando.")
     async def skip(self, interaction: discord.Interaction):
         vc = interaction.guild.voice_client
@@ -176,7 +445,8 @@ class Music(commands.Cog):
 
     @app_commands.command(name="nowplaying", description="Mostra informações sobre a música que está tocando.")
     async def nowplaying(self, interaction: discord.Interaction):
-        song_info = self.current_song_info.get(interaction.guild.id)
+        player = self.get_player(interaction)
+        song_info = player.current_info if player else None
         if not song_info:
             return await interaction.response.send_message(embed=create_embed("🤔 Nada Tocando", "Não há nenhuma música no momento.", discord.Color.orange()))
         
@@ -184,6 +454,19 @@ class Music(commands.Cog):
         if song_info['thumbnail']: embed.set_thumbnail(url=song_info['thumbnail'])
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="musiccache", description="Mostra as estatísticas do cache de áudio em disco.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def musiccache(self, interaction: discord.Interaction):
+        stats = self.audio_cache.stats()
+        if not stats["enabled"]:
+            return await interaction.response.send_message(embed=create_embed("💾 Cache de Áudio", "O cache de áudio está desativado (MUSIC_AUDIO_CACHE_MB=0).", discord.Color.orange()), ephemeral=True)
+
+        embed = create_embed("💾 Cache de Áudio", color=discord.Color.green())
+        embed.add_field(name="Taxa de Acerto", value=f"`{stats['hit_rate']:.1%}` ({stats['hits']} de {stats['hits'] + stats['misses']})", inline=True)
+        embed.add_field(name="Arquivos", value=f"`{stats['files']}`" + (f" (+{stats['downloading']} baixando)" if stats['downloading'] else ""), inline=True)
+        embed.add_field(name="Espaço", value=f"`{stats['bytes'] / 1_048_576:.1f} / {stats['max_bytes'] / 1_048_576:.0f} MB`", inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="stop", description="Para a música, limpa a fila e desconecta o bot.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def stop(self, interaction: discord.Interaction):
@@ -191,4 +474,4 @@ class Music(commands.Cog):
         await interaction.response.send_message(embed=create_embed("⏹️ Player Parado", author=interaction.user, color=discord.Color.red()))
 
 async def setup(bot):
-    await bot.add_cog(Music(bot))
\ No newline at end of file
+    await bot.add_cog(Music(bot))
@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+import yt_dlp
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+from modules.database import AsyncSQLite
+from modules.metrics import metrics
+from config.settings import (
+    MUSIC_RESOLVER_WORKERS,
+    MUSIC_RESOLVES_PER_GUILD,
+    MUSIC_RESOLVE_TIMEOUT,
+    MUSIC_STREAM_URL_MARGIN,
+    MUSIC_STREAM_DEFAULT_TTL,
+    MUSIC_CACHE_MEMORY_ENTRIES,
+    MUSIC_CACHE_METADATA_TTL,
+    MUSIC_PLAYLIST_PAGE_SIZE
+)
+
+YDL_OPTIONS = {
+    # Prefere Opus (webm/251 no YouTube): ele pode ir direto para o Discord sem ser decodificado
+    'format': 'bestaudio[acodec=opus]/bestaudio/best', 'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
+    'restrictfilenames': True, 'noplaylist': True, 'nocheckcertificate': True,
+    'ignoreerrors': False, 'logtostderr': False, 'quiet': True,
+    'no_warnings': True, 'default_search': 'ytsearch', 'source_address': '0.0.0.0',
+    # Limita o tempo que uma conexão travada pode prender uma thread do pool
+    'socket_timeout': 10
+}
+
+# Cada thread do pool guarda sua própria instância do YoutubeDL (elas não são thread-safe)
+_worker_state = threading.local()
+
+# Extração "flat" de playlists: só IDs e títulos das entradas, sem resolver cada vídeo
+YDL_PLAYLIST_OPTIONS = {**YDL_OPTIONS, 'noplaylist': False, 'extract_flat': 'in_playlist', 'lazy_playlist': True}
+
+def get_extractor(flat: bool = False) -> yt_dlp.YoutubeDL:
+    """Instância do YoutubeDL da thread atual, criada uma única vez e reutilizada em todas as buscas.
+
+    Criar um YoutubeDL refaz o registro dos extractors e o processamento das opções (~100ms).
+    """
+    attribute = "flat_ydl" if flat else "ydl"
+    ydl = getattr(_worker_state, attribute, None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(YDL_PLAYLIST_OPTIONS if flat else YDL_OPTIONS)
+        setattr(_worker_state, attribute, ydl)
+    return ydl
+
+def get_audio_source(url: str):
+    """Extrai informações do áudio usando yt_dlp (bloqueante: rode pelo AudioResolver)."""
+    try:
+        info = get_extractor().extract_info(url, download=False)
+        if 'entries' in info: info = info['entries'][0]
+        return {
+            'url': info['url'],
+            'title': info.get('title', 'Título desconhecido'),
+            'thumbnail': info.get('thumbnail', ''),
+            'webpage_url': info.get('webpage_url', url),
+            'duration': info.get('duration'),
+            'id': info.get('id'),
+            'acodec': info.get('acodec')
+        }
+    except Exception as e:
+        logging.error(f"Erro ao obter source do yt_dlp para '{url}': {e}")
+        return None
+
+def get_playlist_page(url: str, start: int, end: int) -> Optional[dict]:
+    """Extrai (flat) as entradas start..end (1-based, inclusivo) de uma playlist."""
+    try:
+        ydl = get_extractor(flat=True)
+        # A instância é exclusiva desta thread, então dá para ajustar o intervalo a cada chamada
+        ydl.params['playlist_items'] = f"{start}-{end}"
+        info = ydl.extract_info(url, download=False)
+        entries, returned = [], 0
+        for entry in info.get('entries') or []:
+            # Entradas indisponíveis (vídeos privados/apagados) também contam para saber se a playlist acabou
+            returned += 1
+            if not entry:
+                continue
+            entry_url = entry.get('url') or entry.get('webpage_url')
+            if entry_url:
+                entries.append((entry_url, entry.get('title') or entry_url))
+        return {'title': info.get('title', 'Playlist'), 'count': info.get('playlist_count'), 'entries': entries, 'returned': returned}
+    except Exception as e:
+        logging.error(f"Erro ao obter a playlist '{url}' (itens {start}-{end}) do yt_dlp: {e}")
+        return None
+
+def is_playlist_url(query: str) -> bool:
+    """Links de playlist (sem um vídeo específico) são carregados de forma preguiçosa, página por página."""
+    if "://" not in query:
+        return False
+    parsed = urlparse(query)
+    params = parse_qs(parsed.query)
+    return "/playlist" in parsed.path or "/sets/" in parsed.path or ("list" in params and "v" not in params)
+
+# URLs diretas do YouTube (googlevideo) carregam o horário de expiração como "expire=<unix>" ou "/expire/<unix>/"
+_EXPIRE_PATTERN = re.compile(r"[?&/]expire[=/](\d+)")
+
+def stream_url_expires_at(url: str) -> Optional[float]:
+    """Horário (unix) em que a URL direta do stream expira, se ela informar."""
+    match = _EXPIRE_PATTERN.search(url or "")
+    return float(match.group(1)) if match else None
+
+def stream_url_expired(url: str, margin: float = MUSIC_STREAM_URL_MARGIN) -> bool:
+    """Indica se a URL direta já expirou (ou expira nos próximos `margin` segundos)."""
+    expires_at = stream_url_expires_at(url)
+    return expires_at is not None and expires_at - margin <= time.time()
+
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+
+def normalize_query(query: str) -> str:
+    """Chave de cache de uma busca/URL: links do YouTube viram o ID do vídeo, buscas são normalizadas."""
+    query = " ".join(query.split())
+    if "://" not in query:
+        return "search:" + query.casefold()
+    parsed = urlparse(query)
+    host = parsed.netloc.lower()
+    if host == "youtu.be" and parsed.path.strip("/"):
+        return "youtube:" + parsed.path.strip("/").split("/")[0]
+    if host in _YOUTUBE_HOSTS:
+        video_id = parse_qs(parsed.query).get("v", [None])[0]
+        if video_id:
+            return "youtube:" + video_id
+    return "url:" + query
+
+class ResolutionCache:
+    """Cache compartilhado de resoluções (busca/URL -> metadados e URL do stream).
+
+    Duas camadas: um LRU em memória e uma tabela SQLite em data/. Os metadados valem por
+    MUSIC_CACHE_METADATA_TTL; a URL direta do stream vale só até a própria expiração, e quando ela
+    vence basta refazer a extração do vídeo (barata) em vez da busca inteira.
+    """
+    def __init__(self, db_path: str = "data/music_cache.db", memory_entries: int = MUSIC_CACHE_MEMORY_ENTRIES):
+        self.memory: "OrderedDict[str, dict]" = OrderedDict()
+        self.memory_entries = memory_entries
+        self.db = AsyncSQLite(db_path, read_pool_size=1, schema=self.create_tables)
+
+    @staticmethod
+    def create_tables(conn: sqlite3.Connection):
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS resolutions (
+            query_key TEXT PRIMARY KEY, video_id TEXT, title TEXT, webpage_url TEXT,
+            thumbnail TEXT, duration REAL, stream_url TEXT, stream_expires_at REAL, resolved_at REAL, acodec TEXT
+        )""")
+        # Bancos criados antes do pipeline Opus não têm a coluna do codec
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(resolutions)")}
+        if "acodec" not in columns:
+            conn.execute("ALTER TABLE resolutions ADD COLUMN acodec TEXT")
+
+    def _remember(self, key: str, entry: dict):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Entrada com metadados ainda válidos (a URL do stream pode ter expirado), ou None."""
+        entry = self.memory.get(key)
+        tier = "memory"
+        if entry is None:
+            tier = "disk"
+            row = await self.db.fetchone(
+                "SELECT video_id, title, webpage_url, thumbnail, duration, stream_url, stream_expires_at, resolved_at, acodec FROM resolutions WHERE query_key = ?",
+                (key,)
+            )
+            if row is None:
+                return None
+            entry = dict(zip(("id", "title", "webpage_url", "thumbnail", "duration", "url", "stream_expires_at", "resolved_at", "acodec"), row))
+        if entry["resolved_at"] + MUSIC_CACHE_METADATA_TTL < time.time():
+            self.memory.pop(key, None)
+            return None
+        self._remember(key, entry)
+        metrics.inc("stwart_music_cache_total", "result", f"{tier}_hit", help_text="Consultas ao cache de resoluções de música.")
+        return entry
+
+    async def put(self, keys, song_info: dict, resolved_at: Optional[float] = None):
+        """Guarda uma resolução sob uma ou mais chaves (ex: a busca e o ID do vídeo)."""
+        expires_at = stream_url_expires_at(song_info['url']) or time.time() + MUSIC_STREAM_DEFAULT_TTL
+        entry = {**song_info, "stream_expires_at": expires_at, "resolved_at": resolved_at or time.time()}
+        for key in keys:
+            self._remember(key, entry)
+        await self.db.executemany(
+            "INSERT OR REPLACE INTO resolutions (query_key, video_id, title, webpage_url, thumbnail, duration, stream_url, stream_expires_at, resolved_at, acodec) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(key, entry.get("id"), entry["title"], entry["webpage_url"], entry["thumbnail"], entry.get("duration"),
+              entry["url"], entry["stream_expires_at"], entry["resolved_at"], entry.get("acodec")) for key in keys]
+        )
+
+    async def purge_expired(self) -> int:
+        """Apaga do disco as resoluções com metadados vencidos."""
+        return await self.db.execute("DELETE FROM resolutions WHERE resolved_at < ?", (time.time() - MUSIC_CACHE_METADATA_TTL,))
+
+    async def close(self):
+        await self.db.close()
+
+class AudioResolver:
+    """Resolve buscas e URLs com yt_dlp fora do event loop, em um pool de threads limitado.
+
+    O pool global é limitado a MUSIC_RESOLVER_WORKERS extrações simultâneas e cada servidor
+    a MUSIC_RESOLVES_PER_GUILD, então uma busca lenta nunca trava o bot nem os outros servidores.
+    """
+    def __init__(self, max_workers: int = MUSIC_RESOLVER_WORKERS, per_guild: int = MUSIC_RESOLVES_PER_GUILD, timeout: float = MUSIC_RESOLVE_TIMEOUT,
+                 cache: Optional[ResolutionCache] = None):
+        self.cache = cache or ResolutionCache()
+        # O initializer cria a instância do YoutubeDL assim que cada thread do pool nasce
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt-dlp", initializer=get_extractor)
+        self.slots = asyncio.Semaphore(max_workers)
+        self.per_guild = per_guild
+        self.timeout = timeout
+        self.guild_slots: Dict[int, asyncio.Semaphore] = {}
+        self.guild_tasks: Dict[int, Set[asyncio.Task]] = {}
+
+    async def _run(self, guild_id: int, func, *args) -> Optional[dict]:
+        guild_slot = self.guild_slots.setdefault(guild_id, asyncio.Semaphore(self.per_guild))
+        # Pedidos cancelados enquanto esperam uma vaga nunca chegam a ocupar uma thread
+        async with guild_slot, self.slots:
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            finally:
+                metrics.observe("stwart_music_resolve_seconds", "stage", "extract", time.perf_counter() - start,
+                                "Tempo das extrações do yt_dlp.")
+
+    async def resolve(self, guild_id: int, query: str) -> Optional[dict]:
+        """Resolve uma busca/URL pelo cache. Retorna None em caso de erro ou se passar do tempo limite."""
+        key = normalize_query(query)
+        try:
+            cached = await self.cache.get(key)
+        except sqlite3.Error as e:
+            logging.error("Música: falha ao ler o cache de resoluções:", exc_info=e)
+            cached = None
+
+        if cached and cached["stream_expires_at"] - MUSIC_STREAM_URL_MARGIN > time.time():
+            return {field: cached[field] for field in ("url", "title", "thumbnail", "webpage_url", "duration", "id", "acodec")}
+
+        if cached:
+            # Metadados ainda válidos: só a URL do stream precisa ser renovada, direto pela página do vídeo
+            metrics.inc("stwart_music_cache_total", "result", "stream_refresh", help_text="Consultas ao cache de resoluções de música.")
+            song_info = await self._extract(guild_id, cached["webpage_url"])
+        else:
+            metrics.inc("stwart_music_cache_total", "result", "miss", help_text="Consultas ao cache de resoluções de música.")
+            song_info = await self._extract(guild_id, query)
+        if not song_info:
+            return None
+
+        keys = {key}
+        if song_info.get("id") and "youtube" in (song_info.get("webpage_url") or ""):
+            keys.add("youtube:" + song_info["id"])
+        try:
+            await self.cache.put(keys, song_info, resolved_at=cached["resolved_at"] if cached else None)
+        except sqlite3.Error as e:
+            logging.error("Música: falha ao gravar no cache de resoluções:", exc_info=e)
+        return song_info
+
+    async def get_playlist_page(self, guild_id: int, url: str, start: int, end: int) -> Optional[dict]:
+        """Extrai uma página de uma playlist no pool (mesmos limites e cancelamento das buscas)."""
+        return await self._extract(guild_id, url, get_playlist_page, start, end)
+
+    async def _extract(self, guild_id: int, query: str, func=get_audio_source, *args) -> Optional[dict]:
+        """Roda a extração do yt_dlp no pool, com tempo limite e cancelamento por servidor."""
+        task = asyncio.create_task(self._run(guild_id, func, query, *args))
+        tasks = self.guild_tasks.setdefault(guild_id, set())
+        tasks.add(task)
+        try:
+            return await asyncio.wait_for(task, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Música: a busca por '{query}' passou de {self.timeout}s e foi cancelada.")
+            return None
+        finally:
+            tasks.discard(task)
+
+    def cancel_guild(self, guild_id: int):
+        """Cancela as resoluções pendentes de um servidor (ex: quando o player é limpo)."""
+        for task in self.guild_tasks.pop(guild_id, set()):
+            task.cancel()
+        self.guild_slots.pop(guild_id, None)
+
+    async def close(self):
+        for guild_id in list(self.guild_tasks):
+            self.cancel_guild(guild_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        await self.cache.close()
+
+class PlaylistCursor:
+    """Uma playlist na fila, carregada de forma preguiçosa.
+
+    Só uma página (MUSIC_PLAYLIST_PAGE_SIZE entradas leves: URL e título) fica em memória por vez;
+    a próxima página só é extraída quando a atual acaba, e cada música só é resolvida de verdade
+    quando chega perto do início da fila (pelo prefetch do player).
+    """
+    def __init__(self, resolver: AudioResolver, guild_id: int, url: str, requester_id: int = 0, channel_id: int = 0,
+                 page_size: int = MUSIC_PLAYLIST_PAGE_SIZE):
+        self.resolver = resolver
+        self.requester_id = requester_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.url = url
+        self.page_size = page_size
+        self.title = "Playlist"
+        self.total: Optional[int] = None
+        self.buffer: Deque[Tuple[str, str]] = deque()
+        self.next_index = 1
+        self.consumed = 0
+        self.exhausted = False
+
+    def __str__(self) -> str:
+        remaining = f"{self.total - self.consumed} restante(s)" if self.total else "carregando aos poucos"
+        return f"📃 {self.title} ({remaining})"
+
+    @property
+    def finished(self) -> bool:
+        return self.exhausted and not self.buffer
+
+    def peek(self) -> Optional[str]:
+        """URL da próxima entrada já carregada, sem consumi-la."""
+        return self.buffer[0][0] if self.buffer else None
+
+    async def fill(self) -> bool:
+        """Carrega a próxima página com entradas tocáveis. Retorna False se a playlist acabou.
+
+        O fim da playlist vem do número de entradas que o yt_dlp devolveu (ou do playlist_count),
+        não das tocáveis: uma página cheia de vídeos indisponíveis só é pulada.
+        """
+        while not self.exhausted:
+            page = await self.resolver.get_playlist_page(self.guild_id, self.url, self.next_index, self.next_index + self.page_size - 1)
+            if not page or not page['returned']:
+                self.exhausted = True
+                return False
+            self.title = page['title'] or self.title
+            self.total = page['count'] or self.total
+            self.next_index += self.page_size
+            if page['returned'] < self.page_size or (self.total and self.next_index > self.total):
+                self.exhausted = True
+            if page['entries']:
+                self.buffer.extend(page['entries'])
+                return True
+        return False
+
+    async def next_entry(self) -> Optional[Tuple[str, str]]:
+        """Consome a próxima entrada (URL, título), carregando outra página se preciso."""
+        if not self.buffer and not await self.fill():
+            return None
+        self.consumed += 1
+        return self.buffer.popleft()
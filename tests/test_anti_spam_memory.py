@@ -0,0 +1,54 @@
+"""A memória do SpamLimiter fica estável com remetentes distintos sem fim (limite de chaves + TTL).
+
+Uso (a partir da raiz do projeto):
+    python -m unittest tests.test_anti_spam_memory
+"""
+import tracemalloc
+import unittest
+
+from modules.anti_spam import SpamLimiter
+
+MAX_KEYS = 5000
+MAX_BYTES_PER_KEY = 400
+
+
+class SpamLimiterMemoryTest(unittest.TestCase):
+    def run_senders(self, limiter: SpamLimiter, first: int, count: int, clock: float) -> float:
+        for sender in range(first, first + count):
+            clock += 0.001
+            key = (sender % 50, 10**17 + sender)
+            for i in range(3):
+                self.assertIsNone(limiter.hit(key, f"mensagem {i}", now=clock))
+        limiter.evict_idle(now=clock)
+        return clock
+
+    def test_memory_stays_flat(self):
+        limiter = SpamLimiter(max_keys=MAX_KEYS)
+        tracemalloc.start()
+        try:
+            # Enche o tracker e mede depois que ele já está no limite
+            clock = self.run_senders(limiter, 0, MAX_KEYS * 2, 0.0)
+            baseline, _ = tracemalloc.get_traced_memory()
+            samples = []
+            for round_ in range(1, 6):
+                clock = self.run_senders(limiter, MAX_KEYS * 2 * round_, MAX_KEYS * 2, clock)
+                current, _ = tracemalloc.get_traced_memory()
+                samples.append(current)
+        finally:
+            tracemalloc.stop()
+
+        self.assertLessEqual(len(limiter), MAX_KEYS)
+        self.assertGreater(limiter.evicted, MAX_KEYS * 10)
+        for current in samples:
+            self.assertLess(abs(current - baseline) / baseline, 0.05)
+        self.assertLess(max(samples) / MAX_KEYS, MAX_BYTES_PER_KEY)
+
+    def test_idle_authors_leave(self):
+        limiter = SpamLimiter(max_keys=MAX_KEYS)
+        self.run_senders(limiter, 0, 100, 0.0)
+        self.assertEqual(limiter.evict_idle(now=limiter.idle_ttl + 10), 100)
+        self.assertEqual(len(limiter), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()